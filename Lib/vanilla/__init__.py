@@ -9,19 +9,29 @@ from vanillaDrawer import Drawer
 from vanillaEditText import EditText, SecureEditText
 from vanillaGroup import Group
 from vanillaImageView import ImageView
-from vanillaList import List, CheckBoxListCell, SliderListCell, PopUpButtonListCell
+from vanillaImageCache import ImageCache
+from vanillaList import List, CheckBoxListCell, SliderListCell, PopUpButtonListCell, getListCellCacheStatistics, \
+        clearListCellCache
 from vanillaPopUpButton import PopUpButton
 from vanillaProgressBar import ProgressBar
 from vanillaProgressSpinner import ProgressSpinner
 from vanillaRadioGroup import RadioGroup
 from vanillaScrollView import ScrollView
+from vanillaVirtualRowView import VirtualRowView
 from vanillaSearchBox import SearchBox
 from vanillaSegmentedButton import SegmentedButton
 from vanillaSlider import Slider
 from vanillaTabs import Tabs
 from vanillaTextBox import TextBox
 from vanillaTextEditor import TextEditor
+from vanillaHighlighter import Highlighter, RegexHighlighter
 from vanillaWindows import Window, FloatingWindow, Sheet
+from vanillaWindowPool import WindowPool
+from vanillaIdle import IdleWindowBuilder
+from vanillaDispatch import callOnMain, callAfter
+from vanillaStallDetector import StallDetector
+from vanillaTrace import Tracer
+from vanillaModel import ObservableModel, bind
 
 __all__ = [
     "VanillaBaseObject", "VanillaBaseControl", "VanillaError",
@@ -34,13 +44,15 @@ __all__ = [
     "EditText",
     "Group",
     "ImageView",
-    "List", "CheckBoxListCell", "SliderListCell", "PopUpButtonListCell",
+    "ImageCache",
+    "List", "CheckBoxListCell", "SliderListCell", "PopUpButtonListCell", "getListCellCacheStatistics", "clearListCellCache",
     "ObjectBrowser",
     "PopUpButton",
     "ProgressBar",
     "ProgressSpinner",
     "RadioGroup",
     "ScrollView",
+    "VirtualRowView",
     "SearchBox",
     "SecureEditText",
     "SegmentedButton",
@@ -48,8 +60,12 @@ __all__ = [
     "SplitView",
     "Tabs",
     "TextBox",
-    "TextEditor",
-    "Window", "FloatingWindow", "Sheet"
+    "TextEditor", "Highlighter", "RegexHighlighter",
+    "Window", "FloatingWindow", "Sheet",
+    "WindowPool", "IdleWindowBuilder",
+    "callOnMain", "callAfter",
+    "StallDetector", "Tracer",
+    "ObservableModel", "bind"
     ]
 
 # OS 10.4+ objects
@@ -131,6 +131,69 @@ class TextTest(BaseTest):
         self.w.open()
 
 
+class TextEditorTest(BaseTest):
+
+    rules = {
+        "root" : [
+            ("keyword", r"\b(def|class|return|import|from)\b", None),
+            ("string", r"\"[^\"]*\"", None),
+            ("comment", r"/\*", "comment"),
+        ],
+        "comment" : [
+            ("comment", r".*?\*/", "root"),
+            ("comment", r".+", None),
+        ]
+    }
+
+    def __init__(self, drawGrid=False):
+        self.w = Window((400, 330), "Text Editor Test", minSize=(300, 200))
+        self.lineNumber = 0
+        text = "\n".join("def line%d(): /* comment */ return \"line %d\"" % (i, i) for i in xrange(1000))
+        self.w.textEditor = TextEditor((10, 10, -10, -70), text, callback=self.basicCallback, changeCallback=self.changeCallback)
+        styles = {
+            "keyword" : {NSForegroundColorAttributeName : NSColor.blueColor()},
+            "string" : {NSForegroundColorAttributeName : NSColor.redColor()},
+            "comment" : {NSForegroundColorAttributeName : NSColor.grayColor()},
+        }
+        self.w.textEditor.setHighlighter(RegexHighlighter(self.rules, styles))
+        self.w.textEditor.setAppendLimits(maxLines=2000)
+
+        self.w.minimalEditButton = Button((10, -60, 120, 20), "Minimal Edit", callback=self.minimalEditCallback)
+        self.w.appendButton = Button((140, -60, 120, 20), "Append", callback=self.appendCallback)
+        self.w.findBox = SearchBox((10, -30, 250, 22), callback=self.findCallback)
+        self.w.lineCount = TextBox((270, -30, -10, 17), "")
+
+        if drawGrid:
+            self.drawGrid()
+
+        self.w.open()
+
+    def minimalEditCallback(self, sender):
+        # the selection and the highlighting of the other lines are kept
+        text = self.w.textEditor.get()
+        lines = text.split("\n")
+        lines[len(lines) // 2] = "/* edited at %s */" % time.ctime()
+        self.w.textEditor.set("\n".join(lines), minimalEdit=True)
+
+    def appendCallback(self, sender):
+        for i in xrange(100):
+            self.lineNumber += 1
+            self.w.textEditor.append("\nappended line %d" % self.lineNumber)
+
+    def findCallback(self, sender):
+        pattern = sender.get()
+        if pattern:
+            self.w.textEditor.findAll(pattern, highlightColor=NSColor.yellowColor(), callback=self.findDoneCallback)
+        else:
+            self.w.textEditor.cancelSearch()
+
+    def findDoneCallback(self, sender, count):
+        print sender, count
+
+    def changeCallback(self, sender, changeInfo):
+        self.w.lineCount.set("%d lines" % sender.getLineCount())
+
+
 class ButtonTest(BaseTest):
 
     def __init__(self, drawGrid=False):
@@ -433,6 +496,99 @@ class ViewTest(BaseTest):
         self.w.open()
 
 
+class LazyTabsTest(BaseTest):
+
+    def __init__(self, drawGrid=False):
+        self.w = Window((450, 200), "Lazy Tabs Test")
+
+        titles = ["One", "Two", "Three", "Four"]
+        builders = [lambda tab, title=title: self.buildTab(tab, title) for title in titles]
+        self.w.tabs = Tabs((10, 10, 210, -10), titles, builders=builders, callback=self.tabsCallback)
+        self.w.idleTabs = Tabs((230, 10, 210, -10), titles, builders=builders, prebuildWhenIdle=True, callback=self.tabsCallback)
+
+        if drawGrid:
+            self.drawGrid()
+
+        self.w.open()
+
+    def buildTab(self, tab, title):
+        print "building", title
+        tab.list = List((10, 10, -10, -10), sortedListOptions)
+
+    def tabsCallback(self, sender):
+        print sender, sender.get()
+
+
+class VirtualRowViewTest(BaseTest):
+
+    def __init__(self, drawGrid=False):
+        self.w = Window((300, 400), "Virtual Row View Test", minSize=(200, 200))
+        self.w.rows = VirtualRowView((10, 10, -10, -40), 10000, 22,
+                            buildRowCallback=self.buildRow,
+                            bindRowCallback=self.bindRow)
+        self.w.addRowsButton = Button((10, -30, 130, 20), "Add Rows", callback=self.addRowsCallback)
+        self.w.scrollButton = Button((150, -30, -10, 20), "Scroll to Middle", callback=self.scrollCallback)
+
+        if drawGrid:
+            self.drawGrid()
+
+        self.w.open()
+
+    def buildRow(self, row):
+        def checkBoxCallback(sender):
+            row.setValue(sender.get())
+            self.w.rows.reloadRows([row.getIndex()])
+        row.checkBox = CheckBox((10, 2, 150, 20), "", callback=checkBoxCallback)
+        row.state = TextBox((170, 3, -10, 17), "")
+
+    def bindRow(self, row, index):
+        row.checkBox.setTitle("Item %d" % index)
+        value = row.getValue(False)
+        row.checkBox.set(value)
+        if value:
+            row.state.set("checked")
+        else:
+            row.state.set("")
+
+    def addRowsCallback(self, sender):
+        self.w.rows.setRowCount(self.w.rows.getRowCount() + 1000)
+
+    def scrollCallback(self, sender):
+        self.w.rows.scrollToRow(self.w.rows.getRowCount() // 2)
+
+
+class BindTest(BaseTest):
+
+    def __init__(self, drawGrid=False):
+        self.model = ObservableModel(dict(name="Untitled", size=12, bold=False, style=0))
+        self.model.addObserver(self.modelCallback)
+        self.w = Window((440, 160), "Bind Test")
+
+        # two columns of controls bound to the same values
+        for column, left in enumerate((10, 230)):
+            name = EditText((left, 10, 200, 22), callback=self.getCallback)
+            size = Slider((left, 40, 200, 23), minValue=6, maxValue=72)
+            bold = CheckBox((left, 70, 200, 22), "Bold")
+            style = PopUpButton((left, 100, 200, 20), ["Regular", "Italic", "Oblique"])
+            for attrName, control in (("name", name), ("size", size), ("bold", bold), ("style", style)):
+                setattr(self.w, "%s%d" % (attrName, column), control)
+                bind(control, self.model, attrName)
+
+        self.w.resetButton = Button((10, 130, 200, 20), "Reset", callback=self.resetCallback)
+        self.w.values = TextBox((230, 132, 200, 17), "")
+
+        if drawGrid:
+            self.drawGrid()
+
+        self.w.open()
+
+    def resetCallback(self, sender):
+        self.model.update(dict(name="Untitled", size=12, bold=False, style=0))
+
+    def modelCallback(self, model, keyPaths):
+        self.w.values.set("changed: %s" % ", ".join(keyPaths))
+
+
 class ToolbarTest(BaseTest):
 
     def __init__(self, drawGrid=False):
@@ -557,7 +713,7 @@ class TestSplitView(BaseTest):
 class Test(object):
 
     def __init__(self):
-        self.w = FloatingWindow((200, 300, 120, 340))
+        self.w = FloatingWindow((200, 300, 120, 460))
         self.w.drawGrid = CheckBox((10, 10, -10, 22), "Draw Grid", value=False)
         self.w.windows = Button((10, 40, -10, 20), "Windows", callback=self.openTestCallback)
         self.w.geometry = Button((10, 70, -10, 20), "Geometry", callback=self.openTestCallback)
@@ -569,6 +725,10 @@ class Test(object):
         self.w.toolbar = Button((10, 250, -10, 20), "Toolbar", callback=self.openTestCallback)
         self.w.misc = Button((10, 280, -10, 20), "Misc.", callback=self.openTestCallback)
         self.w.split = Button((10, 310, -10, 20), "SplitView", callback=self.openTestCallback)
+        self.w.textEditor = Button((10, 340, -10, 20), "Text Editor", callback=self.openTestCallback)
+        self.w.lazyTabs = Button((10, 370, -10, 20), "Lazy Tabs", callback=self.openTestCallback)
+        self.w.virtualRows = Button((10, 400, -10, 20), "Virtual Rows", callback=self.openTestCallback)
+        self.w.bind = Button((10, 430, -10, 20), "Bind", callback=self.openTestCallback)
         self.w.open()
 
     def openTestCallback(self, sender):
@@ -594,6 +754,14 @@ class Test(object):
             MiscTest(self.w.drawGrid.get())
         elif title == "SplitView":
             TestSplitView(self.w.drawGrid.get())
+        elif title == "Text Editor":
+            TextEditorTest(self.w.drawGrid.get())
+        elif title == "Lazy Tabs":
+            LazyTabsTest(self.w.drawGrid.get())
+        elif title == "Virtual Rows":
+            VirtualRowViewTest(self.w.drawGrid.get())
+        elif title == "Bind":
+            BindTest(self.w.drawGrid.get())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import sys
+import types
+import unittest
+from vanilla.vanillaBase import VanillaCallbackWrapper
+
+
+def _coroutine(function):
+    function._isCoroutine = True
+    return function
+
+
+class _FakeTrollius(types.ModuleType):
+
+    # like trollius, takes any generator for a coroutine
+
+    def __init__(self):
+        super(_FakeTrollius, self).__init__("trollius")
+        self.scheduled = []
+
+    def iscoroutine(self, obj):
+        return isinstance(obj, types.GeneratorType)
+
+    def iscoroutinefunction(self, function):
+        return getattr(function, "_isCoroutine", False)
+
+    def ensure_future(self, coroutine):
+        self.scheduled.append(coroutine)
+        return coroutine
+
+
+class CoroutineCallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trollius = _FakeTrollius()
+        self.savedModule = sys.modules.get("trollius")
+        sys.modules["trollius"] = self.trollius
+
+    def tearDown(self):
+        if self.savedModule is None:
+            del sys.modules["trollius"]
+        else:
+            sys.modules["trollius"] = self.savedModule
+
+    def testCoroutineFunctionIsScheduled(self):
+        @_coroutine
+        def callback(sender):
+            yield
+        VanillaCallbackWrapper(callback).action_(None)
+        self.assertEqual(len(self.trollius.scheduled), 1)
+
+    def testReturnedGeneratorIsNotScheduled(self):
+        def callback(sender):
+            return (i for i in range(3))
+        VanillaCallbackWrapper(callback).action_(None)
+        self.assertEqual(self.trollius.scheduled, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
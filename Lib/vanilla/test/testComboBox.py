@@ -0,0 +1,40 @@
+import unittest
+from AppKit import NSNotFound
+from vanilla.vanillaComboBox import VanillaComboBoxDataSource
+
+
+class ComboBoxDataSourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dataSource = VanillaComboBoxDataSource.alloc().init()
+        self.dataSource.setItems_(["banana", "Apple", "apricot", "Berry", "cherry"])
+
+    def complete(self, string):
+        return self.dataSource.comboBox_completedString_(None, string)
+
+    def testCompletion(self):
+        self.assertEqual(self.complete("ch"), "cherry")
+        self.assertEqual(self.complete("apr"), "apricot")
+        self.assertEqual(self.complete("x"), None)
+        self.assertEqual(self.complete(""), None)
+
+    def testCompletionIgnoresCase(self):
+        self.assertEqual(self.complete("APP"), "Apple")
+        self.assertEqual(self.complete("ber"), "Berry")
+        # the first item in alphabetical order, not in the order of the character codes
+        self.assertEqual(self.complete("b"), "banana")
+        self.assertEqual(self.complete("a"), "Apple")
+
+    def testSetItems(self):
+        self.complete("a")
+        self.dataSource.setItems_(["avocado"])
+        self.assertEqual(self.complete("a"), "avocado")
+        self.assertEqual(self.dataSource.numberOfItemsInComboBox_(None), 1)
+
+    def testIndexOfItem(self):
+        self.assertEqual(self.dataSource.comboBox_indexOfItemWithStringValue_(None, "Berry"), 3)
+        self.assertEqual(self.dataSource.comboBox_indexOfItemWithStringValue_(None, "berry"), NSNotFound)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import time
+import threading
+import unittest
+from vanilla.vanillaDispatch import _MainThreadQueue
+
+
+def _drainUntilDone(queue, thread):
+    # there is no run loop here, so drain the queue by hand
+    deadline = time.time() + 5
+    while (thread.isAlive() or queue._calls) and time.time() < deadline:
+        queue._drain()
+        time.sleep(0.001)
+
+
+class MainThreadQueueTest(unittest.TestCase):
+
+    def testOrder(self):
+        queue = _MainThreadQueue()
+        calls = []
+        def put():
+            for i in xrange(1000):
+                queue.put(calls.append, (i,), {})
+        thread = threading.Thread(target=put)
+        thread.start()
+        _drainUntilDone(queue, thread)
+        self.assertEqual(calls, range(1000))
+
+    def testBackPressure(self):
+        queue = _MainThreadQueue()
+        queue.maxSize = 10
+        calls = []
+        def put():
+            for i in xrange(25):
+                queue.put(calls.append, (i,), {})
+        thread = threading.Thread(target=put)
+        thread.setDaemon(True)
+        thread.start()
+        deadline = time.time() + 5
+        while len(queue._calls) < queue.maxSize and time.time() < deadline:
+            time.sleep(0.001)
+        # the thread waits for the main thread to catch up
+        time.sleep(0.05)
+        self.assertTrue(thread.isAlive())
+        self.assertEqual(len(queue._calls), queue.maxSize)
+        _drainUntilDone(queue, thread)
+        self.assertFalse(thread.isAlive())
+        self.assertEqual(calls, range(25))
+
+    def testMainThreadDoesNotWait(self):
+        queue = _MainThreadQueue()
+        queue.maxSize = 10
+        for i in xrange(25):
+            queue.put(lambda: None, (), {})
+        self.assertEqual(len(queue._calls), 25)
+
+    def testResult(self):
+        queue = _MainThreadQueue()
+        future = queue.put(lambda a, b=0: a * b, (3,), dict(b=2))
+        queue._drain()
+        self.assertEqual(future.result(), 6)
+
+    def testException(self):
+        queue = _MainThreadQueue()
+        future = queue.put(lambda: 1 / 0, (), {})
+        queue._drain()
+        self.assertTrue(isinstance(future.exception(), ZeroDivisionError))
+
+    def testCancel(self):
+        queue = _MainThreadQueue()
+        calls = []
+        future = queue.put(calls.append, (1,), {})
+        queue.put(calls.append, (2,), {})
+        future.cancel()
+        queue._drain()
+        self.assertEqual(calls, [2])
+        self.assertTrue(future.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from vanilla.vanillaHighlighter import RegexHighlighter, _shiftGroupReferences
+
+
+rules = {
+    "root" : [
+        ("keyword", r"\b(def|class|return)\b", None),
+        ("string", r"\"[^\"]*\"", None),
+        ("comment", r"/\*", "comment"),
+    ],
+    "comment" : [
+        ("comment", r".*?\*/", "root"),
+        ("comment", r".+", None),
+    ]
+}
+
+
+class RegexHighlighterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.highlighter = RegexHighlighter(rules, {})
+
+    def testInitialState(self):
+        self.assertEqual(self.highlighter.initialState, "root")
+
+    def testTokens(self):
+        tokens, state = self.highlighter.tokenizeLine('def f(): return "x"', "root")
+        self.assertEqual(tokens, [(0, 3, "keyword"), (9, 6, "keyword"), (16, 3, "string")])
+        self.assertEqual(state, "root")
+
+    def testStateChanges(self):
+        tokens, state = self.highlighter.tokenizeLine("a /* b", "root")
+        self.assertEqual(tokens, [(2, 2, "comment"), (4, 2, "comment")])
+        self.assertEqual(state, "comment")
+        tokens, state = self.highlighter.tokenizeLine("still a comment", state)
+        self.assertEqual(tokens, [(0, 15, "comment")])
+        self.assertEqual(state, "comment")
+        tokens, state = self.highlighter.tokenizeLine("c */ return", state)
+        self.assertEqual(tokens, [(0, 4, "comment"), (5, 6, "keyword")])
+        self.assertEqual(state, "root")
+
+    def testEmptyLineKeepsState(self):
+        self.assertEqual(self.highlighter.tokenizeLine("", "comment"), ([], "comment"))
+        self.assertEqual(self.highlighter.tokenizeLine("", "root"), ([], "root"))
+
+    def testRulesWithoutStates(self):
+        highlighter = RegexHighlighter([("number", r"\d+")], {})
+        self.assertEqual(highlighter.tokenizeLine("a 12 b 3", "root"), ([(2, 2, "number"), (7, 1, "number")], "root"))
+
+    def testEmptyMatches(self):
+        highlighter = RegexHighlighter([("a", r"a*")], {})
+        self.assertEqual(highlighter.tokenizeLine("baab", "root"), ([(1, 2, "a")], "root"))
+
+    def testBackreferences(self):
+        highlighter = RegexHighlighter([("string", r"""(['"]).*?\1"""), ("number", r"(\d)\1")], {})
+        tokens, state = highlighter.tokenizeLine("""a 'x"y' "z" 11 12""", "root")
+        self.assertEqual(tokens, [(2, 5, "string"), (8, 3, "string"), (12, 2, "number")])
+
+    def testShiftGroupReferences(self):
+        self.assertEqual(_shiftGroupReferences(r"(a)\1", 3), r"(a)(?:\4)")
+        self.assertEqual(_shiftGroupReferences(r"(a)(?(1)b|c)", 3), r"(a)(?(4)b|c)")
+        # escaped backslashes, character sets and octal escapes are no references
+        self.assertEqual(_shiftGroupReferences(r"\\1[\1]\0\101", 3), r"\\1[\1]\0\101")
+        self.assertEqual(_shiftGroupReferences(r"[]\1]\1", 3), r"[]\1](?:\4)")
+
+
+if __name__ == "__main__":
+    unittest.main()
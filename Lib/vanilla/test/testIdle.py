@@ -0,0 +1,33 @@
+import unittest
+from vanilla.vanillaBase import VanillaError
+from vanilla.vanillaIdle import IdleWindowBuilder
+
+
+def buildNothing():
+    yield
+    yield
+
+
+class IdleWindowBuilderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.builder = IdleWindowBuilder()
+
+    def tearDown(self):
+        self.builder.forget("window")
+
+    def testFactoryWithoutWindow(self):
+        self.builder.declare("window", buildNothing)
+        try:
+            self.builder.open("window")
+        except VanillaError, e:
+            self.assertTrue("buildNothing" in str(e))
+        else:
+            self.fail("no VanillaError")
+        self.assertFalse(self.builder.isBuilt("window"))
+        # the failed build is forgotten, open() tries again
+        self.assertRaises(VanillaError, self.builder.open, "window")
+
+
+if __name__ == "__main__":
+    unittest.main()
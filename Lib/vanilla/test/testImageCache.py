@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+import vanilla
+from vanilla.vanillaImageCache import ImageCache, _estimateImageCost
+
+vanillaPath = os.path.dirname(os.path.dirname(os.path.dirname(vanilla.__file__)))
+iconPath = os.path.join(vanillaPath, "Data", "testIcon.tif")
+
+
+class ImageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for name in ("a", "b", "c"):
+            path = os.path.join(self.directory, name + ".tif")
+            shutil.copy(iconPath, path)
+            self.paths.append(path)
+        image = ImageCache().getImage(iconPath)
+        self.cost = _estimateImageCost(image)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testHits(self):
+        cache = ImageCache()
+        a, b, c = self.paths
+        image = cache.getImage(a)
+        self.assertTrue(cache.getImage(a) is image)
+        statistics = cache.getStatistics()
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["images"], 1)
+        self.assertEqual(statistics["memoryUsed"], self.cost)
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        cache = ImageCache(memoryBudget=self.cost * 2)
+        a, b, c = self.paths
+        imageA = cache.getImage(a)
+        cache.getImage(b)
+        # a is now more recently used than b
+        cache.getImage(a)
+        cache.getImage(c)
+        statistics = cache.getStatistics()
+        self.assertEqual(statistics["images"], 2)
+        self.assertEqual(statistics["evictions"], 1)
+        self.assertTrue(cache.getImage(a) is imageA)
+        misses = cache.getStatistics()["misses"]
+        cache.getImage(b)
+        self.assertEqual(cache.getStatistics()["misses"], misses + 1)
+
+    def testSmallerBudgetEvicts(self):
+        cache = ImageCache()
+        for path in self.paths:
+            cache.getImage(path)
+        cache.setMemoryBudget(self.cost)
+        statistics = cache.getStatistics()
+        self.assertEqual(statistics["images"], 1)
+        self.assertEqual(statistics["memoryUsed"], self.cost)
+
+    def testMostRecentImageIsKept(self):
+        cache = ImageCache(memoryBudget=1)
+        a, b, c = self.paths
+        cache.getImage(a)
+        cache.getImage(b)
+        self.assertEqual(cache.getStatistics()["images"], 1)
+
+    def testChangedFileIsLoadedAgain(self):
+        cache = ImageCache()
+        a = self.paths[0]
+        image = cache.getImage(a)
+        modified = os.stat(a).st_mtime
+        os.utime(a, (modified + 10, modified + 10))
+        self.assertFalse(cache.getImage(a) is image)
+        statistics = cache.getStatistics()
+        self.assertEqual(statistics["misses"], 2)
+        self.assertEqual(statistics["images"], 1)
+        self.assertEqual(statistics["memoryUsed"], self.cost)
+
+    def testRemoveAndClear(self):
+        cache = ImageCache()
+        a, b, c = self.paths
+        cache.getImage(a)
+        cache.getImage(b)
+        cache.remove(a)
+        statistics = cache.getStatistics()
+        self.assertEqual(statistics["images"], 1)
+        self.assertEqual(statistics["memoryUsed"], self.cost)
+        cache.clear()
+        statistics = cache.getStatistics()
+        self.assertEqual(statistics["images"], 0)
+        self.assertEqual(statistics["memoryUsed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
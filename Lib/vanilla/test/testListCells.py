@@ -0,0 +1,34 @@
+import unittest
+from vanilla.vanillaList import CheckBoxListCell, PopUpButtonListCell, getListCellCacheStatistics, \
+    clearListCellCache
+
+
+class ListCellTest(unittest.TestCase):
+
+    def setUp(self):
+        clearListCellCache()
+
+    def testCellsAreCached(self):
+        hits = getListCellCacheStatistics()["hits"]
+        CheckBoxListCell("a")
+        CheckBoxListCell("a")
+        self.assertEqual(getListCellCacheStatistics()["hits"], hits + 1)
+        self.assertEqual(getListCellCacheStatistics()["size"], 1)
+
+    def testChangingACellDoesNotChangeOthers(self):
+        cell = CheckBoxListCell("a")
+        cell.setEnabled_(False)
+        cell.setTitle_("b")
+        otherCell = CheckBoxListCell("a")
+        self.assertFalse(otherCell is cell)
+        self.assertTrue(otherCell.isEnabled())
+        self.assertEqual(otherCell.title(), "a")
+
+    def testChangingAMenuDoesNotChangeOthers(self):
+        cell = PopUpButtonListCell(["a", "b"])
+        cell.menu().removeAllItems()
+        self.assertEqual(list(PopUpButtonListCell(["a", "b"]).itemTitles()), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
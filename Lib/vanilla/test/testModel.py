@@ -0,0 +1,89 @@
+import unittest
+from vanilla.vanillaModel import ObservableModel
+
+
+class ObservableModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = ObservableModel(dict(name="Untitled", font=dict(family="Times", size=12)))
+        self.calls = []
+
+    def observer(self, model, keyPaths):
+        self.calls.append(keyPaths)
+
+    def testGet(self):
+        self.assertEqual(self.model.get("name"), "Untitled")
+        self.assertEqual(self.model.get("font.size"), 12)
+        self.assertEqual(self.model.get("font"), dict(family="Times", size=12))
+        self.assertEqual(self.model.get("missing"), None)
+        self.assertEqual(self.model.get("font.missing", 0), 0)
+        self.assertEqual(self.model.get("name.missing", 0), 0)
+
+    def testHas(self):
+        self.assertTrue(self.model.has("font.family"))
+        self.assertFalse(self.model.has("font.weight"))
+        self.model.set("value", None)
+        self.assertTrue(self.model.has("value"))
+
+    def testSetCreatesDictionaries(self):
+        self.model.set("color.fill.red", 1)
+        self.assertEqual(self.model.get("color"), dict(fill=dict(red=1)))
+
+    def testUpdate(self):
+        self.model.addObserver(self.observer)
+        self.model.update({"name" : "Document", "font.size" : 14})
+        self.assertEqual(self.model.get("name"), "Document")
+        self.assertEqual(self.model.get("font.size"), 14)
+        self.model._notifyObservers()
+        self.assertEqual(self.calls, [["font.size", "name"]])
+
+    def testChangesAreBatched(self):
+        self.model.addObserver(self.observer)
+        self.model.set("name", "a")
+        self.model.set("font.size", 10)
+        self.model.set("name", "b")
+        self.assertEqual(self.calls, [])
+        self.model._notifyObservers()
+        self.assertEqual(self.calls, [["font.size", "name"]])
+        self.model._notifyObservers()
+        self.assertEqual(len(self.calls), 1)
+
+    def testEqualValueIsNoChange(self):
+        self.model.addObserver(self.observer)
+        self.model.set("name", "Untitled")
+        self.model.set("font.size", 12)
+        self.model._notifyObservers()
+        self.assertEqual(self.calls, [])
+
+    def testKeyPathFiltering(self):
+        self.model.addObserver(self.observer, "font")
+        self.model.set("font.size", 10)
+        self.model.set("fontName", "Times")
+        self.model.set("name", "a")
+        self.model._notifyObservers()
+        # a value the observed dictionary contains
+        self.assertEqual(self.calls, [["font.size"]])
+        self.model.set("font", dict(size=11))
+        self.model._notifyObservers()
+        self.assertEqual(self.calls[-1], ["font"])
+
+    def testParentKeyPath(self):
+        self.model.addObserver(self.observer, "font.size")
+        self.model.set("font", dict(size=11))
+        self.model.set("font.family", "Helvetica")
+        self.model._notifyObservers()
+        # the dictionary that contains the observed value
+        self.assertEqual(self.calls, [["font"]])
+
+    def testRemoveObserver(self):
+        self.model.addObserver(self.observer, "name")
+        self.model.removeObserver(self.observer, "name")
+        # removing an unknown observer does nothing
+        self.model.removeObserver(self.observer)
+        self.model.set("name", "a")
+        self.model._notifyObservers()
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
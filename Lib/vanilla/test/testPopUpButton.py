@@ -0,0 +1,83 @@
+import random
+import unittest
+from AppKit import NSMenuItem
+from vanilla.vanillaPopUpButton import PopUpButton
+
+
+class SetItemsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.popUpButton = PopUpButton((0, 0, 100, 20), ["a", "b", "c", "d"])
+
+    def getTitles(self):
+        return list(self.popUpButton.getNSPopUpButton().itemTitles())
+
+    def assertItemsWork(self, items):
+        self.popUpButton.setItems(items)
+        self.assertEqual(self.getTitles(), items)
+        self.assertEqual(list(self.popUpButton.getItems()), items)
+
+    def testSmallChanges(self):
+        self.assertItemsWork(["a", "x", "c", "d"])
+        self.assertItemsWork(["a", "x", "c", "d", "e"])
+        self.assertItemsWork(["x", "c", "d", "e"])
+
+    def testLargeChanges(self):
+        self.assertItemsWork(["v", "w", "x", "y", "z"])
+        self.assertItemsWork([])
+        self.assertItemsWork(["a"])
+
+    def testDuplicateTitles(self):
+        self.assertItemsWork(["a", "a", "b", "b"])
+        self.assertItemsWork(["a", "b", "a", "b", "a"])
+
+    def testMenuChangedDirectly(self):
+        button = self.popUpButton.getNSPopUpButton()
+        button.menu().removeItemAtIndex_(0)
+        self.assertItemsWork(["a", "b", "c", "d"])
+        button.addItemWithTitle_("e")
+        self.assertItemsWork(["a", "b", "c", "d"])
+        button.menu().itemAtIndex_(0).setTitle_("x")
+        self.assertItemsWork(["a", "b", "c", "d"])
+
+    def testMenuItems(self):
+        items = [NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(title, None, "") for title in "xyz"]
+        self.popUpButton.setItems(items)
+        self.assertEqual(self.getTitles(), ["x", "y", "z"])
+        # the same menu items can be set again
+        self.popUpButton.setItems(items + ["t", "u", "v", "w"])
+        self.assertEqual(self.getTitles(), ["x", "y", "z", "t", "u", "v", "w"])
+
+    def testSelectionFollowsItem(self):
+        self.popUpButton.set(2)
+        self.popUpButton.setItems(["x", "a", "b", "c", "d"])
+        self.assertEqual(self.popUpButton.get(), 3)
+        self.popUpButton.setItems(["c", "x"])
+        self.assertEqual(self.popUpButton.get(), 0)
+        self.popUpButton.setItems(["y", "z"])
+        self.assertEqual(self.popUpButton.get(), 0)
+
+    def testRandomChanges(self):
+        randomGenerator = random.Random(1)
+        items = list(self.popUpButton.getItems())
+        for i in xrange(300):
+            newItems = list(items)
+            for j in xrange(randomGenerator.randint(0, 4)):
+                operation = randomGenerator.random()
+                if operation < 0.4:
+                    newItems.insert(randomGenerator.randint(0, len(newItems)), randomGenerator.choice("abcdefgh"))
+                elif newItems and operation < 0.7:
+                    del newItems[randomGenerator.randrange(len(newItems))]
+                elif newItems:
+                    newItems[randomGenerator.randrange(len(newItems))] = randomGenerator.choice("abcdefgh")
+            if items:
+                self.popUpButton.set(randomGenerator.randrange(len(items)))
+            selected = items[self.popUpButton.get()] if items else None
+            self.assertItemsWork(newItems)
+            if selected in newItems:
+                self.assertEqual(newItems[self.popUpButton.get()], selected)
+            items = newItems
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import time
+import threading
+import unittest
+from vanilla.vanillaDispatch import _getMainThreadQueue
+from vanilla.vanillaProgressBar import ProgressChannel
+
+
+class _FakeIndicator(object):
+
+    def __init__(self):
+        self.value = 0
+
+    def setDoubleValue_(self, value):
+        self.value = value
+
+
+class _FakeProgressBar(object):
+
+    # only what the channel uses
+
+    def __init__(self):
+        self._nsObject = _FakeIndicator()
+
+    def get(self):
+        return self._nsObject.value
+
+
+class ProgressChannelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = _getMainThreadQueue()
+        self.queue.maxSize = 10
+
+    def tearDown(self):
+        del self.queue.maxSize
+        self.queue._drain()
+
+    def testMainThreadCanUseChannelWhileWorkerWaits(self):
+        progressBar = _FakeProgressBar()
+        channel = ProgressChannel(progressBar)
+        # the main thread never waits, so it can fill the queue
+        while len(self.queue._calls) < self.queue.maxSize:
+            self.queue.put(lambda: None, (), {})
+        thread = threading.Thread(target=channel.increment)
+        thread.setDaemon(True)
+        thread.start()
+        time.sleep(0.05)
+        # the worker waits for the main thread to catch up
+        self.assertTrue(thread.isAlive())
+        # and it must not do so holding the lock
+        self.assertTrue(channel._lock.acquire(False))
+        channel._lock.release()
+        channel.set(5)
+        self.assertEqual(channel.get(), 5)
+        deadline = time.time() + 5
+        while (thread.isAlive() or self.queue._calls) and time.time() < deadline:
+            self.queue._drain()
+            time.sleep(0.001)
+        self.assertFalse(thread.isAlive())
+        self.assertEqual(progressBar.get(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
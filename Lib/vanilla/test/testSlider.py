@@ -0,0 +1,86 @@
+import unittest
+from vanilla.vanillaBase import VanillaThrottledCallbackWrapper
+from vanilla.vanillaColorWell import ColorWell
+from vanilla.vanillaLevelIndicator import LevelIndicator
+from vanilla.vanillaSlider import Slider, _snapToStep
+
+
+class SnapToStepTest(unittest.TestCase):
+
+    def testSnap(self):
+        self.assertEqual(_snapToStep(3.7, 0, 10, 1), 4)
+        self.assertEqual(_snapToStep(3.2, 0, 10, 2.5), 2.5)
+        self.assertEqual(_snapToStep(4, 1, 10, 2), 5)
+
+    def testRange(self):
+        self.assertEqual(_snapToStep(-3, 0, 10, 2.5), 0)
+        # 10 is not a multiple of 3 above 0
+        self.assertEqual(_snapToStep(10, 0, 10, 3), 9)
+
+
+class _FakeSender(object):
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class ThrottledCallbackTest(unittest.TestCase):
+
+    def testUnchangedValuesAreSkipped(self):
+        calls = []
+        wrapper = VanillaThrottledCallbackWrapper(calls.append)
+        sender = _FakeSender(1)
+        wrapper._callNow(sender)
+        wrapper._callNow(sender)
+        sender.value = 2
+        wrapper._callNow(sender)
+        self.assertEqual(calls, [sender, sender])
+
+    def testOtherControls(self):
+        callback = lambda sender: None
+        levelIndicator = LevelIndicator((0, 0, 100, 20), callback=callback, throttled=True)
+        self.assertTrue(isinstance(levelIndicator._target, VanillaThrottledCallbackWrapper))
+        colorWell = ColorWell((0, 0, 50, 50), callback=callback, throttled=True)
+        self.assertTrue(isinstance(colorWell._target, VanillaThrottledCallbackWrapper))
+
+
+class SliderStepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = []
+        self.slider = Slider((0, 0, 100, 23), minValue=0, maxValue=10, value=3, step=2.5,
+                            throttled=True, callback=self.sliderCallback)
+        # don't wait between calls
+        self.slider._target.interval = 0
+
+    def sliderCallback(self, sender):
+        self.values.append(sender.get())
+
+    def drag(self, value):
+        nsSlider = self.slider.getNSSlider()
+        nsSlider.setDoubleValue_(value)
+        nsSlider.target().action_(nsSlider)
+
+    def testSet(self):
+        self.assertEqual(self.slider.get(), 2.5)
+        self.slider.set(6.1)
+        self.assertEqual(self.slider.get(), 5)
+        self.assertEqual(self.slider.getNSSlider().doubleValue(), 5)
+
+    def testKnobIsSnapped(self):
+        self.drag(6.1)
+        self.assertEqual(self.slider.getNSSlider().doubleValue(), 5)
+        self.assertEqual(self.values, [5])
+
+    def testChangesSmallerThanStepAreSkipped(self):
+        self.drag(6.1)
+        self.drag(5.4)
+        self.drag(7.6)
+        self.assertEqual(self.values, [5, 7.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+import random
+import unittest
+from AppKit import NSTextStorage
+from vanilla.vanillaTextEditor import TextEditor, _addChangedRange, _LineIndex, _diffText, _moveOffset
+
+
+class ChangedRangeTest(unittest.TestCase):
+
+    def testFirstRange(self):
+        self.assertEqual(_addChangedRange([], (5, 3), 3), [(5, 3)])
+
+    def testRangeBeforeEditIsKept(self):
+        self.assertEqual(_addChangedRange([(0, 2)], (10, 1), 1), [(0, 2), (10, 1)])
+
+    def testRangeAfterEditIsMoved(self):
+        self.assertEqual(_addChangedRange([(20, 5)], (10, 3), 3), [(10, 3), (23, 5)])
+        self.assertEqual(_addChangedRange([(20, 5)], (10, 0), -3), [(10, 0), (17, 5)])
+
+    def testOverlappingRangesAreMerged(self):
+        # two characters at 8 were replaced by four
+        self.assertEqual(_addChangedRange([(5, 5)], (8, 4), 2), [(5, 7)])
+
+    def testTouchingRangesAreMerged(self):
+        self.assertEqual(_addChangedRange([(0, 5)], (5, 2), 2), [(0, 7)])
+        self.assertEqual(_addChangedRange([(5, 3)], (5, 2), 2), [(5, 5)])
+
+    def testDeletedRange(self):
+        # the characters from 2 up to 7 were deleted
+        self.assertEqual(_addChangedRange([(3, 2)], (2, 0), -5), [(2, 0)])
+
+    def testEditJoiningRanges(self):
+        ranges = [(0, 2), (4, 2), (20, 1)]
+        self.assertEqual(_addChangedRange(ranges, (1, 6), 2), [(0, 8), (22, 1)])
+
+
+class _SmallBlockLineIndex(_LineIndex):
+
+    # many blocks for little text
+    blockSize = 3
+
+
+def _replace(textStorage, lineIndex, location, length, replacement):
+    textStorage.replaceCharactersInRange_withString_((location, length), replacement)
+    return lineIndex.textEdited(textStorage, (location, len(replacement)), len(replacement) - length)
+
+
+class LineIndexTest(unittest.TestCase):
+
+    def assertIndexMatches(self, lineIndex, text):
+        lineStarts = [0] + [offset + 1 for offset, character in enumerate(text) if character == "\n"]
+        self.assertEqual(lineIndex.getLineCount(), len(lineStarts))
+        for lineNumber, lineStart in enumerate(lineStarts):
+            self.assertEqual(lineIndex.offsetForLine(lineNumber), lineStart)
+        lineNumber = 0
+        for offset in xrange(len(text) + 1):
+            while lineNumber + 1 < len(lineStarts) and lineStarts[lineNumber + 1] <= offset:
+                lineNumber += 1
+            self.assertEqual(lineIndex.lineForOffset(offset), lineNumber)
+
+    def testLookup(self):
+        text = u"ab\ncd\n\nef"
+        lineIndex = _LineIndex(text)
+        self.assertEqual(lineIndex.getLineCount(), 4)
+        self.assertEqual([lineIndex.offsetForLine(lineNumber) for lineNumber in xrange(4)], [0, 3, 6, 7])
+        self.assertEqual(lineIndex.lineForOffset(2), 0)
+        self.assertEqual(lineIndex.lineForOffset(3), 1)
+        self.assertEqual(lineIndex.lineForOffset(6), 2)
+        self.assertEqual(lineIndex.lineForOffset(9), 3)
+        self.assertRaises(IndexError, lineIndex.offsetForLine, 4)
+        self.assertRaises(IndexError, lineIndex.offsetForLine, -1)
+
+    def testEmptyText(self):
+        lineIndex = _LineIndex(u"")
+        self.assertEqual(lineIndex.getLineCount(), 1)
+        self.assertEqual(lineIndex.offsetForLine(0), 0)
+        self.assertEqual(lineIndex.lineForOffset(0), 0)
+
+    def testBlocks(self):
+        text = u"\n".join(u"line %d" % lineNumber for lineNumber in xrange(20))
+        self.assertIndexMatches(_SmallBlockLineIndex(text), text)
+
+    def testEditResult(self):
+        textStorage = NSTextStorage.alloc().initWithString_(u"a\nb\nc\n")
+        lineIndex = _LineIndex(textStorage.string())
+        # replace "b\nc" with "x"
+        self.assertEqual(_replace(textStorage, lineIndex, 2, 3, u"x"), (1, 1, 0))
+        self.assertIndexMatches(lineIndex, textStorage.string())
+        # insert two lines after "a\n"
+        self.assertEqual(_replace(textStorage, lineIndex, 2, 0, u"y\nz\n"), (1, 0, 2))
+        self.assertIndexMatches(lineIndex, textStorage.string())
+
+    def testRandomEdits(self):
+        randomGenerator = random.Random(1)
+        text = u"".join(randomGenerator.choice(u"ab\n") for i in xrange(50))
+        textStorage = NSTextStorage.alloc().initWithString_(text)
+        lineIndex = _SmallBlockLineIndex(text)
+        for i in xrange(300):
+            length = len(text)
+            location = randomGenerator.randint(0, length)
+            removed = randomGenerator.randint(0, min(length - location, 10))
+            replacement = u"".join(randomGenerator.choice(u"ab\n") for j in xrange(randomGenerator.randint(0, 10)))
+            _replace(textStorage, lineIndex, location, removed, replacement)
+            text = text[:location] + replacement + text[location + removed:]
+            self.assertIndexMatches(lineIndex, text)
+
+
+def _applyDiff(old, edits):
+    # back to front, so the ranges stay valid
+    for location, length, replacement in reversed(edits):
+        old = old[:location] + replacement + old[location + length:]
+    return old
+
+
+class DiffTextTest(unittest.TestCase):
+
+    def assertDiffWorks(self, old, new):
+        edits = _diffText(old, new)
+        self.assertEqual(edits, sorted(edits))
+        for (location, length, replacement), (nextLocation, nextLength, nextReplacement) in zip(edits, edits[1:]):
+            self.assertTrue(location + length <= nextLocation)
+        self.assertEqual(_applyDiff(old, edits), new)
+        return edits
+
+    def testEqualText(self):
+        self.assertEqual(_diffText(u"a\nb\n", u"a\nb\n"), [])
+
+    def testChangedLine(self):
+        old = u"".join(u"line %d\n" % lineNumber for lineNumber in xrange(100))
+        new = old.replace(u"line 50\n", u"line fifty\n")
+        edits = self.assertDiffWorks(old, new)
+        # only the changed characters are replaced
+        self.assertEqual(edits, [(old.index(u"line 50") + 5, 2, u"fifty")])
+
+    def testSeparateChanges(self):
+        old = u"".join(u"line %d\n" % lineNumber for lineNumber in xrange(100))
+        new = old.replace(u"line 10\n", u"").replace(u"line 90\n", u"line 90\nnew line\n")
+        edits = self.assertDiffWorks(old, new)
+        self.assertEqual(len(edits), 2)
+
+    def testSingleLine(self):
+        self.assertEqual(self.assertDiffWorks(u"abcdef", u"abXYef"), [(2, 2, u"XY")])
+
+    def testEmptyText(self):
+        self.assertDiffWorks(u"", u"a\nb\n")
+        self.assertDiffWorks(u"a\nb\n", u"")
+
+    def testRandomChanges(self):
+        randomGenerator = random.Random(1)
+        lines = [u"a\n", u"b\n", u"c\n", u"ab", u"\n"]
+        for i in xrange(500):
+            old = u"".join(randomGenerator.choice(lines) for j in xrange(randomGenerator.randint(0, 10)))
+            new = u"".join(randomGenerator.choice(lines) for j in xrange(randomGenerator.randint(0, 10)))
+            self.assertDiffWorks(old, new)
+
+    def testMoveOffset(self):
+        edits = [(2, 2, u"XYZ"), (10, 3, u"")]
+        self.assertEqual(_moveOffset(1, edits), 1)
+        self.assertEqual(_moveOffset(3, edits), 3)
+        self.assertEqual(_moveOffset(5, edits), 6)
+        self.assertEqual(_moveOffset(11, edits), 11)
+        self.assertEqual(_moveOffset(20, edits), 18)
+
+
+class ApplyEditsTest(unittest.TestCase):
+
+    text = u"".join(u"line %d\n" % lineNumber for lineNumber in xrange(10))
+
+    def setUp(self):
+        self.calls = []
+        self.editor = TextEditor((0, 0, 100, 100), self.text, callback=self.calls.append)
+
+    def tearDown(self):
+        self.editor._breakCycles()
+
+    def testText(self):
+        new = self.text.replace(u"line 2\n", u"line two\n")
+        self.editor.set(new, minimalEdit=True)
+        self.assertEqual(self.editor.get(), new)
+
+    def testSelectionIsMoved(self):
+        start = self.text.index(u"line 5")
+        self.editor.setSelection(start, start + 6)
+        self.editor.set(self.text.replace(u"line 2\n", u"line two\n"), minimalEdit=True)
+        self.assertEqual(self.editor.getSelection(), (start + 2, start + 8))
+
+    def testCallbackIsNotCalled(self):
+        self.editor.set(self.text.replace(u"line 2\n", u""), minimalEdit=True)
+        self.assertEqual(self.calls, [])
+
+    def testEqualText(self):
+        changeCount = self.editor.getChangeCount()
+        self.editor.set(self.text, minimalEdit=True)
+        self.assertEqual(self.editor.getChangeCount(), changeCount)
+
+
+def _referenceTrimLength(text, appendedText, maxLines, maxCharacters):
+    # the start of the first line from which the text fits the limits
+    text = text + appendedText
+    lineStarts = [0] + [offset + 1 for offset, character in enumerate(text) if character == "\n"] + [len(text)]
+    for lineStart in lineStarts:
+        rest = text[lineStart:]
+        if maxLines is not None and rest.count("\n") + 1 > maxLines:
+            continue
+        if maxCharacters is not None and len(rest) > maxCharacters:
+            continue
+        return lineStart
+
+
+class AppendTrimTest(unittest.TestCase):
+
+    def getTrimLength(self, text, appendedText, maxLines=None, maxCharacters=None):
+        editor = TextEditor((0, 0, 100, 100), text)
+        try:
+            editor.setAppendLimits(maxLines, maxCharacters)
+            return editor._getAppendTrimLength(editor.getNSTextView().textStorage(), appendedText)
+        finally:
+            editor._breakCycles()
+
+    def testNoLimits(self):
+        self.assertEqual(self.getTrimLength(u"a\nb\n", u"c\n"), 0)
+
+    def testMaxLines(self):
+        self.assertEqual(self.getTrimLength(u"a\nb\nc", u"\nd", maxLines=2), 4)
+
+    def testTrimPastOldText(self):
+        # the whole old text and the first appended line go
+        self.assertEqual(self.getTrimLength(u"a\nb", u"\nc\nd", maxLines=1), 6)
+
+    def testMaxCharactersKeepsWholeLines(self):
+        self.assertEqual(self.getTrimLength(u"aaa\nbbb\n", u"cc", maxCharacters=5), 8)
+
+    def testRandomLimits(self):
+        randomGenerator = random.Random(1)
+        for i in xrange(200):
+            text = u"".join(randomGenerator.choice(u"ab\n") for j in xrange(randomGenerator.randint(0, 20)))
+            appendedText = u"".join(randomGenerator.choice(u"ab\n") for j in xrange(randomGenerator.randint(1, 20)))
+            maxLines = randomGenerator.choice([None, 1, 2, 5])
+            maxCharacters = randomGenerator.choice([None, 1, 5, 20])
+            self.assertEqual(self.getTrimLength(text, appendedText, maxLines, maxCharacters),
+                _referenceTrimLength(text, appendedText, maxLines, maxCharacters))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import re
+import random
+import unittest
+from AppKit import NSAttributedString
+from vanilla.vanillaDispatch import _getMainThreadQueue
+from vanilla.vanillaTextSearch import _TextSearch, _parseTemplate, _expandTemplate
+
+
+class _SmallChunkTextSearch(_TextSearch):
+
+    # many chunks for little text
+    chunkSize = 7
+
+
+class ChunkedSearchTest(unittest.TestCase):
+
+    def search(self, text, pattern, replacement=None):
+        # run the worker part of a search right here, without a text view
+        textSearch = _SmallChunkTextSearch(None)
+        pattern = re.compile(pattern, re.MULTILINE | re.UNICODE)
+        if replacement is not None:
+            replacement = _parseTemplate(replacement, pattern)
+        textSearch._search(NSAttributedString.alloc().initWithString_(text), pattern, replacement, textSearch._generation)
+        _getMainThreadQueue()._drain()
+        return textSearch._results
+
+    def assertSearchWorks(self, text, pattern):
+        expected = [(match.start(), match.end() - match.start(), None) for match in re.finditer(pattern, text, re.MULTILINE | re.UNICODE) if match.end() > match.start()]
+        self.assertEqual(self.search(text, pattern), expected)
+
+    def testMatchesAcrossChunks(self):
+        text = u"abc abc abc\nabc\n" * 5
+        self.assertSearchWorks(text, u"abc")
+        self.assertSearchWorks(text, u"abc abc")
+
+    def testLinesLongerThanChunks(self):
+        text = u"x" * 20 + u"abcabc" + u"x" * 20 + u"\nabc"
+        self.assertSearchWorks(text, u"abcabc")
+        self.assertSearchWorks(text, u"x+")
+
+    def testLineAnchors(self):
+        text = u"ab\nba\nab ab\n" * 3
+        self.assertSearchWorks(text, u"^a")
+        self.assertSearchWorks(text, u"b$")
+
+    def testRandomText(self):
+        randomGenerator = random.Random(1)
+        for i in xrange(200):
+            text = u"".join(randomGenerator.choice(u"ab \n") for j in xrange(randomGenerator.randint(0, 40)))
+            for pattern in (u"ab+", u"a[ b]*a", u"^b.*$"):
+                self.assertSearchWorks(text, pattern)
+
+    def testReplacements(self):
+        results = self.search(u"a1 b2\nc3", u"([a-z])(\\d)", u"\\2\\1")
+        self.assertEqual(results, [(0, 2, u"1a"), (3, 2, u"2b"), (6, 2, u"3c")])
+
+
+class TemplateTest(unittest.TestCase):
+
+    def testInvalidGroup(self):
+        pattern = re.compile(u"(a)")
+        self.assertRaises(re.error, _parseTemplate, u"\\2", pattern)
+        self.assertRaises(re.error, _parseTemplate, u"\\g<name>", pattern)
+
+    def testUnmatchedGroup(self):
+        pattern = re.compile(u"(a)|(b)")
+        template = _parseTemplate(u"[\\1\\2]", pattern)
+        self.assertEqual(_expandTemplate(template, pattern.match(u"b")), u"[b]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import sys
 from AppKit import *
 from PyObjCTools import AppHelper
 
@@ -17,5 +18,12 @@ def executeVanillaTest(cls, **kwargs):
     app.setDelegate_(delegate)
     cls(**kwargs)
     app.activateIgnoringOtherApps_(True)
+    # run the asyncio event loop if it drives the application
+    asyncio = sys.modules.get("asyncio", sys.modules.get("trollius"))
+    if asyncio is not None:
+        from vanilla.vanillaAsyncio import CocoaEventLoopPolicy
+        if isinstance(asyncio.get_event_loop_policy(), CocoaEventLoopPolicy):
+            asyncio.get_event_loop().run_forever()
+            return
     AppHelper.runEventLoop()
 
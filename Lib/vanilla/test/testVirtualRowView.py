@@ -0,0 +1,53 @@
+import unittest
+from vanilla.vanillaVirtualRowView import VirtualRowView
+
+
+class VirtualRowViewTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bound = []
+        self.view = VirtualRowView((0, 0, 100, 100), 1000, 20,
+                            buildRowCallback=self.buildRow,
+                            bindRowCallback=self.bindRow)
+
+    def tearDown(self):
+        self.view._breakCycles()
+
+    def buildRow(self, row):
+        pass
+
+    def bindRow(self, row, index):
+        self.bound.append((index, row.getValue()))
+
+    def testRowValues(self):
+        self.assertEqual(self.view.getRowValue(500), None)
+        self.assertEqual(self.view.getRowValue(500, 0), 0)
+        self.view.setRowValue(500, 1)
+        self.assertEqual(self.view.getRowValue(500), 1)
+
+    def testRowsShareTheValues(self):
+        row = self.view.getRow(0)
+        row.setValue("a")
+        self.assertEqual(self.view.getRowValue(0), "a")
+        self.view.setRowValue(0, "b")
+        self.assertEqual(row.getValue(), "b")
+        del self.bound[:]
+        self.view.reloadRows([0])
+        self.assertEqual(self.bound, [(0, "b")])
+
+    def testRemovedValuesAreForgotten(self):
+        self.view.setRowValue(10, 1)
+        self.view.setRowValue(900, 1)
+        self.view.setRowCount(100)
+        self.view.setRowCount(1000)
+        self.assertEqual(self.view.getRowValue(10), 1)
+        self.assertEqual(self.view.getRowValue(900), None)
+
+    def testClearRowValues(self):
+        self.view.setRowValue(10, 1)
+        self.view.clearRowValues()
+        self.assertEqual(self.view.getRowValue(10), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
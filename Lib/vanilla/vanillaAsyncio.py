@@ -0,0 +1,178 @@
+from AppKit import NSApplication, NSApplicationDefined, NSAnyEventMask, NSDefaultRunLoopMode, \
+        NSDate, NSEvent, NSThread
+from CoreFoundation import CFFileDescriptorCreate, CFFileDescriptorCreateRunLoopSource, \
+        CFFileDescriptorEnableCallBacks, CFFileDescriptorInvalidate, kCFFileDescriptorReadCallBack, \
+        CFRunLoopAddSource, CFRunLoopGetMain, kCFRunLoopCommonModes
+
+# trollius is the asyncio backport for Python 2
+try:
+    import asyncio
+except ImportError:
+    import trollius as asyncio
+
+selectors = asyncio.selector_events.selectors
+
+
+__all__ = ["CocoaEventLoop", "CocoaEventLoopPolicy"]
+
+
+# the subtype of the events that are posted to wake up the event loop
+_wakeUpEventSubtype = 0x5641
+
+_applicationLaunched = False
+
+def _finishLaunching():
+    global _applicationLaunched
+    app = NSApplication.sharedApplication()
+    # NSApplication.run() has already done this
+    if _applicationLaunched or app.isRunning():
+        return
+    app.finishLaunching()
+    _applicationLaunched = True
+
+
+class _CocoaSelector(selectors.KqueueSelector):
+
+    """
+    A selector that waits for application events instead of blocking
+    in the kqueue.
+
+    The kqueue itself is watched by the main run loop, so it becomes
+    readable as soon as any registered file descriptor is ready. When
+    that happens, a private event is posted to wake up the application.
+    """
+
+    def __init__(self):
+        super(_CocoaSelector, self).__init__()
+        self._waiting = False
+        self._fileDescriptor = CFFileDescriptorCreate(None, self.fileno(), False, self._fileDescriptorCallback, None)
+        source = CFFileDescriptorCreateRunLoopSource(None, self._fileDescriptor, 0)
+        CFRunLoopAddSource(CFRunLoopGetMain(), source, kCFRunLoopCommonModes)
+
+    def close(self):
+        if self._fileDescriptor is not None:
+            CFFileDescriptorInvalidate(self._fileDescriptor)
+            self._fileDescriptor = None
+        super(_CocoaSelector, self).close()
+
+    def _fileDescriptorCallback(self, fileDescriptor, callBackTypes, info):
+        self.wakeUp()
+
+    def wakeUp(self):
+        if not self._waiting:
+            return
+        self._waiting = False
+        event = NSEvent.otherEventWithType_location_modifierFlags_timestamp_windowNumber_context_subtype_data1_data2_(
+            NSApplicationDefined, (0, 0), 0, 0, 0, None, _wakeUpEventSubtype, 0, 0)
+        NSApplication.sharedApplication().postEvent_atStart_(event, False)
+
+    def select(self, timeout=None):
+        ready = super(_CocoaSelector, self).select(0)
+        if ready or (timeout is not None and timeout <= 0):
+            return ready
+        self._waitForEvent(timeout)
+        return super(_CocoaSelector, self).select(0)
+
+    def _waitForEvent(self, timeout):
+        app = NSApplication.sharedApplication()
+        if timeout is None:
+            date = NSDate.distantFuture()
+        else:
+            date = NSDate.dateWithTimeIntervalSinceNow_(timeout)
+        # the callback is disabled every time it fires
+        CFFileDescriptorEnableCallBacks(self._fileDescriptor, kCFFileDescriptorReadCallBack)
+        self._waiting = True
+        try:
+            event = app.nextEventMatchingMask_untilDate_inMode_dequeue_(NSAnyEventMask, date, NSDefaultRunLoopMode, True)
+        finally:
+            self._waiting = False
+        if event is None:
+            return
+        if event.type() == NSApplicationDefined and event.subtype() == _wakeUpEventSubtype:
+            return
+        app.sendEvent_(event)
+        app.updateWindows()
+
+
+class CocoaEventLoop(asyncio.SelectorEventLoop):
+
+    """
+    An asyncio event loop that runs the application on the main thread.
+
+    While the event loop has nothing to do, it waits for application events
+    and dispatches them, so windows, coroutines, timers and callbacks all
+    share the main thread. Nothing is polled. The loop wakes up when an
+    event arrives, when the next timer is due or when a file descriptor
+    that the loop is watching becomes ready.
+
+    Run this loop instead of *AppHelper.runEventLoop()*. The easiest way
+    to do that is by installing a :class:`CocoaEventLoopPolicy`.
+    """
+
+    def __init__(self):
+        super(CocoaEventLoop, self).__init__(_CocoaSelector())
+
+    def run_forever(self):
+        _finishLaunching()
+        super(CocoaEventLoop, self).run_forever()
+
+    # Calls that are scheduled by run loop sources, such as timers or
+    # callOnMain, do not end the wait for the next event on their own.
+
+    def call_soon(self, *args, **kwargs):
+        handle = super(CocoaEventLoop, self).call_soon(*args, **kwargs)
+        self._selector.wakeUp()
+        return handle
+
+    def call_at(self, *args, **kwargs):
+        handle = super(CocoaEventLoop, self).call_at(*args, **kwargs)
+        self._selector.wakeUp()
+        return handle
+
+    def stop(self):
+        super(CocoaEventLoop, self).stop()
+        self._selector.wakeUp()
+
+
+class CocoaEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+
+    """
+    An asyncio event loop policy that uses a :class:`CocoaEventLoop` for
+    the main thread. Other threads get the default event loop.
+
+    Importing asyncio, or trollius, takes time, so the event loop is not
+    imported by *vanilla*. Import it from *vanilla.vanillaAsyncio*.::
+
+        import trollius as asyncio
+        from trollius import From
+        from vanilla import *
+        from vanilla.vanillaAsyncio import CocoaEventLoopPolicy
+
+        class AsyncioDemo(object):
+
+            def __init__(self):
+                self.w = Window((200, 70))
+                self.w.textBox = TextBox((10, 10, -10, 17), "")
+                self.w.button = Button((10, 40, -10, 20), "Count",
+                                callback=self.buttonCallback)
+                self.w.open()
+
+            @asyncio.coroutine
+            def buttonCallback(self, sender):
+                for i in range(5):
+                    self.w.textBox.set(str(i))
+                    yield From(asyncio.sleep(1))
+
+        asyncio.set_event_loop_policy(CocoaEventLoopPolicy())
+        AsyncioDemo()
+        asyncio.get_event_loop().run_forever()
+
+    Callbacks that are coroutine functions are scheduled on the event loop
+    automatically.
+    """
+
+    def new_event_loop(self):
+        if NSThread.isMainThread():
+            return CocoaEventLoop()
+        return super(CocoaEventLoopPolicy, self).new_event_loop()
+
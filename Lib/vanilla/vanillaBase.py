@@ -1,3 +1,6 @@
+import sys
+import time
+import functools
 from AppKit import *
 from nsSubclasses import getNSSubclass
 
@@ -5,6 +8,53 @@ from nsSubclasses import getNSSubclass
 class VanillaError(Exception): pass
 
 
+# The active Tracer, if any. Everything below
+# costs next to nothing while this is None.
+
+_tracer = None
+
+class _TraceSpan(object):
+
+    def __init__(self, tracer, name, category):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, excType, excValue, excTraceback):
+        self.tracer.addSpan(self.name, self.category, self.start, time.time())
+
+
+class _NoTraceSpan(object):
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, excType, excValue, excTraceback):
+        pass
+
+_noTraceSpan = _NoTraceSpan()
+
+def _traceSpan(name, category):
+    if _tracer is None:
+        return _noTraceSpan
+    return _TraceSpan(_tracer, name, category)
+
+def _traced(category):
+    # a method decorator that records a span named after the class and method
+    def decorator(method):
+        @functools.wraps(method)
+        def tracedMethod(self, *args, **kwargs):
+            if _tracer is None:
+                return method(self, *args, **kwargs)
+            with _TraceSpan(_tracer, "%s.%s" % (self.__class__.__name__, method.__name__), category):
+                return method(self, *args, **kwargs)
+        return tracedMethod
+    return decorator
+
+
 class VanillaBaseObject(object):
 
     frameAdjustments = None
@@ -38,7 +88,10 @@ class VanillaBaseObject(object):
 
     def _setCallback(self, callback):
         if callback is not None:
-            self._target = VanillaCallbackWrapper(callback)
+            if getattr(self, "_throttleCallback", False):
+                self._target = VanillaThrottledCallbackWrapper(callback)
+            else:
+                self._target = VanillaCallbackWrapper(callback)
             self._nsObject.setTarget_(self._target)
             self._nsObject.setAction_("action:")
 
@@ -117,6 +170,7 @@ class VanillaBaseObject(object):
         """
         return self._posSize
 
+    @_traced("layout")
     def setPosSize(self, posSize):
         """
         Set the postion and size of the object.
@@ -193,7 +247,138 @@ class VanillaCallbackWrapper(NSObject):
         if hasattr(sender, "vanillaWrapper"):
             sender = sender.vanillaWrapper()
         if self.callback is not None:
-            self.callback(sender)
+            self._callCallback(sender)
+
+    def _callCallback(self, sender):
+        # The callback may be replaced after the wrapper has been
+        # created, so look at the one that is called.
+        callback = self.callback
+        result = _runCallback(callback, sender)
+        if _isCoroutineFunction(callback):
+            _scheduleCoroutine(result)
+
+
+
+_noValue = object()
+
+class VanillaThrottledCallbackWrapper(VanillaCallbackWrapper):
+
+    # Calls the callback at most once per interval, with the latest
+    # value, and only if the value of the sender has changed. A call
+    # that is made while the mouse button goes up is never skipped.
+
+    interval = 1.0 / 60
+
+    def initWithCallback_(self, callback):
+        self = super(VanillaThrottledCallbackWrapper, self).initWithCallback_(callback)
+        self._lastCallTime = 0
+        self._lastValue = _noValue
+        self._pendingSender = None
+        return self
+
+    def action_(self, sender):
+        if hasattr(sender, "vanillaWrapper"):
+            sender = sender.vanillaWrapper()
+        if self.callback is None:
+            return
+        event = NSApplication.sharedApplication().currentEvent()
+        if event is not None and event.type() == NSLeftMouseUp:
+            self._cancelPendingCall()
+            self._lastValue = _noValue
+            self._callNow(sender)
+            return
+        delay = self._lastCallTime + self.interval - time.time()
+        if delay <= 0:
+            self._cancelPendingCall()
+            self._callNow(sender)
+        elif self._pendingSender is None:
+            # a timer in the common modes fires while the mouse is tracked
+            self._pendingSender = sender
+            self.performSelector_withObject_afterDelay_inModes_("callPending:", None, delay, [NSRunLoopCommonModes])
+        else:
+            self._pendingSender = sender
+
+    def callPending_(self, obj):
+        sender = self._pendingSender
+        self._pendingSender = None
+        if sender is not None and self.callback is not None:
+            self._callNow(sender)
+
+    def _cancelPendingCall(self):
+        if self._pendingSender is not None:
+            self._pendingSender = None
+            NSObject.cancelPreviousPerformRequestsWithTarget_selector_object_(self, "callPending:", None)
+
+    def _callNow(self, sender):
+        value = sender.get()
+        if value == self._lastValue:
+            return
+        self._lastValue = value
+        self._lastCallTime = time.time()
+        self._callCallback(sender)
+
+
+# Objects that are told about every callback that is run.
+# They must implement willRunCallback(callback), which may
+# return a token, and didRunCallback(callback, token).
+
+_callbackHooks = []
+
+def _addCallbackHook(hook):
+    if hook not in _callbackHooks:
+        _callbackHooks.append(hook)
+
+def _removeCallbackHook(hook):
+    if hook in _callbackHooks:
+        _callbackHooks.remove(hook)
+
+def _runCallback(callback, *args):
+    if not _callbackHooks:
+        return callback(*args)
+    hooks = list(_callbackHooks)
+    tokens = [hook.willRunCallback(callback) for hook in hooks]
+    try:
+        return callback(*args)
+    finally:
+        for hook, token in reversed(zip(hooks, tokens)):
+            hook.didRunCallback(callback, token)
+
+def _callbackName(callback):
+    name = getattr(callback, "__name__", None)
+    if name is None:
+        return repr(callback)
+    owner = getattr(callback, "im_self", getattr(callback, "__self__", None))
+    if owner is not None:
+        return "%s.%s" % (owner.__class__.__name__, name)
+    module = getattr(callback, "__module__", None)
+    if module is not None:
+        return "%s.%s" % (module, name)
+    return name
+
+
+def _scheduleCoroutine(result):
+    # Schedule the coroutine returned by a coroutine function, see
+    # _isCoroutineFunction. Don't decide by looking at the result,
+    # trollius takes any generator for a coroutine.
+    # This returns the task, or None if result is no coroutine.
+    for moduleName in ("asyncio", "trollius"):
+        module = sys.modules.get(moduleName)
+        if module is None or not module.iscoroutine(result):
+            continue
+        ensureFuture = getattr(module, "ensure_future", None)
+        if ensureFuture is None:
+            ensureFuture = getattr(module, "async")
+        return ensureFuture(result)
+    return None
+
+def _isCoroutineFunction(function):
+    # A coroutine function is only possible if asyncio, or
+    # trollius, has been imported, so don't import either one here.
+    for moduleName in ("asyncio", "trollius"):
+        module = sys.modules.get(moduleName)
+        if module is not None and module.iscoroutinefunction(function):
+            return True
+    return False
 
 
 _sizeStyleMap = {
@@ -247,10 +432,11 @@ def _breakCycles(view):
 def _setAttr(cls, obj, attr, value):
     if isinstance(value, VanillaBaseObject):
         assert not hasattr(obj, attr), "can't replace vanilla attribute"
-        view = obj._getContentView()
-        frame = view.frame()
-        value._setFrame(frame)
-        view.addSubview_(value._nsObject)
+        with _traceSpan("%s.%s" % (obj.__class__.__name__, attr), "attach"):
+            view = obj._getContentView()
+            frame = view.frame()
+            value._setFrame(frame)
+            view.addSubview_(value._nsObject)
     #elif isinstance(value, NSView) and not attr.startswith("_"):
     #    assert not hasattr(obj, attr), "can't replace vanilla attribute"
     #    view = obj._getContentView()
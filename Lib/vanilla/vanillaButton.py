@@ -1,5 +1,6 @@
 from AppKit import *
 from vanillaBase import VanillaBaseControl
+from vanillaImageCache import _imageFromPath
 
 
 _modifierMap = {
@@ -273,7 +274,7 @@ class ImageButton(SquareButton):
         super(ImageButton,  self).__init__(posSize, title=title, callback=callback, sizeStyle=sizeStyle)
         image = None
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = _imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -306,7 +307,7 @@ class ImageButton(SquareButton):
         *Only one of imagePath, imageNamed, imageObject should be set.*
         """
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = _imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -32,11 +32,17 @@ class ColorWell(VanillaBaseObject):
     **callback** The method to be caled when the user selects a new color.
 
     **color** A *NSColor* object. If *None* is given, the color shown will be white.
+
+    **throttled** Boolean representing if the callback should be called at most
+    once per screen refresh while a color is being dragged in the color panel,
+    and only when the color has changed. The callback is always called when the
+    mouse button is released.
     """
 
     nsColorWellClass = NSColorWell
 
-    def __init__(self, posSize, callback=None, color=None):
+    def __init__(self, posSize, callback=None, color=None, throttled=False):
+        self._throttleCallback = throttled
         self._setupView(self.nsColorWellClass, posSize, callback=callback)
         if color is not None:
             self._nsObject.setColor_(color)
@@ -1,4 +1,5 @@
-from AppKit import NSObject, NSComboBox
+from bisect import bisect_left
+from AppKit import NSObject, NSComboBox, NSNotFound
 from vanillaBase import VanillaBaseControl
 
 
@@ -22,10 +23,66 @@ class VanillaComboBoxDelegate(NSObject):
 
     def comboBoxSelectionDidChange_(self, notification):
         obj = notification.object()
-        obj.setObjectValue_(obj.objectValueOfSelectedItem())
+        if obj.usesDataSource():
+            index = obj.indexOfSelectedItem()
+            if index == -1:
+                return
+            obj.setObjectValue_(obj.dataSource().comboBox_objectValueForItemAtIndex_(obj, index))
+        else:
+            obj.setObjectValue_(obj.objectValueOfSelectedItem())
         self._callVanillaCallback(notification)
 
 
+class VanillaComboBoxDataSource(NSObject):
+
+    """
+    Serves the items of a combo box from Python.
+
+    The indexes used for completion and for looking up items are built
+    when they are first needed, so setting the items only copies them.
+    Completion is a binary search in a copy of the items that is sorted
+    without regard to case, as completion ignores case.
+    """
+
+    def init(self):
+        self = super(VanillaComboBoxDataSource, self).init()
+        self.setItems_([])
+        return self
+
+    def setItems_(self, items):
+        self._items = list(items)
+        self._sortedKeys = None
+        self._sortedItems = None
+        self._itemIndexes = None
+
+    def numberOfItemsInComboBox_(self, comboBox):
+        return len(self._items)
+
+    def comboBox_objectValueForItemAtIndex_(self, comboBox, index):
+        return self._items[index]
+
+    def comboBox_completedString_(self, comboBox, string):
+        if not string:
+            return None
+        if self._sortedKeys is None:
+            sortedItems = sorted((item.lower(), item) for item in self._items)
+            self._sortedKeys = [key for key, item in sortedItems]
+            self._sortedItems = [item for key, item in sortedItems]
+        sortedKeys = self._sortedKeys
+        key = string.lower()
+        index = bisect_left(sortedKeys, key)
+        if index < len(sortedKeys) and sortedKeys[index].startswith(key):
+            return self._sortedItems[index]
+        return None
+
+    def comboBox_indexOfItemWithStringValue_(self, comboBox, string):
+        if self._itemIndexes is None:
+            self._itemIndexes = itemIndexes = {}
+            for index, item in enumerate(self._items):
+                itemIndexes.setdefault(item, index)
+        return self._itemIndexes.get(string, NSNotFound)
+
+
 class ComboBox(VanillaBaseControl):
 
     """
@@ -64,6 +121,13 @@ class ComboBox(VanillaBaseControl):
 
     **completes** Boolean representing if the combo box auto completes entered text.
 
+    **usesDataSource** Boolean representing if the items are served to the combo box
+    from Python instead of being copied into it. Use this for very long lists of
+    items. Setting the items is then much faster and completion takes about as long
+    for a million items as for ten. As without a data source, completion ignores
+    case, but entered text is completed with the first matching item in
+    alphabetical order instead of list order.
+
     **continuous** If True, the callback (if any) will be called upon each keystroke, if False, only call the callback when
     editing finishes or after item selection. Default is False.
 
@@ -92,11 +156,16 @@ class ComboBox(VanillaBaseControl):
     }
 
     def __init__(self, posSize, items, completes=True, continuous=False,
-            callback=None, formatter=None, sizeStyle="regular"):
+            callback=None, formatter=None, sizeStyle="regular", usesDataSource=False):
         self._continuous = continuous
         self._setupView(self.nsComboBoxClass, posSize, callback=callback)
         self._setSizeStyle(sizeStyle)
-        self._nsObject.addItemsWithObjectValues_(items)
+        self._dataSource = None
+        if usesDataSource:
+            self._dataSource = VanillaComboBoxDataSource.alloc().init()
+            self._nsObject.setUsesDataSource_(True)
+            self._nsObject.setDataSource_(self._dataSource)
+        self._setItems(items)
         self._nsObject.setCompletes_(completes)
         if formatter is not None:
             self._nsObject.cell().setFormatter_(formatter)
@@ -104,6 +173,9 @@ class ComboBox(VanillaBaseControl):
     def _breakCycles(self):
         super(ComboBox, self)._breakCycles()
         self._delegate = None
+        if self._dataSource is not None:
+            self._nsObject.setDataSource_(None)
+            self._dataSource = None
 
     def _setCallback(self, callback):
         super(ComboBox, self)._setCallback(callback)
@@ -138,5 +210,12 @@ class ComboBox(VanillaBaseControl):
 
         **items** A list of strings to set in the combo box list.
         """
-        self._nsObject.removeAllItems()
-        self._nsObject.addItemsWithObjectValues_(items)
+        self._setItems(items)
+
+    def _setItems(self, items):
+        if self._dataSource is not None:
+            self._dataSource.setItems_(items)
+            self._nsObject.reloadData()
+        else:
+            self._nsObject.removeAllItems()
+            self._nsObject.addItemsWithObjectValues_(items)
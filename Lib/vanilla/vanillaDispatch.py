@@ -0,0 +1,300 @@
+import sys
+import time
+import threading
+import traceback
+import multiprocessing
+from collections import deque
+from AppKit import NSObject, NSThread
+from vanillaBase import VanillaError
+
+try:
+    from concurrent.futures import Future, CancelledError, TimeoutError, \
+        ThreadPoolExecutor, ProcessPoolExecutor
+except ImportError:
+    Future = None
+    ThreadPoolExecutor = ProcessPoolExecutor = None
+
+    class CancelledError(Exception): pass
+
+    class TimeoutError(Exception): pass
+
+
+__all__ = ["callOnMain", "callAfter"]
+
+
+class _Future(object):
+
+    # A minimal stand in for concurrent.futures.Future
+    # for when the futures package is not installed.
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._state = "pending"
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def cancel(self):
+        with self._condition:
+            if self._state != "pending":
+                return self._state == "cancelled"
+            self._state = "cancelled"
+            self._condition.notifyAll()
+        self._invokeCallbacks()
+        return True
+
+    def cancelled(self):
+        return self._state == "cancelled"
+
+    def running(self):
+        return self._state == "running"
+
+    def done(self):
+        return self._state in ("cancelled", "finished")
+
+    def set_running_or_notify_cancel(self):
+        with self._condition:
+            if self._state == "cancelled":
+                return False
+            self._state = "running"
+            return True
+
+    def set_result(self, result):
+        with self._condition:
+            self._result = result
+            self._state = "finished"
+            self._condition.notifyAll()
+        self._invokeCallbacks()
+
+    def set_exception(self, exception):
+        with self._condition:
+            self._exception = exception
+            self._state = "finished"
+            self._condition.notifyAll()
+        self._invokeCallbacks()
+
+    def _wait(self, timeout):
+        # this must be called with the condition acquired
+        if timeout is None:
+            while not self.done():
+                self._condition.wait()
+        elif not self.done():
+            self._condition.wait(timeout)
+
+    def result(self, timeout=None):
+        with self._condition:
+            self._wait(timeout)
+            if self._state == "cancelled":
+                raise CancelledError()
+            if not self.done():
+                raise TimeoutError()
+            if self._exception is not None:
+                raise self._exception
+            return self._result
+
+    def exception(self, timeout=None):
+        with self._condition:
+            self._wait(timeout)
+            if self._state == "cancelled":
+                raise CancelledError()
+            if not self.done():
+                raise TimeoutError()
+            return self._exception
+
+    def add_done_callback(self, callback):
+        with self._condition:
+            if not self.done():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _invokeCallbacks(self):
+        callbacks = self._callbacks
+        self._callbacks = []
+        for callback in callbacks:
+            callback(self)
+
+
+if Future is None:
+    Future = _Future
+
+
+def _run(future, function, args, kwargs, reportErrors=True):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = function(*args, **kwargs)
+    except Exception, e:
+        # Most callers never look at the future, so report the
+        # error here, like an error in any other callback.
+        if reportErrors:
+            traceback.print_exc()
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+class VanillaDispatchObserver(NSObject):
+
+    def drain_(self, sender):
+        if hasattr(self, "_drainMethod") and self._drainMethod is not None:
+            self._drainMethod()
+
+    def fire_(self, call):
+        _run(*call)
+
+
+class _MainThreadQueue(object):
+
+    """
+    A queue of calls waiting to be run on the main thread.
+
+    However many calls are queued, the main thread is woken up only
+    once. All queued calls are then run in one pass, for at most
+    *timeSlice* seconds, before control returns to the run loop.
+    Threads other than the main thread block while the queue holds
+    *maxSize* calls.
+    """
+
+    maxSize = 10000
+    timeSlice = 0.05
+
+    def __init__(self):
+        self._calls = deque()
+        self._condition = threading.Condition()
+        self._drainScheduled = False
+        self._observer = VanillaDispatchObserver.alloc().init()
+        self._observer._drainMethod = self._drain
+
+    def put(self, function, args, kwargs):
+        future = Future()
+        isMainThread = NSThread.isMainThread()
+        with self._condition:
+            # the main thread must never wait on itself
+            while not isMainThread and len(self._calls) >= self.maxSize:
+                self._condition.wait()
+            self._calls.append((future, function, args, kwargs))
+            if not self._drainScheduled:
+                self._drainScheduled = True
+                self._observer.performSelectorOnMainThread_withObject_waitUntilDone_("drain:", None, False)
+        return future
+
+    def _drain(self):
+        deadline = time.time() + self.timeSlice
+        while True:
+            with self._condition:
+                if not self._calls:
+                    self._drainScheduled = False
+                    return
+                if time.time() > deadline:
+                    # let the run loop breathe and come back
+                    self._observer.performSelectorOnMainThread_withObject_waitUntilDone_("drain:", None, False)
+                    return
+                call = self._calls.popleft()
+                self._condition.notifyAll()
+            _run(*call)
+
+    def putAfter(self, delay, function, args, kwargs):
+        future = Future()
+        call = (future, function, args, kwargs)
+        if NSThread.isMainThread():
+            self._observer.performSelector_withObject_afterDelay_("fire:", call, delay)
+        else:
+            self.put(self._observer.performSelector_withObject_afterDelay_, ("fire:", call, delay), {})
+        return future
+
+
+_mainThreadQueue = None
+_mainThreadQueueLock = threading.Lock()
+
+def _getMainThreadQueue():
+    global _mainThreadQueue
+    with _mainThreadQueueLock:
+        if _mainThreadQueue is None:
+            _mainThreadQueue = _MainThreadQueue()
+    return _mainThreadQueue
+
+
+def callOnMain(function, *args, **kwargs):
+    """
+    Call **function** with **args** and **kwargs** on the main thread.
+
+    This can be called from any thread. It returns immediately with a
+    *Future* that will hold the result of the call. Calls are run in
+    the order in which they were made. When many calls are waiting to
+    be run, the calling thread blocks until the main thread catches up.::
+
+        from vanilla import callOnMain
+
+        def work(self):
+            # this runs on a worker thread
+            for index, item in enumerate(self.items):
+                result = process(item)
+                callOnMain(self.w.list.append, result)
+    """
+    return _getMainThreadQueue().put(function, args, kwargs)
+
+
+def callAfter(delay, function, *args, **kwargs):
+    """
+    Call **function** with **args** and **kwargs** on the main thread
+    after **delay** seconds.
+
+    This can be called from any thread. It returns a *Future* that will
+    hold the result of the call. Cancelling the future before the delay
+    has passed prevents the call.
+    """
+    return _getMainThreadQueue().putAfter(delay, function, args, kwargs)
+
+
+_executors = {}
+_executorsLock = threading.Lock()
+
+def _getExecutor(useProcesses):
+    with _executorsLock:
+        executor = _executors.get(useProcesses)
+        if executor is None:
+            if useProcesses:
+                executor = ProcessPoolExecutor(multiprocessing.cpu_count())
+            else:
+                executor = ThreadPoolExecutor(multiprocessing.cpu_count() * 2)
+            _executors[useProcesses] = executor
+    return executor
+
+
+def _submit(function, args, kwargs, useProcesses=False):
+    """
+    Run **function** in the shared thread pool, or in the shared
+    process pool if **useProcesses** is True, and return a *Future*.
+    """
+    if ThreadPoolExecutor is not None:
+        return _getExecutor(useProcesses).submit(_callKeepingTraceback, function, args, kwargs)
+    if useProcesses:
+        raise VanillaError("the futures package is required for running tasks in processes")
+    # without the futures package, every task gets its own thread
+    future = Future()
+    thread = threading.Thread(target=_run, args=(future, _callKeepingTraceback, (function, args, kwargs), {}, False))
+    thread.setDaemon(True)
+    thread.start()
+    return future
+
+
+def _callKeepingTraceback(function, args, kwargs):
+    # The traceback of an exception is lost when the exception
+    # is passed to another thread or process, so keep it as text.
+    try:
+        return function(*args, **kwargs)
+    except Exception, e:
+        e._vanillaTraceback = traceback.format_exc()
+        raise
+
+
+def _printException(exception):
+    """
+    Print an exception that was raised by a function run with *_submit*.
+    """
+    text = getattr(exception, "_vanillaTraceback", None)
+    if text is None:
+        traceback.print_exception(exception.__class__, exception, None)
+    else:
+        sys.stderr.write(text)
@@ -0,0 +1,335 @@
+import re
+from vanillaDispatch import callAfter
+from vanillaIdle import _getIdleQueue
+
+
+# the start state of lines that have not been lexed yet
+_unknownState = object()
+
+
+class Highlighter(object):
+
+    """
+    The base class for syntax highlighters. A highlighter is given to
+    a *TextEditor* with its *setHighlighter* method.
+
+    Text is highlighted one line at a time. Subclasses must implement
+    *tokenizeLine*. The state that is passed from line to line makes it
+    possible to highlight constructs that span lines, such as comments.
+    The editor remembers the state at the start of every line. After an
+    edit, lexing starts at the edited line and stops as soon as a line
+    starts in the same state as it did before. Lines that are not visible
+    are highlighted while the application is idle.
+
+    **styles** A dictionary mapping token types to dictionaries of text
+    attributes, such as *NSForegroundColorAttributeName*.
+    """
+
+    # the state at the start of the text
+    initialState = None
+
+    def __init__(self, styles):
+        self._styles = styles
+
+    def getStyles(self):
+        """
+        Get the dictionary mapping token types to text attributes.
+        """
+        return self._styles
+
+    def tokenizeLine(self, line, state):
+        """
+        Tokenize **line**, which does not include the line ending, starting in **state**.
+
+        This must return a tuple of form *(tokens, state)*. *tokens* is a list of
+        tuples of form *(start, length, tokenType)*. *state* is the state at the end
+        of the line. States must be comparable with *==*.
+        """
+        raise NotImplementedError
+
+
+class RegexHighlighter(Highlighter):
+
+    """
+    A highlighter driven by regular expressions.::
+
+        from AppKit import NSColor, NSForegroundColorAttributeName
+        from vanilla import *
+
+        rules = {
+            "root" : [
+                ("keyword", r"\\b(def|class|return)\\b", None),
+                ("string", r"\\"[^\\"]*\\"", None),
+                ("comment", r"/\\*", "comment"),
+            ],
+            "comment" : [
+                ("comment", r".*?\\*/", "root"),
+                ("comment", r".+", None),
+            ]
+        }
+        styles = {
+            "keyword" : {NSForegroundColorAttributeName : NSColor.blueColor()},
+            "string" : {NSForegroundColorAttributeName : NSColor.redColor()},
+            "comment" : {NSForegroundColorAttributeName : NSColor.grayColor()},
+        }
+        textEditor.setHighlighter(RegexHighlighter(rules, styles))
+
+    **rules** A dictionary mapping state names to lists of rules. Each rule is
+    a tuple of form *(tokenType, pattern, nextState)*. At every position in a
+    line, the first rule of the current state that matches is used. The matched
+    text is styled with *tokenType*, unless it is *None*, and the state changes
+    to *nextState*, unless it is *None*. Lexing starts in the *"root"* state.
+    For highlighters that don't need states, **rules** may be a list of tuples
+    of form *(tokenType, pattern)*. Patterns may refer to their own groups by
+    number, but the names of groups must be unique among the rules of a state.
+
+    **styles** See :class:`Highlighter`.
+    """
+
+    initialState = "root"
+
+    def __init__(self, rules, styles):
+        super(RegexHighlighter, self).__init__(styles)
+        if not isinstance(rules, dict):
+            rules = {"root" : [(tokenType, pattern, None) for tokenType, pattern in rules]}
+        self._rules = {}
+        for state, stateRules in rules.items():
+            # The rules of a state are joined into one pattern, so that
+            # a line is searched once per token. Every rule is put in a
+            # group, which moves the numbers of the groups in the rules.
+            patterns = []
+            actions = []
+            groupCount = 0
+            for index, (tokenType, pattern, nextState) in enumerate(stateRules):
+                groupCount += 1
+                patterns.append("(?P<_%d>%s)" % (index, _shiftGroupReferences(pattern, groupCount)))
+                groupCount += re.compile(pattern).groups
+                actions.append((tokenType, nextState))
+            self._rules[state] = re.compile("|".join(patterns)), actions
+
+    def tokenizeLine(self, line, state):
+        tokens = []
+        position = 0
+        length = len(line)
+        while position <= length:
+            regex, actions = self._rules[state]
+            match = regex.search(line, position)
+            if match is None:
+                break
+            tokenType, nextState = actions[int(match.lastgroup[1:])]
+            start, end = match.span()
+            if tokenType is not None and end > start:
+                tokens.append((start, end - start, tokenType))
+            if nextState is not None:
+                state = nextState
+            if end == start:
+                # never get stuck on an empty match
+                end += 1
+            position = end
+        return tokens, state
+
+
+def _shiftGroupReferences(pattern, offset):
+    # Add offset to the group numbers in the references in pattern,
+    # such as \1 and (?(1)yes|no). Characters given as octal escapes,
+    # such as \0 and \101, and escapes in character sets are kept.
+    result = []
+    index = 0
+    length = len(pattern)
+    inSet = False
+    while index < length:
+        character = pattern[index]
+        if character == "\\":
+            end = index + 2
+            if not inSet and pattern[index + 1:end].isdigit() and pattern[index + 1] != "0":
+                while end < length and end < index + 4 and pattern[end].isdigit():
+                    end += 1
+                digits = pattern[index + 1:end]
+                if len(digits) == 3 and not set(digits) - set("01234567"):
+                    result.append(pattern[index:end])
+                else:
+                    # a reference is at most two digits
+                    end = index + 1 + min(len(digits), 2)
+                    number = int(pattern[index + 1:end])
+                    # the group keeps a following digit out of the reference
+                    result.append("(?:\\%d)" % (number + offset))
+            else:
+                result.append(pattern[index:end])
+            index = end
+        elif inSet:
+            if character == "]":
+                inSet = False
+            result.append(character)
+            index += 1
+        elif character == "[":
+            end = index + 1
+            if pattern[end:end + 1] == "^":
+                end += 1
+            if pattern[end:end + 1] == "]":
+                # a ] at the start of a set is a character
+                end += 1
+            result.append(pattern[index:end])
+            inSet = True
+            index = end
+        elif pattern.startswith("(?(", index):
+            end = index + 3
+            while end < length and pattern[end].isdigit():
+                end += 1
+            if end > index + 3:
+                result.append("(?(%d" % (int(pattern[index + 3:end]) + offset))
+            else:
+                result.append("(?(")
+            index = end
+        else:
+            result.append(character)
+            index += 1
+    return "".join(result)
+
+
+class _Highlighting(object):
+
+    """
+    The highlighting of the text in a text view.
+
+    The state at the start of each line is stored. Lines from *dirtyFrom*
+    up to and including *dirtyTo* must be lexed again. Lexing continues past
+    *dirtyTo* until a line starts in the state it had before.
+    """
+
+    # the number of lines that are highlighted beyond the visible ones
+    visibleMargin = 20
+    # the number of lines highlighted in one chunk of idle time
+    linesPerStep = 200
+
+    def __init__(self, textView, lineIndex, highlighter):
+        self._textView = textView
+        self._lineIndex = lineIndex
+        self._highlighter = highlighter
+        self._styles = highlighter.getStyles()
+        self._attributeNames = set()
+        for attributes in self._styles.values():
+            self._attributeNames.update(attributes.keys())
+        lineCount = lineIndex.getLineCount()
+        self._lineStates = [_unknownState] * lineCount
+        self._lineStates[0] = highlighter.initialState
+        self._dirtyFrom = 0
+        self._dirtyTo = lineCount - 1
+        self._scheduled = False
+        self._idleTask = None
+        self._schedule()
+
+    def stop(self):
+        if self._idleTask is not None:
+            _getIdleQueue().remove(self._idleTask)
+            self._idleTask = None
+        self._dirtyFrom = self._dirtyTo = None
+        textStorage = self._textView.textStorage()
+        textStorage.beginEditing()
+        for name in self._attributeNames:
+            textStorage.removeAttribute_range_(name, (0, textStorage.length()))
+        textStorage.endEditing()
+
+    def textEdited(self, editedRange, changeInLength, firstLine, removedLines, insertedLines):
+        # this is called after the line index has been updated
+        self._lineStates[firstLine + 1:firstLine + 1 + removedLines] = [_unknownState] * insertedLines
+        lineDelta = insertedLines - removedLines
+        lastLine = firstLine + insertedLines
+        if self._dirtyFrom is None:
+            self._dirtyFrom = firstLine
+            self._dirtyTo = lastLine
+        else:
+            if self._dirtyFrom > firstLine:
+                self._dirtyFrom = max(firstLine, self._dirtyFrom + lineDelta)
+            if self._dirtyTo > firstLine:
+                self._dirtyTo = max(firstLine, self._dirtyTo + lineDelta)
+            self._dirtyFrom = min(self._dirtyFrom, firstLine)
+            self._dirtyTo = max(self._dirtyTo, lastLine)
+        self._schedule()
+
+    def _schedule(self):
+        if self._scheduled:
+            return
+        self._scheduled = True
+        callAfter(0, self._highlightVisible)
+
+    def _highlightVisible(self):
+        self._scheduled = False
+        if self._dirtyFrom is None:
+            return
+        self._highlight(self._getLastVisibleLine() + self.visibleMargin)
+        # the rest is done when there is nothing else to do
+        if self._dirtyFrom is not None and self._idleTask is None:
+            self._idleTask = _getIdleQueue().add(self._highlightInIdleTime())
+
+    def _highlightInIdleTime(self):
+        while self._dirtyFrom is not None:
+            self._highlight(self._dirtyFrom + self.linesPerStep)
+            yield None
+        self._idleTask = None
+
+    def _getLastVisibleLine(self):
+        textView = self._textView
+        layoutManager = textView.layoutManager()
+        glyphRange = layoutManager.glyphRangeForBoundingRectWithoutAdditionalLayout_inTextContainer_(
+            textView.visibleRect(), textView.textContainer())
+        characterRange, actualGlyphRange = layoutManager.characterRangeForGlyphRange_actualGlyphRange_(glyphRange, None)
+        location, length = characterRange
+        return self._lineIndex.lineForOffset(location + length)
+
+    def _highlight(self, untilLine):
+        lineIndex = self._lineIndex
+        lineStates = self._lineStates
+        lineCount = len(lineStates)
+        line = self._dirtyFrom
+        lastLine = min(untilLine, lineCount - 1)
+        if line > lastLine:
+            return
+        # lines before the first dirty line always have a
+        # start state, but be defensive about it anyway.
+        while lineStates[line] is _unknownState and line > 0:
+            line -= 1
+        state = lineStates[line]
+        textStorage = self._textView.textStorage()
+        textLength = textStorage.length()
+        # copy all the text that will be lexed in one go
+        start = lineIndex.offsetForLine(line)
+        if lastLine + 1 < lineCount:
+            end = lineIndex.offsetForLine(lastLine + 1)
+        else:
+            end = textLength
+        text = textStorage.attributedSubstringFromRange_((start, end - start)).string()
+        tokenizeLine = self._highlighter.tokenizeLine
+        converged = False
+        lineEnd = start
+        textStorage.beginEditing()
+        try:
+            while line <= lastLine:
+                lineStart = lineEnd
+                if line + 1 < lineCount:
+                    lineEnd = lineIndex.offsetForLine(line + 1)
+                else:
+                    lineEnd = textLength
+                lineText = text[lineStart - start:lineEnd - start]
+                if lineText.endswith("\n"):
+                    lineText = lineText[:-1]
+                tokens, state = tokenizeLine(lineText, state)
+                lineRange = (lineStart, lineEnd - lineStart)
+                for name in self._attributeNames:
+                    textStorage.removeAttribute_range_(name, lineRange)
+                for tokenStart, tokenLength, tokenType in tokens:
+                    attributes = self._styles.get(tokenType)
+                    if attributes:
+                        textStorage.addAttributes_range_(attributes, (lineStart + tokenStart, tokenLength))
+                line += 1
+                if line == lineCount:
+                    break
+                if line > self._dirtyTo and lineStates[line] == state:
+                    converged = True
+                    break
+                lineStates[line] = state
+        finally:
+            textStorage.endEditing()
+        if converged or line == lineCount:
+            self._dirtyFrom = self._dirtyTo = None
+        else:
+            self._dirtyFrom = line
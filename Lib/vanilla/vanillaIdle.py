@@ -0,0 +1,231 @@
+import time
+import types
+from AppKit import NSObject, NSNotification, NSNotificationCenter, NSNotificationQueue, \
+        NSPostWhenIdle, NSNotificationCoalescingOnName
+from vanillaBase import VanillaError, _callbackName
+from vanillaWindows import Window
+
+
+_idleNotificationName = "VanillaIdleNotification"
+
+
+class VanillaIdleObserver(NSObject):
+
+    def idle_(self, notification):
+        if hasattr(self, "_targetMethod") and self._targetMethod is not None:
+            self._targetMethod()
+
+
+class _IdleQueue(object):
+
+    """
+    A queue of tasks that are run while the run loop is idle.
+
+    Tasks are iterators. Each step of an iterator is a chunk of work.
+    Chunks are run until *timeSlice* seconds have been used, after which
+    control is returned to the run loop. The remaining work is picked up
+    the next time the run loop becomes idle.
+    """
+
+    timeSlice = 0.02
+
+    def __init__(self):
+        self._tasks = []
+        self._observer = VanillaIdleObserver.alloc().init()
+        self._observer._targetMethod = self._runTasks
+        NSNotificationCenter.defaultCenter().addObserver_selector_name_object_(
+            self._observer, "idle:", _idleNotificationName, self._observer)
+
+    def add(self, task):
+        if not isinstance(task, types.GeneratorType):
+            task = _callableTask(task)
+        self._tasks.append(task)
+        self._post()
+        return task
+
+    def remove(self, task):
+        if task in self._tasks:
+            self._tasks.remove(task)
+
+    def finish(self, task):
+        # run the remaining steps of a task right now
+        if task not in self._tasks:
+            return
+        self._tasks.remove(task)
+        for step in task:
+            pass
+
+    def _post(self):
+        notification = NSNotification.notificationWithName_object_(_idleNotificationName, self._observer)
+        NSNotificationQueue.defaultQueue().enqueueNotification_postingStyle_coalesceMask_forModes_(
+            notification, NSPostWhenIdle, NSNotificationCoalescingOnName, None)
+
+    def _runTasks(self):
+        deadline = time.time() + self.timeSlice
+        while self._tasks and time.time() < deadline:
+            task = self._tasks[0]
+            try:
+                task.next()
+            except StopIteration:
+                self.remove(task)
+            except:
+                self.remove(task)
+                raise
+        if self._tasks:
+            self._post()
+
+
+def _callableTask(function):
+    function()
+    yield None
+
+
+_idleQueue = None
+
+def _getIdleQueue():
+    global _idleQueue
+    if _idleQueue is None:
+        _idleQueue = _IdleQueue()
+    return _idleQueue
+
+
+class IdleWindowBuilder(object):
+
+    """
+    An object that builds windows while the application is idle so that
+    they can be shown instantly when they are first opened.::
+
+        from vanilla import *
+
+        def buildPreferences():
+            w = Window((300, 200), "Preferences", initiallyVisible=False)
+            yield
+            w.tabs = Tabs((10, 10, -10, -10), ["General", "Advanced"])
+            yield
+            w.tabs[0].checkBox = CheckBox((10, 10, -10, 22), "Check")
+            yield w
+
+        class IdleWindowBuilderDemo(object):
+
+            def __init__(self):
+                self.builder = IdleWindowBuilder()
+                self.builder.declare("preferences", buildPreferences)
+                self.w = Window((200, 40))
+                self.w.button = Button((10, 10, -10, 20), "Preferences",
+                                callback=self.buttonCallback)
+                self.w.open()
+
+            def buttonCallback(self, sender):
+                self.builder.open("preferences")
+
+        IdleWindowBuilderDemo()
+
+    Declared windows are built during run loop idle time in small chunks so
+    that the interface never stalls. A window factory is a callable that takes
+    no arguments. It may return the window directly, in which case the whole
+    window is built in one chunk. It may also be a generator function, in which
+    case every *yield* ends a chunk and the last value that is yielded must be
+    the window. Factories should create their windows with *initiallyVisible=False*
+    and must not open them.
+
+    If a window is opened before it has been fully built, the remaining
+    chunks are built immediately. If building a window in idle time fails,
+    the window is built again when it is opened.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._rebuild = {}
+        self._tasks = {}
+        self._built = {}
+
+    def declare(self, name, windowFactory, rebuild=False):
+        """
+        Declare a window that should be built in idle time.
+
+        **name** A unique string that will be used to open the window.
+
+        **windowFactory** A callable that builds the window. See above.
+
+        **rebuild** A boolean indicating if a new window should be built
+        in idle time every time the previously built window is opened.
+        """
+        self.forget(name)
+        self._factories[name] = windowFactory
+        self._rebuild[name] = rebuild
+        self._schedule(name)
+
+    def forget(self, name):
+        """
+        Stop building the window declared with **name**. If the window
+        has been built but not opened, it is closed.
+        """
+        task = self._tasks.pop(name, None)
+        if task is not None:
+            _getIdleQueue().remove(task)
+        self._factories.pop(name, None)
+        self._rebuild.pop(name, None)
+        window = self._built.pop(name, None)
+        if window is not None:
+            self._closeWindow(window)
+
+    def isBuilt(self, name):
+        """
+        Return a boolean indicating if the window declared with **name**
+        has been completely built.
+        """
+        return name in self._built
+
+    def open(self, name):
+        """
+        Open the window declared with **name** and return it.
+        """
+        if name not in self._built:
+            task = self._tasks.get(name)
+            if task is None:
+                # the window was handed out or its build failed,
+                # so build it right now
+                task = self._schedule(name)
+            _getIdleQueue().finish(task)
+        window = self._built.pop(name)
+        window.open()
+        if isinstance(window, Window) and not window.isVisible():
+            window.show()
+        if self._rebuild[name]:
+            self._schedule(name)
+        return window
+
+    def _schedule(self, name):
+        task = _getIdleQueue().add(self._buildSteps(name))
+        self._tasks[name] = task
+        return task
+
+    def _buildSteps(self, name):
+        try:
+            windowFactory = self._factories[name]
+            window = windowFactory()
+            if isinstance(window, types.GeneratorType):
+                steps = window
+                window = None
+                for value in steps:
+                    if value is not None:
+                        window = value
+                    yield None
+            if window is None:
+                raise VanillaError("the window factory %s for %r made no window" % (_callbackName(windowFactory), name))
+        except Exception:
+            # Forget the failed task so that open() builds the window
+            # again. This is not done in a finally clause, as a task that
+            # is removed by forget() is closed when it is garbage collected,
+            # which may be after a new task has been scheduled for the name.
+            del self._tasks[name]
+            raise
+        del self._tasks[name]
+        self._built[name] = window
+
+    def _closeWindow(self, window):
+        if isinstance(window, Window):
+            # The window was never opened, so balance
+            # the autorelease in Window.windowWillClose_().
+            window.retain()
+        window.close()
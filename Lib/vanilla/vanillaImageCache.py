@@ -0,0 +1,159 @@
+import os
+import threading
+from collections import OrderedDict
+from AppKit import NSImage
+
+
+class ImageCache(object):
+
+    """
+    A cache of *NSImage* objects loaded from files.
+
+    All vanilla objects that accept an *imagePath* argument load the image
+    through the shared cache, so an icon file that is used by many controls
+    is only decoded once. Images are keyed by their path and the modification
+    time of the file. When the file changes on disk, it is loaded again. When
+    the estimated memory used by the cached images exceeds the memory budget,
+    the least recently used images are removed from the cache.::
+
+        from vanilla import ImageCache
+
+        cache = ImageCache.sharedImageCache()
+        cache.setMemoryBudget(64 * 1024 * 1024)
+
+    *The images returned by the cache are shared. They should not be modified.*
+
+    **memoryBudget** The maximum number of bytes that the cached images
+    may use.
+    """
+
+    _sharedImageCache = None
+
+    def __init__(self, memoryBudget=32*1024*1024):
+        self._memoryBudget = memoryBudget
+        self._images = OrderedDict()
+        self._memoryUsed = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def sharedImageCache(cls):
+        """
+        Return the cache used by all vanilla objects.
+        """
+        if cls._sharedImageCache is None:
+            cls._sharedImageCache = cls()
+        return cls._sharedImageCache
+
+    def getImage(self, imagePath):
+        """
+        Get the *NSImage* for the file at **imagePath**.
+        """
+        try:
+            modified = os.stat(imagePath).st_mtime
+        except OSError:
+            # let NSImage deal with whatever this is
+            return NSImage.alloc().initWithContentsOfFile_(imagePath)
+        with self._lock:
+            entry = self._images.pop(imagePath, None)
+            if entry is not None:
+                if entry[0] == modified:
+                    self._images[imagePath] = entry
+                    self._hits += 1
+                    return entry[1]
+                self._memoryUsed -= entry[2]
+        image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+        if image is None:
+            return None
+        cost = _estimateImageCost(image)
+        with self._lock:
+            self._misses += 1
+            previous = self._images.pop(imagePath, None)
+            if previous is not None:
+                self._memoryUsed -= previous[2]
+            self._images[imagePath] = (modified, image, cost)
+            self._memoryUsed += cost
+            self._evict()
+        return image
+
+    def _evict(self):
+        # always keep the most recently used image,
+        # even if it is larger than the budget.
+        while self._memoryUsed > self._memoryBudget and len(self._images) > 1:
+            imagePath, (modified, image, cost) = self._images.popitem(last=False)
+            self._memoryUsed -= cost
+            self._evictions += 1
+
+    def getMemoryBudget(self):
+        """
+        Get the maximum number of bytes that the cached images may use.
+        """
+        return self._memoryBudget
+
+    def setMemoryBudget(self, value):
+        """
+        Set the maximum number of bytes that the cached images may use.
+        """
+        with self._lock:
+            self._memoryBudget = value
+            self._evict()
+
+    def remove(self, imagePath):
+        """
+        Remove the image for **imagePath** from the cache.
+        """
+        with self._lock:
+            entry = self._images.pop(imagePath, None)
+            if entry is not None:
+                self._memoryUsed -= entry[2]
+
+    def clear(self):
+        """
+        Remove all images from the cache.
+        """
+        with self._lock:
+            self._images.clear()
+            self._memoryUsed = 0
+
+    def getStatistics(self):
+        """
+        Get a dictionary of statistics about the cache with these keys:
+
+        +--------------+---------------------------------------------------+
+        | *images*     | The number of images in the cache.                |
+        +--------------+---------------------------------------------------+
+        | *memoryUsed* | The estimated number of bytes used by the images. |
+        +--------------+---------------------------------------------------+
+        | *hits*       | The number of requests served from the cache.     |
+        +--------------+---------------------------------------------------+
+        | *misses*     | The number of requests that loaded a file.        |
+        +--------------+---------------------------------------------------+
+        | *evictions*  | The number of images removed to fit the budget.   |
+        +--------------+---------------------------------------------------+
+        """
+        with self._lock:
+            return dict(
+                images=len(self._images),
+                memoryUsed=self._memoryUsed,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions
+            )
+
+
+def _estimateImageCost(image):
+    cost = 0
+    for rep in image.representations():
+        width = rep.pixelsWide()
+        height = rep.pixelsHigh()
+        if width <= 0 or height <= 0:
+            # vector representations report no pixel size
+            width, height = image.size()
+        cost += int(width * height * 4)
+    return cost
+
+
+def _imageFromPath(imagePath):
+    return ImageCache.sharedImageCache().getImage(imagePath)
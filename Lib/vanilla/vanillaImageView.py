@@ -1,5 +1,20 @@
+import math
+import threading
 from AppKit import *
 from vanillaBase import VanillaBaseObject
+from vanillaImageCache import _imageFromPath
+from vanillaDispatch import callOnMain
+
+# ImageIO is used for decoding downsampled images.
+# Without it, asynchronous loads decode the full image.
+try:
+    from Quartz import CGImageSourceCreateWithURL, CGImageSourceCopyPropertiesAtIndex, \
+        CGImageSourceCreateThumbnailAtIndex, kCGImagePropertyPixelWidth, kCGImagePropertyPixelHeight, \
+        kCGImageSourceCreateThumbnailFromImageAlways, kCGImageSourceCreateThumbnailWithTransform, \
+        kCGImageSourceThumbnailMaxPixelSize
+    _haveImageIO = True
+except ImportError:
+    _haveImageIO = False
 
 _imageAlignmentMap = {
     ("center", "center") : NSImageAlignCenter,
@@ -62,6 +77,10 @@ class ImageView(VanillaBaseObject):
     +----------------+----------------------------------------------+
     | "none"         | Do not scale the image.                      |
     +----------------+----------------------------------------------+
+
+    Large images can be loaded without blocking the interface by passing
+    *asynchronous=True* to *setImage*. The image is then decoded on a
+    background thread at the pixel size that the view actually displays.
     """
 
     nsImageViewClass = NSImageView
@@ -70,8 +89,15 @@ class ImageView(VanillaBaseObject):
         self._setupView(self.nsImageViewClass, posSize)
         align = _imageAlignmentMap[(horizontalAlignment, verticalAlignment)]
         self._nsObject.setImageAlignment_(align)
+        self._scale = scale
         scale = _imageScaleMap[scale]
         self._nsObject.setImageScaling_(scale)
+        self._imageLoadGeneration = 0
+
+    def _breakCycles(self):
+        super(ImageView, self)._breakCycles()
+        # invalidate any load in progress
+        self._imageLoadGeneration += 1
 
     def getNSImageView(self):
         """
@@ -79,7 +105,7 @@ class ImageView(VanillaBaseObject):
         """
         return self._nsObject
 
-    def setImage(self, imagePath=None, imageNamed=None, imageObject=None):
+    def setImage(self, imagePath=None, imageNamed=None, imageObject=None, asynchronous=False, placeholder=None):
         """
         Set the image in the view.
 
@@ -91,9 +117,23 @@ class ImageView(VanillaBaseObject):
         **imageObject** A *NSImage* object.
 
         *Only one of imagePath, imageNamed, imageObject should be set.*
+
+        **asynchronous** A boolean indicating if the image at *imagePath*
+        should be loaded on a background thread. The image is decoded at the
+        size needed to display it in the view with the current *scale* setting.
+        Setting another image while a load is in progress cancels that load.
+
+        **placeholder** A *NSImage* object to be displayed while an
+        asynchronous load is in progress.
         """
+        # whatever happens, an image that is still loading is now stale
+        self._imageLoadGeneration += 1
+        if asynchronous and imagePath is not None:
+            self._nsObject.setImage_(placeholder)
+            self._loadImageAsynchronously(imagePath)
+            return
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = _imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -101,3 +141,84 @@ class ImageView(VanillaBaseObject):
         else:
             raise ValueError, "no image source defined"
         self._nsObject.setImage_(image)
+
+    # --------------------
+    # asynchronous loading
+    # --------------------
+
+    def _getDisplayPixelSize(self):
+        (x, y), (width, height) = self._nsObject.bounds()
+        window = self._nsObject.window()
+        if window is not None and hasattr(window, "backingScaleFactor"):
+            backingScale = window.backingScaleFactor()
+        else:
+            screen = NSScreen.mainScreen()
+            if screen is not None and hasattr(screen, "backingScaleFactor"):
+                backingScale = screen.backingScaleFactor()
+            else:
+                backingScale = 1.0
+        return width * backingScale, height * backingScale, backingScale
+
+    def _loadImageAsynchronously(self, imagePath):
+        generation = self._imageLoadGeneration
+        width, height, backingScale = self._getDisplayPixelSize()
+        thread = threading.Thread(target=self._loadImageThread,
+            args=(imagePath, generation, width, height, backingScale, self._scale))
+        thread.setDaemon(True)
+        thread.start()
+
+    def _loadImageThread(self, imagePath, generation, width, height, backingScale, scale):
+        pool = NSAutoreleasePool.alloc().init()
+        try:
+            image = None
+            # skip the decoding if the load was cancelled while waiting
+            if generation == self._imageLoadGeneration:
+                image = _loadDownsampledImage(imagePath, width, height, backingScale, scale)
+            callOnMain(self._imageLoaded, generation, image)
+        finally:
+            del pool
+
+    def _imageLoaded(self, generation, image):
+        if generation != self._imageLoadGeneration:
+            return
+        if image is not None:
+            self._nsObject.setImage_(image)
+
+
+def _loadDownsampledImage(imagePath, width, height, backingScale, scale):
+    if not _haveImageIO:
+        return NSImage.alloc().initWithContentsOfFile_(imagePath)
+    url = NSURL.fileURLWithPath_(imagePath)
+    source = CGImageSourceCreateWithURL(url, None)
+    if source is None:
+        return None
+    properties = CGImageSourceCopyPropertiesAtIndex(source, 0, None)
+    if properties is None:
+        return None
+    imageWidth = properties.get(kCGImagePropertyPixelWidth)
+    imageHeight = properties.get(kCGImagePropertyPixelHeight)
+    if not imageWidth or not imageHeight:
+        return None
+    factor = 1.0
+    if width > 0 and height > 0:
+        widthFactor = width / float(imageWidth)
+        heightFactor = height / float(imageHeight)
+        if scale == "proportional":
+            factor = min(1.0, widthFactor, heightFactor)
+        elif scale == "fit":
+            factor = min(1.0, max(widthFactor, heightFactor))
+    maxPixelSize = int(math.ceil(max(imageWidth, imageHeight) * factor))
+    options = {
+        kCGImageSourceCreateThumbnailFromImageAlways: True,
+        kCGImageSourceCreateThumbnailWithTransform: True,
+        kCGImageSourceThumbnailMaxPixelSize: maxPixelSize,
+    }
+    cgImage = CGImageSourceCreateThumbnailAtIndex(source, 0, options)
+    if cgImage is None:
+        return None
+    if factor < 1.0:
+        # the image fills the view at the backing resolution
+        size = (imageWidth * factor / backingScale, imageHeight * factor / backingScale)
+    else:
+        size = (imageWidth, imageHeight)
+    return NSImage.alloc().initWithCGImage_size_(cgImage, size)
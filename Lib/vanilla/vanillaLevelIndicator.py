@@ -1,5 +1,8 @@
+import os
 from AppKit import *
 from vanillaBase import VanillaBaseControl
+from vanillaImageCache import _imageFromPath
+from vanillaList import _getListCellPrototype
 
 # This control is available in OS 10.4+.
 # Cause a NameError if in an earlier OS.
@@ -110,6 +113,11 @@ class LevelIndicator(VanillaBaseControl):
 
     **callback** The method to be called when the level indicator has been edited.
     If no callback is given, the level indicator will not be editable.
+
+    **throttled** Boolean representing if the callback should be called at most
+    once per screen refresh while the level indicator is being dragged, and only
+    when the value has changed. The callback is always called when the mouse
+    button is released.
     """
 
     nsLevelIndicatorClass = NSLevelIndicator
@@ -117,7 +125,8 @@ class LevelIndicator(VanillaBaseControl):
     def __init__(self, posSize, style="discrete",
                     value=5, minValue=0, maxValue=10, warningValue=None, criticalValue=None,
                     tickMarkPosition=None, minorTickMarkCount=None, majorTickMarkCount=None,
-                    callback=None):
+                    callback=None, throttled=False):
+        self._throttleCallback = throttled
         self._setupView(self.nsLevelIndicatorClass, posSize, callback=callback)
         self._nsObject.cell().setLevelIndicatorStyle_(_levelIndicatorStyleMap[style])
         self._nsObject.setMinValue_(minValue)
@@ -269,6 +278,20 @@ def LevelIndicatorListCell(style="discrete",
     level indicator should display the critical color. Applies only to
     discrete and continuous level indicators.
     """
+    args = (style, minValue, maxValue, warningValue, criticalValue, imagePath, imageNamed, imageObject)
+    # a changed image file makes a new cell
+    imageModified = None
+    if imagePath is not None:
+        try:
+            imageModified = os.path.getmtime(imagePath)
+        except OSError:
+            pass
+    key = ("LevelIndicatorListCell", imageModified) + args
+    return _getListCellPrototype(key, _makeLevelIndicatorListCell, *args)
+
+
+def _makeLevelIndicatorListCell(style, minValue, maxValue, warningValue, criticalValue,
+        imagePath, imageNamed, imageObject):
     cell = NSLevelIndicatorCell.alloc().init()
     cell.setLevelIndicatorStyle_(_levelIndicatorStyleMap[style])
     cell.setMinValue_(minValue)
@@ -278,11 +301,11 @@ def LevelIndicatorListCell(style="discrete",
     if criticalValue is not None:
         cell.setCriticalValue_(criticalValue)
     if imagePath is not None:
-        image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+        image = _imageFromPath(imagePath)
     elif imageNamed is not None:
         image = NSImage.imageNamed_(imageNamed)
-    elif imageObject is not None:
+    else:
         image = imageObject
-    if imageObject is not None:
+    if image is not None:
         cell.setImage_(image)
     return cell
@@ -1,9 +1,11 @@
 import time
 import objc
+from collections import OrderedDict
 from Foundation import NSKeyValueObservingOptionNew, NSKeyValueObservingOptionOld, NSNotFound
 from AppKit import *
 from nsSubclasses import getNSSubclass
-from vanillaBase import VanillaBaseObject, VanillaError, VanillaCallbackWrapper
+from vanillaBase import VanillaBaseObject, VanillaError, VanillaCallbackWrapper, _runCallback, \
+        _traced, _traceSpan
 
 
 # first, determine which column autosizing method is needed.
@@ -67,6 +69,14 @@ class _VanillaArrayControllerObserver(VanillaArrayControllerObserver):
 
 class VanillaArrayController(NSArrayController):
 
+    def arrangeObjects_(self, objects):
+        if self.sortDescriptors():
+            name = "List.sort"
+        else:
+            name = "List.arrange"
+        with _traceSpan(name, "list"):
+            return super(VanillaArrayController, self).arrangeObjects_(objects)
+
     def tableView_writeRowsWithIndexes_toPasteboard_(self,
         tableView, indexes, pboard):
         vanillaWrapper = tableView.vanillaWrapper()
@@ -725,11 +735,11 @@ class List(VanillaBaseObject):
 
     def _edit(self):
         if self._editCallback is not None:
-            self._editCallback(self)
+            _runCallback(self._editCallback, self)
 
     def _selection(self):
         if self._selectionCallback is not None: 
-            self._selectionCallback(self)
+            _runCallback(self._selectionCallback, self)
 
     def _keyDown(self, event):
         # this method is called by the NSTableView subclass after a key down
@@ -858,6 +868,7 @@ class List(VanillaBaseObject):
             item = item["item"]
         return item
 
+    @_traced("list")
     def __setitem__(self, index, value):
         # rather than inserting a new item, replace the
         # content of the existing item at the index.
@@ -873,6 +884,7 @@ class List(VanillaBaseObject):
             item["item"] = value
         self._editCallback = editCallback
 
+    @_traced("list")
     def __delitem__(self, index):
         index = self._getSortedIndexesFromUnsortedIndexes([index])[0]
         self._arrayController.removeObjectAtArrangedObjectIndex_(index)
@@ -881,10 +893,12 @@ class List(VanillaBaseObject):
         item = self._wrapItem(item)
         return self._arrayController.content().containsObject_(item)
 
+    @_traced("list")
     def append(self, item):
         item = self._wrapItem(item)
         self._arrayController.addObject_(item)
 
+    @_traced("list")
     def remove(self, item):
         index = self.index(item)
         del self[index]
@@ -893,12 +907,14 @@ class List(VanillaBaseObject):
         item = self._wrapItem(item)
         return self._arrayController.content().index(item)
 
+    @_traced("list")
     def insert(self, index, item):
         item = self._wrapItem(item)
         if index < len(self._arrayController.content()):
             index = self._getSortedIndexesFromUnsortedIndexes([index])[0]
         self._arrayController.insertObject_atArrangedObjectIndex_(item, index)
 
+    @_traced("list")
     def extend(self, items):
         items = [self._wrapItem(item) for item in items]
         self._arrayController.addObjects_(items)
@@ -913,6 +929,7 @@ class List(VanillaBaseObject):
         """
         self._tableView.setEnabled_(onOff)
 
+    @_traced("list")
     def set(self, items):
         """
         Set the items in the list.
@@ -1048,6 +1065,64 @@ class List(VanillaBaseObject):
         return sortedIndexes
 
 
+# The list cell functions keep a prototype cell for every set of
+# arguments and return copies of it. Copying a cell is much cheaper
+# than setting it up, a pop up cell's menu is only built once, and
+# callers still get a cell of their own to change.
+
+# the least recently used cells are removed when there are more than this
+_listCellCacheMaxSize = 128
+_listCellPrototypes = OrderedDict()
+_listCellCacheHits = 0
+_listCellCacheMisses = 0
+
+def _getListCellPrototype(key, makeCell, *args):
+    global _listCellCacheHits, _listCellCacheMisses
+    try:
+        cell = _listCellPrototypes.pop(key, None)
+    except TypeError:
+        # unhashable arguments
+        _listCellCacheMisses += 1
+        return makeCell(*args)
+    if cell is None:
+        _listCellCacheMisses += 1
+        cell = makeCell(*args)
+        if len(_listCellPrototypes) >= _listCellCacheMaxSize:
+            _listCellPrototypes.popitem(last=False)
+    else:
+        _listCellCacheHits += 1
+    _listCellPrototypes[key] = cell
+    return cell.copy()
+
+
+def getListCellCacheStatistics():
+    """
+    Get a dictionary describing the use of the cache of cells made by
+    the list cell functions, such as *CheckBoxListCell*. Calls with the
+    same arguments return copies of the same cell. The dictionary has
+    these keys:
+
+    +----------+--------------------------------------------------+
+    | *hits*   | The number of calls that copied a cached cell.   |
+    +----------+--------------------------------------------------+
+    | *misses* | The number of calls that made a new cell.        |
+    +----------+--------------------------------------------------+
+    | *size*   | The number of cached cells.                      |
+    +----------+--------------------------------------------------+
+
+    The cache holds the 128 most recently requested cells.
+    """
+    return dict(hits=_listCellCacheHits, misses=_listCellCacheMisses, size=len(_listCellPrototypes))
+
+
+def clearListCellCache():
+    """
+    Remove all cells from the cache of the list cell functions, such as
+    *CheckBoxListCell*. Cells that have been returned are not affected.
+    """
+    _listCellPrototypes.clear()
+
+
 def CheckBoxListCell(title=None):
     """
     An object that displays a check box in a List column.
@@ -1057,6 +1132,10 @@ def CheckBoxListCell(title=None):
 
     **title** The title to be set in *all* items in the List column.
     """
+    return _getListCellPrototype(("CheckBoxListCell", title), _makeCheckBoxListCell, title)
+
+
+def _makeCheckBoxListCell(title):
     cell = NSButtonCell.alloc().init()
     cell.setButtonType_(NSSwitchButton)
     cell.setControlSize_(NSSmallControlSize)
@@ -1079,6 +1158,10 @@ def SliderListCell(minValue=0, maxValue=100):
 
     **maxValue** The maximum value for the slider.
     """
+    return _getListCellPrototype(("SliderListCell", minValue, maxValue), _makeSliderListCell, minValue, maxValue)
+
+
+def _makeSliderListCell(minValue, maxValue):
     cell = NSSliderCell.alloc().init()
     cell.setControlSize_(NSSmallControlSize)
     cell.setMinValue_(minValue)
@@ -1095,6 +1178,11 @@ def PopUpButtonListCell(items):
 
     **items** The items that should appear in the pop up list.
     """
+    items = tuple(items)
+    return _getListCellPrototype(("PopUpButtonListCell", items), _makePopUpButtonListCell, items)
+
+
+def _makePopUpButtonListCell(items):
     cell = NSPopUpButtonCell.alloc().init()
     cell.setBordered_(False)
     # add the basic items
@@ -0,0 +1,297 @@
+import weakref
+from vanillaBase import VanillaError, _isCoroutineFunction, _scheduleCoroutine
+from vanillaDispatch import callOnMain
+from vanillaCheckBox import CheckBox
+from vanillaEditText import EditText
+from vanillaList import List
+from vanillaPopUpButton import PopUpButton
+from vanillaRadioGroup import RadioGroup
+from vanillaSlider import Slider
+
+
+__all__ = ["ObservableModel", "bind"]
+
+
+_noValue = object()
+
+
+def _isRelatedKeyPath(keyPath, otherKeyPath):
+    # a key path is related to itself, its parents and its children
+    if keyPath == otherKeyPath:
+        return True
+    return keyPath.startswith(otherKeyPath + ".") or otherKeyPath.startswith(keyPath + ".")
+
+
+class ObservableModel(object):
+
+    """
+    A collection of values that tells observers when values change.
+
+    Values are stored by key. A key path of keys separated by periods,
+    such as *"font.size"*, refers to a value in a dictionary that is
+    stored in the model. Observers are not told about every change right
+    away. All changes made while the main thread is busy are collected,
+    and every observer is told about them once, the next time the run
+    loop runs. This makes it cheap to change many values at once.
+
+    Controls are connected to values with :func:`bind`.::
+
+        from vanilla import *
+
+        class ObservableModelDemo(object):
+
+            def __init__(self):
+                self.model = ObservableModel(dict(name="Untitled", size=12))
+                self.w = Window((200, 70))
+                self.w.name = EditText((10, 10, -10, 22))
+                self.w.size = Slider((10, 40, -10, 23), minValue=6, maxValue=72)
+                bind(self.w.name, self.model, "name")
+                bind(self.w.size, self.model, "size")
+                self.w.open()
+
+        ObservableModelDemo()
+
+    Values are compared with *==* to find out if they have changed, so
+    assign a new list or dictionary instead of changing one in place.
+    The model must only be used on the main thread.
+
+    **values** A dictionary with the initial values.
+    """
+
+    def __init__(self, values=None):
+        self._values = {}
+        if values is not None:
+            self._values.update(values)
+        self._observers = []
+        self._changedKeyPaths = set()
+        self._notificationScheduled = False
+
+    def get(self, keyPath, default=None):
+        """
+        Get the value at **keyPath** or **default** if there is no such value.
+        """
+        value = self._values
+        try:
+            for key in keyPath.split("."):
+                value = value[key]
+        except (KeyError, TypeError):
+            return default
+        return value
+
+    def has(self, keyPath):
+        """
+        Return a boolean indicating if there is a value at **keyPath**.
+        """
+        return self.get(keyPath, _noValue) is not _noValue
+
+    def set(self, keyPath, value):
+        """
+        Set the value at **keyPath** to **value**. Dictionaries that are
+        missing from the key path are created.
+        """
+        keys = keyPath.split(".")
+        values = self._values
+        for key in keys[:-1]:
+            values = values.setdefault(key, {})
+        key = keys[-1]
+        if key in values and values[key] == value:
+            return
+        values[key] = value
+        self._changedKeyPaths.add(keyPath)
+        self._scheduleNotification()
+
+    def update(self, values):
+        """
+        Set many values at once. **values** is a dictionary mapping key paths to values.
+        """
+        for keyPath, value in values.items():
+            self.set(keyPath, value)
+
+    def addObserver(self, callback, keyPath=None):
+        """
+        Call **callback** after values have changed. The callback must accept
+        two arguments: the model and a sorted list of the key paths that have
+        changed. If **keyPath** is given, the callback is only called for changes
+        of that key path, the values it contains and the dictionaries that
+        contain it.
+        """
+        self._observers.append((callback, keyPath))
+
+    def removeObserver(self, callback, keyPath=None):
+        """
+        Stop calling **callback** for **keyPath**.
+        """
+        if (callback, keyPath) in self._observers:
+            self._observers.remove((callback, keyPath))
+
+    def _scheduleNotification(self):
+        if self._notificationScheduled:
+            return
+        self._notificationScheduled = True
+        callOnMain(self._notifyObservers)
+
+    def _notifyObservers(self):
+        self._notificationScheduled = False
+        changedKeyPaths = sorted(self._changedKeyPaths)
+        self._changedKeyPaths = set()
+        # observers may be added or removed by observers
+        for callback, keyPath in list(self._observers):
+            if keyPath is None:
+                keyPaths = changedKeyPaths
+            else:
+                keyPaths = [changedKeyPath for changedKeyPath in changedKeyPaths if _isRelatedKeyPath(keyPath, changedKeyPath)]
+            if keyPaths:
+                callback(self, keyPaths)
+
+
+# Adapters connect bindings to the different kinds of controls.
+# They are given the control and must not keep a reference to it.
+
+class _CallbackAdapter(object):
+
+    # for controls that keep their callback in a VanillaCallbackWrapper
+
+    def install(self, control, edited):
+        target = getattr(control, "_target", None)
+        if target is None:
+            self._originalCallback = None
+            control._setCallback(_chainCallback(edited, None))
+        else:
+            self._originalCallback = target.callback
+            target.callback = _chainCallback(edited, target.callback)
+
+    def uninstall(self, control):
+        target = getattr(control, "_target", None)
+        if target is not None:
+            target.callback = self._originalCallback
+
+    def get(self, control):
+        return control.get()
+
+    def set(self, control, value):
+        control.set(value)
+
+
+class _CheckBoxAdapter(_CallbackAdapter):
+
+    def install(self, control, edited):
+        self._originalCallback = control._callback
+        control._callback = _chainCallback(edited, control._callback)
+
+    def uninstall(self, control):
+        control._callback = self._originalCallback
+
+
+class _ListAdapter(_CallbackAdapter):
+
+    # Only lists that were created with an edit callback can be
+    # edited. Other lists just show the value in the model.
+
+    def install(self, control, edited):
+        self._originalCallback = control._editCallback
+        if control._editCallback is not None:
+            control._editCallback = _chainCallback(edited, control._editCallback)
+
+    def uninstall(self, control):
+        control._editCallback = self._originalCallback
+
+
+def _chainCallback(edited, callback):
+    def chainedCallback(sender):
+        edited()
+        if callback is not None:
+            result = callback(sender)
+            # the wrapper only sees chainedCallback
+            if _isCoroutineFunction(callback):
+                _scheduleCoroutine(result)
+    return chainedCallback
+
+
+_adapterClasses = [
+    (CheckBox, _CheckBoxAdapter),
+    (EditText, _CallbackAdapter),
+    (List, _ListAdapter),
+    (PopUpButton, _CallbackAdapter),
+    (RadioGroup, _CallbackAdapter),
+    (Slider, _CallbackAdapter),
+]
+
+
+class _Binding(object):
+
+    """
+    A two way connection between a control and a value in a model.
+
+    The binding remembers the last value that it has seen. Model changes
+    that equal it are not passed on to the control, so edits in the control
+    don't come back to it. The control is referenced weakly, the binding
+    ends when the control is gone.
+    """
+
+    def __init__(self, control, model, keyPath, adapter):
+        self._control = weakref.ref(control)
+        self._model = model
+        self._keyPath = keyPath
+        self._adapter = adapter
+        self._value = _noValue
+        adapter.install(control, self._controlEdited)
+        if model.has(keyPath):
+            self._value = model.get(keyPath)
+            adapter.set(control, self._value)
+        else:
+            self._value = adapter.get(control)
+            model.set(keyPath, self._value)
+        model.addObserver(self._modelChanged, keyPath)
+
+    def unbind(self):
+        """
+        Disconnect the control from the model.
+        """
+        if self._model is None:
+            return
+        self._model.removeObserver(self._modelChanged, self._keyPath)
+        self._model = None
+        control = self._control()
+        if control is not None:
+            self._adapter.uninstall(control)
+
+    def _controlEdited(self):
+        control = self._control()
+        if control is None or self._model is None:
+            return
+        self._value = self._adapter.get(control)
+        self._model.set(self._keyPath, self._value)
+
+    def _modelChanged(self, model, keyPaths):
+        control = self._control()
+        if control is None:
+            self.unbind()
+            return
+        value = model.get(self._keyPath)
+        if value == self._value:
+            return
+        self._value = value
+        self._adapter.set(control, value)
+
+
+def bind(control, model, keyPath):
+    """
+    Connect **control** to the value at **keyPath** in **model**, an
+    :class:`ObservableModel`. If the model has a value at **keyPath**,
+    the control is set to it. Otherwise the value of the control is
+    stored in the model.
+
+    From then on, edits in the control are stored in the model, before
+    the control's own callback is called, and model changes are shown
+    by the control once per pass of the run loop. This works for
+    *EditText*, *CheckBox*, *Slider*, *PopUpButton*, *RadioGroup* and
+    *List* objects. A *List* is only written to the model if it was
+    created with an *editCallback*.
+
+    This returns an object with an *unbind* method that disconnects
+    the control from the model.
+    """
+    for cls, adapterClass in _adapterClasses:
+        if isinstance(control, cls):
+            return _Binding(control, model, keyPath, adapterClass())
+    raise VanillaError("can't bind %s objects" % control.__class__.__name__)
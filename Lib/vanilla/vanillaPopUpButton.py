@@ -1,4 +1,5 @@
-from AppKit import NSPopUpButton, NSPopUpButtonCell, NSMenuItem
+import difflib
+from AppKit import NSPopUpButton, NSPopUpButtonCell, NSMenu, NSMenuItem
 from vanillaBase import VanillaBaseControl
 
 
@@ -62,6 +63,7 @@ class PopUpButton(VanillaBaseControl):
     }
 
     def __init__(self, posSize, items, callback=None, sizeStyle="regular"):
+        self._items = []
         self._setupView(self.nsPopUpButtonClass, posSize)
         if self.nsPopUpButtonCellClass != NSPopUpButtonCell:
             self._nsObject.setCell_(self.nsPopUpButtonCellClass.alloc().init())
@@ -91,17 +93,85 @@ class PopUpButton(VanillaBaseControl):
     def setItems(self, items):
         """
         Set the items to appear in the pop up list.
+
+        The items are compared with the current items and only the items
+        that differ are changed. If most items differ, a new menu is built
+        and replaces the current one. The selected item stays selected if
+        it is still in the list.
         """
-        self._nsObject.removeAllItems()
+        items = list(items)
+        oldItems = self._items
+        button = self._nsObject
+        menu = button.menu()
+        # the menu may have been changed directly, so compare with its titles
+        oldTitles = list(button.itemTitles())
+        titles = [_getTitle(item) for item in items]
+        menuChanged = oldTitles != [_getTitle(item) for item in oldItems]
+        if items == oldItems and not menuChanged:
+            return
+        selection = button.indexOfSelectedItem()
+        opcodes = difflib.SequenceMatcher(None, oldTitles, titles).get_opcodes()
+        changedCount = sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in opcodes if tag != "equal")
+        # menu items can't be in two menus at once, so menus
+        # with menu items are always built from scratch
+        hasMenuItems = any(isinstance(item, NSMenuItem) for item in oldItems + items)
+        if menuChanged or hasMenuItems or changedCount > max(len(oldTitles), len(titles)) / 2:
+            self._rebuildMenu(items)
+        else:
+            for tag, i1, i2, j1, j2 in reversed(opcodes):
+                if tag != "equal":
+                    self._replaceMenuItems(menu, i1, i2, items, j1, j2)
+        self._items = items
+        # find the new index of the selected item
+        newSelection = None
+        if 0 <= selection < len(oldTitles):
+            for tag, i1, i2, j1, j2 in opcodes:
+                if tag == "equal" and i1 <= selection < i2:
+                    newSelection = j1 + selection - i1
+                    break
+            if newSelection is None and oldTitles[selection] in titles:
+                newSelection = titles.index(oldTitles[selection])
+        if newSelection is None and items:
+            newSelection = 0
+        if newSelection is not None:
+            button.selectItemAtIndex_(newSelection)
+
+    def _rebuildMenu(self, items):
+        # build the menu while it isn't displayed and swap it in.
+        # unlike addItemWithTitle_, this does not look for duplicates.
+        oldMenu = self._nsObject.menu()
+        # release the menu items that are moved to the new menu
+        oldMenu.removeAllItems()
+        menu = NSMenu.alloc().initWithTitle_(oldMenu.title())
+        menu.setAutoenablesItems_(oldMenu.autoenablesItems())
         for item in items:
-            if isinstance(item, NSMenuItem):
-                menu = self._nsObject.menu()
-                menu.addItem_(item)
-            else:
-                self._nsObject.addItemWithTitle_(item)
+            menu.addItem_(_makeMenuItem(item))
+        self._nsObject.setMenu_(menu)
+
+    def _replaceMenuItems(self, menu, i1, i2, items, j1, j2):
+        # replace the menu items at i1 up to i2 with items for items[j1:j2]
+        retitled = min(i2 - i1, j2 - j1)
+        for index in xrange(retitled):
+            menu.itemAtIndex_(i1 + index).setTitle_(items[j1 + index])
+        for index in reversed(xrange(i1 + retitled, i2)):
+            menu.removeItemAtIndex_(index)
+        for index in xrange(j1 + retitled, j2):
+            menu.insertItem_atIndex_(_makeMenuItem(items[index]), i1 + index - j1)
 
     def getItems(self):
         """
         Get the list of items that appear in the pop up list.
         """
         return self._nsObject.itemTitles()
+
+
+def _makeMenuItem(item):
+    if isinstance(item, NSMenuItem):
+        return item
+    return NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(item, None, "")
+
+
+def _getTitle(item):
+    if isinstance(item, NSMenuItem):
+        return item.title()
+    return item
@@ -1,5 +1,9 @@
+import time
+import threading
 from AppKit import *
 from vanillaBase import VanillaBaseObject, _sizeStyleMap
+from vanillaDispatch import callOnMain, callAfter
+
 
 class ProgressBar(VanillaBaseObject):
 
@@ -110,6 +114,17 @@ class ProgressBar(VanillaBaseObject):
         self._nsObject.incrementBy_(value)
         self._nsObject.display()
 
+    def getProgressChannel(self, refreshRate=20):
+        """
+        Get a *ProgressChannel* for reporting progress from any thread.
+
+        **refreshRate** The maximum number of times per second that the
+        progress bar will be redrawn.
+
+        *This must be called from the main thread.*
+        """
+        return ProgressChannel(self, refreshRate)
+
     def start(self):
         """
         Start the animation.
@@ -125,3 +140,128 @@ class ProgressBar(VanillaBaseObject):
         *Only available in indeterminate progress bars.*
         """
         self._nsObject.stopAnimation_(None)
+
+
+class ProgressChannel(object):
+
+    """
+    A thread safe, rate limited way to report progress to a *ProgressBar*.
+
+    Reporting progress through *ProgressBar.set* and *ProgressBar.increment*
+    redraws the progress bar immediately and must happen on the main thread.
+    A progress channel can be posted to cheaply from any thread. Updates are
+    coalesced and the progress bar is updated on the main thread no more than
+    *refreshRate* times per second.::
+
+        from vanilla import *
+
+        class ProgressChannelDemo(object):
+
+            def __init__(self):
+                self.w = Window((200, 65))
+                self.w.bar = ProgressBar((10, 10, -10, 16), maxValue=1000)
+                self.w.button = Button((10, 35, -10, 20), "Go!",
+                                    callback=self.showProgress)
+                self.w.open()
+
+            def showProgress(self, sender):
+                import threading
+                self.w.bar.set(0)
+                channel = self.w.bar.getProgressChannel()
+                thread = threading.Thread(target=self.work, args=(channel,))
+                thread.start()
+
+            def work(self, channel):
+                for item in channel.track(range(1000)):
+                    sum(range(10000))
+
+        ProgressChannelDemo()
+
+    Progress channels are created with *ProgressBar.getProgressChannel*.
+    """
+
+    def __init__(self, progressBar, refreshRate=20):
+        self._progressBar = progressBar
+        self._interval = 1.0 / refreshRate
+        self._value = progressBar.get()
+        self._lastDisplayTime = 0
+        self._flushScheduled = False
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        """
+        Set the value of the progress bar to **value**.
+        """
+        with self._lock:
+            self._value = value
+        self._scheduleFlush()
+
+    def increment(self, value=1):
+        """
+        Increment the progress bar by **value**.
+        """
+        with self._lock:
+            self._value += value
+        self._scheduleFlush()
+
+    def get(self):
+        """
+        Get the most recently posted value. This may not have been
+        displayed yet.
+        """
+        with self._lock:
+            return self._value
+
+    def track(self, items):
+        """
+        Increment the progress bar by one for each item in **items**.
+
+        If **items** is a list or tuple of futures (objects that have an
+        *add_done_callback* method) the progress bar is incremented as
+        each future completes and **items** is returned. Otherwise, a
+        generator is returned that yields the items and increments the
+        progress bar after each item has been processed.
+
+        *The maximum value of the progress bar is not changed.*
+        """
+        if isinstance(items, (list, tuple)) and items:
+            isFutures = True
+            for item in items:
+                if not hasattr(item, "add_done_callback"):
+                    isFutures = False
+                    break
+            if isFutures:
+                for future in items:
+                    future.add_done_callback(self._futureDone)
+                return items
+        return self._trackIterable(items)
+
+    def _trackIterable(self, items):
+        for item in items:
+            yield item
+            self.increment()
+
+    def _futureDone(self, future):
+        self.increment()
+
+    def _scheduleFlush(self):
+        # This must be called without the lock acquired. callOnMain
+        # blocks while the main thread is behind, and the main thread
+        # may be waiting for the lock.
+        with self._lock:
+            if self._flushScheduled:
+                return
+            self._flushScheduled = True
+        callOnMain(self._flush)
+
+    def _flush(self):
+        # this is called on the main thread
+        wait = self._lastDisplayTime + self._interval - time.time()
+        if wait > 0:
+            callAfter(wait, self._flush)
+            return
+        with self._lock:
+            value = self._value
+            self._flushScheduled = False
+        self._lastDisplayTime = time.time()
+        self._progressBar._nsObject.setDoubleValue_(value)
@@ -1,5 +1,13 @@
-from AppKit import NSSearchField
-from vanillaBase import VanillaBaseControl
+from AppKit import NSObject, NSSearchField, NSNotificationCenter, NSControlTextDidChangeNotification
+from vanillaBase import VanillaBaseControl, _runCallback, _scheduleCoroutine, _isCoroutineFunction
+from vanillaDispatch import callOnMain, callAfter, _submit, _printException
+
+
+class VanillaSearchBoxObserver(NSObject):
+
+    def textDidChange_(self, notification):
+        if hasattr(self, "_targetMethod") and self._targetMethod is not None:
+            self._targetMethod()
 
 
 class SearchBox(VanillaBaseControl):
@@ -45,6 +53,29 @@ class SearchBox(VanillaBaseControl):
     **placeholder** A placeholder string to be shown when the text entry
     control is empty.
 
+    **queryProvider** A function that is called with the contents of the search box
+    and returns the results of the search. If this is given, a search is started
+    when the contents have not changed for **queryDelay** seconds. The function is
+    called in a worker thread, unless it is a coroutine function, in which case it
+    is run by the asyncio event loop. When a new search starts, the results of
+    searches that have not finished yet are discarded.::
+
+        def __init__(self):
+            self.w = Window((300, 200))
+            self.w.searchBox = SearchBox((10, 10, -10, 22),
+                                    queryProvider=self.index.search,
+                                    resultCallback=self.searchResultCallback)
+            self.w.list = List((10, 42, -10, -10), [])
+            self.w.open()
+
+        def searchResultCallback(self, sender, results):
+            self.w.list.set(results)
+
+    **resultCallback** The method to be called on the main thread with the search box
+    and the results of the latest search. Exceptions raised by **queryProvider** are printed.
+
+    **queryDelay** The number of seconds to wait for more typing before searching.
+
     **sizeStyle** A string representing the desired size style of the search box.
     The options are:
 
@@ -59,8 +90,27 @@ class SearchBox(VanillaBaseControl):
 
     nsSearchFieldClass = NSSearchField
 
-    def __init__(self, posSize, text="", callback=None, formatter=None, placeholder=None, sizeStyle="regular"):
+    def __init__(self, posSize, text="", callback=None, formatter=None, placeholder=None, sizeStyle="regular",
+            queryProvider=None, resultCallback=None, queryDelay=0.2):
+        self._queryProvider = queryProvider
+        self._resultCallback = resultCallback
+        self._queryDelay = queryDelay
+        self._queryGeneration = 0
+        self._queryText = None
+        self._queryNext = None
+        self._queryFuture = None
+        self._queryObserver = None
+        if queryProvider is not None:
+            self._textCallback = callback
+            callback = self._queryCallback
         self._setupView(self.nsSearchFieldClass, posSize, callback=callback)
+        if queryProvider is not None:
+            # The search field sends its action after a pause in typing
+            # that can't be set, so every change is observed instead.
+            self._queryObserver = VanillaSearchBoxObserver.alloc().init()
+            self._queryObserver._targetMethod = self._scheduleQuery # circular reference to be killed in _breakCycles
+            NSNotificationCenter.defaultCenter().addObserver_selector_name_object_(
+                self._queryObserver, "textDidChange:", NSControlTextDidChangeNotification, self._nsObject)
         self._setSizeStyle(sizeStyle)
         self._nsObject.setStringValue_(text)
         cell = self._nsObject.cell()
@@ -89,3 +139,64 @@ class SearchBox(VanillaBaseControl):
         **value** A string representing the contents of the search box.
         """
         self._nsObject.setStringValue_(value)
+
+    # queries
+
+    def _breakCycles(self):
+        if self._queryObserver is not None:
+            NSNotificationCenter.defaultCenter().removeObserver_(self._queryObserver)
+            self._queryObserver._targetMethod = None
+            self._queryObserver = None
+        self._cancelQuery()
+        self._queryProvider = None
+        self._resultCallback = None
+        self._textCallback = None
+        super(SearchBox, self)._breakCycles()
+
+    def _queryCallback(self, sender):
+        # the action is also sent when the search field is cleared
+        self._scheduleQuery()
+        if self._textCallback is not None:
+            return self._textCallback(sender)
+
+    def _scheduleQuery(self):
+        query = self.get()
+        if query == self._queryText:
+            return
+        self._cancelQuery()
+        self._queryText = query
+        self._queryNext = callAfter(self._queryDelay, self._startQuery, self._queryGeneration)
+
+    def _cancelQuery(self):
+        # every query has a generation, results
+        # of older generations are ignored
+        self._queryGeneration += 1
+        if self._queryNext is not None:
+            self._queryNext.cancel()
+            self._queryNext = None
+        if self._queryFuture is not None:
+            self._queryFuture.cancel()
+            self._queryFuture = None
+
+    def _startQuery(self, generation):
+        if generation != self._queryGeneration:
+            return
+        self._queryNext = None
+        query = self._queryText
+        if _isCoroutineFunction(self._queryProvider):
+            future = _scheduleCoroutine(self._queryProvider(query))
+            future.add_done_callback(lambda future: self._queryDone(future, generation))
+        else:
+            future = _submit(self._queryProvider, (query,), {})
+            future.add_done_callback(lambda future: callOnMain(self._queryDone, future, generation))
+        self._queryFuture = future
+
+    def _queryDone(self, future, generation):
+        if generation != self._queryGeneration or future.cancelled():
+            return
+        self._queryFuture = None
+        exception = future.exception()
+        if exception is not None:
+            _printException(exception)
+        elif self._resultCallback is not None:
+            _runCallback(self._resultCallback, self, future.result())
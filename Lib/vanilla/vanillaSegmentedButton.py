@@ -1,5 +1,6 @@
 from AppKit import *
 from vanillaBase import VanillaBaseControl
+from vanillaImageCache import _imageFromPath
 
 
 _trackingModeMap = {
@@ -39,7 +40,7 @@ class SegmentedButton(VanillaBaseControl):
             imageObject = segmentDescription.get("imageObject")
             # create the NSImage if needed
             if imagePath is not None:
-                image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+                image = _imageFromPath(imagePath)
             elif imageNamed is not None:
                 image = NSImage.imageNamed_(imageNamed)
             elif imageObject is not None:
@@ -1,3 +1,4 @@
+import math
 from AppKit import *
 from vanillaBase import VanillaBaseControl, VanillaError
 
@@ -9,6 +10,26 @@ _tickPositionMap = {
 }
 
 
+def _snapToStep(value, minValue, maxValue, step):
+    # the nearest multiple of step above minValue that is in the range
+    step = float(step)
+    steps = round((value - minValue) / step)
+    steps = max(0, min(steps, math.floor((maxValue - minValue) / step)))
+    return minValue + steps * step
+
+
+class VanillaSliderStepTarget(NSObject):
+
+    def action_(self, sender):
+        # snap the knob before the callback wrapper looks at the value
+        value = sender.doubleValue()
+        snappedValue = _snapToStep(value, sender.minValue(), sender.maxValue(), self._step)
+        if snappedValue != value:
+            sender.setDoubleValue_(snappedValue)
+        if self._target is not None:
+            self._target.action_(sender)
+
+
 class Slider(VanillaBaseControl):
 
     """
@@ -71,6 +92,16 @@ class Slider(VanillaBaseControl):
     called during slider editing. If *False* is given, the callback will be
     called after the editing has finished.
 
+    **throttled** Boolean representing if the callback should be called at most
+    once per screen refresh while the slider is being dragged, and only when the
+    value has changed. The callback is always called when the mouse button is
+    released.
+
+    **step** If given, the slider only takes values that are a multiple of
+    **step** above **minValue**. The knob snaps to these values while it is
+    dragged and *set* rounds to them. Together with **throttled**, this skips
+    callbacks for changes smaller than **step**.
+
     **callback** The method to be called when the slider has been edited.
 
     **sizeStyle** A string representing the desired size style of the slider.
@@ -122,12 +153,21 @@ class Slider(VanillaBaseControl):
 
     def __init__(self, posSize, minValue=0, maxValue=100, value=50,
             tickMarkCount=None, stopOnTickMarks=False, continuous=True,
-            callback=None, sizeStyle="regular"):
+            callback=None, sizeStyle="regular", throttled=False, step=None):
+        self._throttleCallback = throttled
+        self._step = step
         self._setupView(self.nsSliderClass, posSize, callback=callback)
         self._setSizeStyle(sizeStyle)
         self._nsObject.setMinValue_(minValue)
         self._nsObject.setMaxValue_(maxValue)
-        self._nsObject.setFloatValue_(value)
+        self.set(value)
+        if step:
+            # the step target goes between the slider and the callback wrapper
+            self._stepTarget = VanillaSliderStepTarget.alloc().init()
+            self._stepTarget._step = step
+            self._stepTarget._target = getattr(self, "_target", None)
+            self._nsObject.setTarget_(self._stepTarget)
+            self._nsObject.setAction_("action:")
         if tickMarkCount:
             self._nsObject.setNumberOfTickMarks_(tickMarkCount)
             if stopOnTickMarks:
@@ -182,12 +222,18 @@ class Slider(VanillaBaseControl):
         """
         Get the value of the slider.
         """
-        return self._nsObject.floatValue()
+        value = self._nsObject.floatValue()
+        if self._step:
+            # undo the rounding to a float
+            value = _snapToStep(value, self._nsObject.minValue(), self._nsObject.maxValue(), self._step)
+        return value
 
     def set(self, value):
         """
         Set the value of the slider.
         """
+        if self._step:
+            value = _snapToStep(value, self._nsObject.minValue(), self._nsObject.maxValue(), self._step)
         self._nsObject.setFloatValue_(value)
 
     def setMinValue(self, value):
@@ -195,12 +241,16 @@ class Slider(VanillaBaseControl):
         Set the minimum value allowed by the slider.
         """
         self._nsObject.setMinValue_(value)
+        if self._step:
+            self.set(self._nsObject.doubleValue())
 
     def setMaxValue(self, value):
         """
         Set the maximum value allowed by the slider.
         """
         self._nsObject.setMaxValue_(value)
+        if self._step:
+            self.set(self._nsObject.doubleValue())
 
     def setTickMarkCount(self, value):
         """
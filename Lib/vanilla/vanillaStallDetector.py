@@ -0,0 +1,211 @@
+import sys
+import time
+import threading
+import traceback
+from collections import deque
+from vanillaBase import _addCallbackHook, _removeCallbackHook, _callbackName
+
+
+class StallDetector(object):
+
+    """
+    A watchdog that reports callbacks that block the main thread.
+
+    While the detector is running, the duration of every button callback,
+    *List* selection and edit callback and *Window* binding is recorded.
+    When a callback has been running for longer than **threshold** seconds,
+    a monitor thread takes a sample of the main thread's stack, so the
+    report shows what the callback was doing while the application was
+    unresponsive.::
+
+        from vanilla import StallDetector
+
+        detector = StallDetector(threshold=0.2)
+        detector.start()
+
+        # use the application for a while
+
+        report = detector.getReport()
+        for stall in report["stalls"]:
+            print stall["callback"], stall["duration"]
+            print "".join(stall["stack"])
+
+    **threshold** The number of seconds after which a callback is considered
+    to be stalling.
+
+    **maxStalls** The number of stalls that are kept in the report.
+    Older stalls are discarded.
+    """
+
+    # the histogram bucket upper bounds in milliseconds.
+    # the last bucket contains everything above the last bound.
+    histogramBounds = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+
+    def __init__(self, threshold=0.1, maxStalls=100):
+        self._threshold = threshold
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._stalls = deque(maxlen=maxStalls)
+        # the callbacks that are currently running on the main thread
+        self._running = []
+        self._mainThreadId = None
+        self._monitor = None
+        self._stopEvent = threading.Event()
+
+    def start(self):
+        """
+        Start recording callbacks. This must be called on the main thread.
+        """
+        if self._monitor is not None:
+            return
+        self._mainThreadId = threading.current_thread().ident
+        self._stopEvent.clear()
+        self._monitor = threading.Thread(target=self._monitorThread)
+        self._monitor.setDaemon(True)
+        self._monitor.start()
+        _addCallbackHook(self)
+
+    def stop(self):
+        """
+        Stop recording callbacks. The recorded data is kept.
+        """
+        if self._monitor is None:
+            return
+        _removeCallbackHook(self)
+        self._stopEvent.set()
+        self._monitor.join()
+        self._monitor = None
+
+    def isRunning(self):
+        """
+        Return a boolean indicating if callbacks are being recorded.
+        """
+        return self._monitor is not None
+
+    def reset(self):
+        """
+        Discard all recorded data.
+        """
+        with self._lock:
+            self._callbacks.clear()
+            self._stalls.clear()
+
+    def getThreshold(self):
+        """
+        Get the number of seconds after which a callback is considered to be stalling.
+        """
+        return self._threshold
+
+    def setThreshold(self, value):
+        """
+        Set the number of seconds after which a callback is considered to be stalling.
+        """
+        self._threshold = value
+
+    def getReport(self):
+        """
+        Get a dictionary with the recorded data. The dictionary has these keys:
+
+        +-------------+--------------------------------------------------------+
+        | *callbacks* | A dictionary of statistics keyed by callback name.     |
+        +-------------+--------------------------------------------------------+
+        | *stalls*    | A list of stalls, the oldest first.                    |
+        +-------------+--------------------------------------------------------+
+
+        The statistics for a callback are a dictionary with these keys:
+
+        +-------------+--------------------------------------------------------+
+        | *count*     | The number of times the callback was run.              |
+        +-------------+--------------------------------------------------------+
+        | *total*     | The total running time in seconds.                     |
+        +-------------+--------------------------------------------------------+
+        | *maximum*   | The longest running time in seconds.                   |
+        +-------------+--------------------------------------------------------+
+        | *histogram* | A list of *(milliseconds, count)* tuples. Each count   |
+        |             | is the number of runs that took at most that many      |
+        |             | milliseconds and longer than the previous bound. The   |
+        |             | last bound is *None*.                                  |
+        +-------------+--------------------------------------------------------+
+
+        A stall is a dictionary with these keys:
+
+        +-------------+--------------------------------------------------------+
+        | *callback*  | The name of the callback.                              |
+        +-------------+--------------------------------------------------------+
+        | *duration*  | The running time of the callback in seconds.           |
+        +-------------+--------------------------------------------------------+
+        | *stack*     | The sampled stack of the main thread as a list of      |
+        |             | formatted lines, the innermost frame last.             |
+        +-------------+--------------------------------------------------------+
+        """
+        bounds = self.histogramBounds + [None]
+        with self._lock:
+            callbacks = {}
+            for name, (count, total, maximum, histogram) in self._callbacks.items():
+                callbacks[name] = dict(
+                    count=count,
+                    total=total,
+                    maximum=maximum,
+                    histogram=zip(bounds, histogram)
+                )
+            stalls = [dict(stall) for stall in self._stalls]
+        return dict(callbacks=callbacks, stalls=stalls)
+
+    # callback hook
+
+    def willRunCallback(self, callback):
+        entry = dict(callback=callback, start=time.time(), stall=None)
+        with self._lock:
+            self._running.append(entry)
+        return entry
+
+    def didRunCallback(self, callback, entry):
+        duration = time.time() - entry["start"]
+        name = _callbackName(callback)
+        milliseconds = duration * 1000
+        bucket = len(self.histogramBounds)
+        for index, bound in enumerate(self.histogramBounds):
+            if milliseconds <= bound:
+                bucket = index
+                break
+        with self._lock:
+            if entry in self._running:
+                self._running.remove(entry)
+            if entry["stall"] is not None:
+                entry["stall"]["duration"] = duration
+            data = self._callbacks.get(name)
+            if data is None:
+                data = self._callbacks[name] = [0, 0, 0, [0] * (len(self.histogramBounds) + 1)]
+            data[0] += 1
+            data[1] += duration
+            data[2] = max(data[2], duration)
+            data[3][bucket] += 1
+
+    # monitor
+
+    def _monitorThread(self):
+        while not self._stopEvent.is_set():
+            self._stopEvent.wait(self._threshold / 4.0)
+            self._sample()
+
+    def _sample(self):
+        now = time.time()
+        with self._lock:
+            if not self._running:
+                return
+            # the innermost callback is the one that is stalling
+            entry = self._running[-1]
+            if entry["stall"] is not None or now - entry["start"] < self._threshold:
+                return
+        frame = sys._current_frames().get(self._mainThreadId)
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame)
+        del frame
+        stall = dict(callback=_callbackName(entry["callback"]), duration=now - entry["start"], stack=stack)
+        with self._lock:
+            if entry not in self._running:
+                # the callback finished while the stack was sampled
+                return
+            entry["stall"] = stall
+            self._stalls.append(stall)
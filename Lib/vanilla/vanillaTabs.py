@@ -1,6 +1,7 @@
 from AppKit import *
 from vanillaBase import VanillaBaseObject, _breakCycles, _sizeStyleMap, VanillaCallbackWrapper, \
-        _reverseSizeStyleMap
+        _reverseSizeStyleMap, _traceSpan
+from vanillaIdle import _getIdleQueue
 
 
 class VanillaTabItem(VanillaBaseObject):
@@ -10,17 +11,29 @@ class VanillaTabItem(VanillaBaseObject):
     def __init__(self, title):
         self._tabItem = self.nsTabViewItemClass.alloc().initWithIdentifier_(title)
         self._tabItem.setLabel_(title)
+        self._builder = None
 
     def _getContentView(self):
         return self._tabItem.view()
 
+    def _build(self):
+        if self._builder is None:
+            return
+        builder = self._builder
+        self._builder = None
+        with _traceSpan("Tabs.build", "window"):
+            builder(self)
+
     def _breakCycles(self):
+        self._builder = None
         _breakCycles(self._tabItem.view())
 
 
 class VanillaTabsDelegate(NSObject):
 
     def tabView_didSelectTabViewItem_(self, tabView, tabViewItem):
+        if hasattr(self, "_buildMethod") and self._buildMethod is not None:
+            self._buildMethod(tabViewItem)
         if hasattr(self, "_target"):
             self._target.action_(tabView.vanillaWrapper())
 
@@ -54,6 +67,29 @@ class Tabs(VanillaBaseObject):
 
         myTab = self.w.tabs[0]
 
+    The controls of tabs that are not visible don't have to be created
+    up front. Give a builder for each tab instead and the controls are
+    created when the tab is first selected.::
+
+        from vanilla import *
+
+        class LazyTabDemo(object):
+
+            def __init__(self):
+                self.w = Window((250, 100))
+                self.w.tabs = Tabs((10, 10, -10, -10), ["Tab One", "Tab Two"],
+                                builders=[self.buildTab1, self.buildTab2],
+                                prebuildWhenIdle=True)
+                self.w.open()
+
+            def buildTab1(self, tab):
+                tab.text = TextBox((10, 10, -10, -10), "This is tab 1")
+
+            def buildTab2(self, tab):
+                tab.text = TextBox((10, 10, -10, -10), "This is tab 2")
+
+        LazyTabDemo()
+
 
     **posSize** Tuple of form *(left, top, width, height)* representing the position
     and size of the tabs.
@@ -72,6 +108,13 @@ class Tabs(VanillaBaseObject):
     +-----------+
     | "mini"    |
     +-----------+
+
+    **builders** An optional list with a callable, or *None*, for every tab.
+    A builder is called with the tab the first time the tab is selected or
+    retrieved by index, and is expected to add the tab's controls.
+
+    **prebuildWhenIdle** Boolean representing if the tabs that have not been
+    built yet should be built while the application is idle.
     """
 
     nsTabViewClass = NSTabView
@@ -85,10 +128,12 @@ class Tabs(VanillaBaseObject):
         "Tabs-regular": (-7, -10, 14, 16),
     }
 
-    def __init__(self, posSize, titles=["Tab"], callback=None, sizeStyle="regular", showTabs=True):
+    def __init__(self, posSize, titles=["Tab"], callback=None, sizeStyle="regular", showTabs=True,
+            builders=None, prebuildWhenIdle=False):
         self._setupView(self.nsTabViewClass, posSize) # hold off on setting callback
         self._setSizeStyle(sizeStyle)
         self._tabItems = []
+        self._prebuildTask = None
         for title in titles:
             tab = self.vanillaTabViewItemClass(title)
             self._tabItems.append(tab)
@@ -101,6 +146,14 @@ class Tabs(VanillaBaseObject):
         # while the tabs are being added.
         if callback is not None:
             self._setCallback(callback)
+        if builders is not None:
+            for tab, builder in zip(self._tabItems, builders):
+                tab._builder = builder
+            delegate = self._getDelegate()
+            delegate._buildMethod = self._buildTabViewItem # circular reference to be killed in _breakCycles
+            self._buildTabViewItem(self._nsObject.selectedTabViewItem())
+            if prebuildWhenIdle:
+                self._prebuildTask = _getIdleQueue().add(self._prebuildTabs())
 
     def getNSTabView(self):
         """
@@ -119,12 +172,30 @@ class Tabs(VanillaBaseObject):
     def _setCallback(self, callback):
         if callback is not None:
             self._target = VanillaCallbackWrapper(callback)
-            delegate = self._nsObject.delegate()
-            if delegate is None:
-                self._delegate = delegate = VanillaTabsDelegate.alloc().init()
-                self._nsObject.setDelegate_(delegate)
+            delegate = self._getDelegate()
             delegate._target = self._target
 
+    def _getDelegate(self):
+        delegate = self._nsObject.delegate()
+        if delegate is None:
+            self._delegate = delegate = VanillaTabsDelegate.alloc().init()
+            self._nsObject.setDelegate_(delegate)
+        return delegate
+
+    def _buildTabViewItem(self, tabViewItem):
+        if tabViewItem is None:
+            return
+        index = self._nsObject.indexOfTabViewItem_(tabViewItem)
+        if index != NSNotFound:
+            self._tabItems[index]._build()
+
+    def _prebuildTabs(self):
+        # one tab per idle step
+        for tab in self._tabItems:
+            tab._build()
+            yield None
+        self._prebuildTask = None
+
     def _setSizeStyle(self, value):
         value = _sizeStyleMap[value]
         self._nsObject.setControlSize_(value)
@@ -132,10 +203,18 @@ class Tabs(VanillaBaseObject):
         self._nsObject.setFont_(font)
 
     def __getitem__(self, index):
-        return self._tabItems[index]
+        tab = self._tabItems[index]
+        tab._build()
+        return tab
 
     def _breakCycles(self):
         super(Tabs, self)._breakCycles()
+        if self._prebuildTask is not None:
+            _getIdleQueue().remove(self._prebuildTask)
+            self._prebuildTask = None
+        delegate = self._nsObject.delegate()
+        if isinstance(delegate, VanillaTabsDelegate):
+            delegate._buildMethod = None
         for item in self._tabItems:
             item._breakCycles()
 
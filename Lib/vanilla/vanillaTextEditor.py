@@ -1,16 +1,33 @@
+import os
+import time
+import codecs
+import difflib
+import threading
+from bisect import bisect_right
 from AppKit import *
 from nsSubclasses import getNSSubclass
 from vanillaBase import VanillaBaseObject, VanillaCallbackWrapper
+from vanillaDispatch import callOnMain, callAfter
+from vanillaHighlighter import _Highlighting
+from vanillaTextSearch import _TextSearch
 
 
 class VanillaTextEditorDelegate(NSObject):
 
     def textDidChange_(self, notification):
-        if hasattr(self, "_target"):
+        if hasattr(self, "_target") and not getattr(self, "_ignoreChanges", False):
             textView = notification.object()
             self._target.action_(textView)
 
 
+class VanillaTextStorageDelegate(NSObject):
+
+    def textStorageDidProcessEditing_(self, notification):
+        if hasattr(self, "_targetMethod") and self._targetMethod is not None:
+            textStorage = notification.object()
+            self._targetMethod(textStorage.editedMask(), textStorage.editedRange(), textStorage.changeInLength())
+
+
 class TextEditor(VanillaBaseObject):
 
     """
@@ -43,13 +60,42 @@ class TextEditor(VanillaBaseObject):
 
     **checksSpelling** Boolean representing if spelling should be automatically
     checked or not.
+
+    **changeCallback** The method to be called when the text has changed and
+    has then not changed for **changeCallbackDelay** seconds. This method
+    must accept two arguments: the text editor and a dictionary describing
+    all changes since the previous call. It does not require copying the
+    text, so it is well suited for incremental processing of large texts.
+    The dictionary has these keys:
+
+    +---------------+---------------------------------------------------------+
+    | *ranges*      | A sorted list of *(location, length)* tuples. These are |
+    |               | the parts of the current text that have been changed.   |
+    +---------------+---------------------------------------------------------+
+    | *delta*       | The total change in length of the text.                 |
+    +---------------+---------------------------------------------------------+
+    | *changeCount* | The value of *getChangeCount* when the callback is      |
+    |               | called.                                                 |
+    +---------------+---------------------------------------------------------+
+
+    **changeCallbackDelay** The number of seconds to wait for more changes
+    before calling **changeCallback**.
     """
 
     nsScrollViewClass = NSScrollView
     nsTextViewClass = NSTextView
     delegateClass = VanillaTextEditorDelegate
+    textStorageDelegateClass = VanillaTextStorageDelegate
+
+    # the number of bytes read from a file at once
+    loadChunkSize = 256 * 1024
+    # the number of seconds spent loading during each run loop pass
+    loadTimeSlice = 0.03
+    # the minimum number of seconds between two appends to the text
+    appendInterval = 1.0 / 30
 
-    def __init__(self, posSize, text="", callback=None, readOnly=False, checksSpelling=False):
+    def __init__(self, posSize, text="", callback=None, readOnly=False, checksSpelling=False,
+                changeCallback=None, changeCallbackDelay=0.2):
         self._posSize = posSize
         self._nsObject = self.nsScrollViewClass.alloc().init()  # no need to do getNSSubclass() here
         self._nsObject.setHasVerticalScroller_(True)
@@ -65,6 +111,26 @@ class TextEditor(VanillaBaseObject):
         # do the base object init methods
         self._setCallback(callback)
         self._setAutosizingFromPosSize(posSize)
+        self._loadChunks = None
+        self._loadNext = None
+        self._appendLock = threading.Lock()
+        self._pendingAppends = []
+        self._appendScheduled = False
+        self._lastAppendTime = 0
+        self._appendMaxLines = None
+        self._appendMaxCharacters = None
+        self._changeCount = 0
+        self._changeCallback = changeCallback
+        self._changeCallbackDelay = changeCallbackDelay
+        self._changedRanges = []
+        self._changeDelta = 0
+        self._changeDeadline = None
+        self._highlighting = None
+        self._lineIndex = None
+        self._textSearch = None
+        self._textStorageDelegate = self.textStorageDelegateClass.alloc().init()
+        self._textStorageDelegate._targetMethod = self._textStorageEdited # circular reference to be killed in _breakCycles
+        self._textView.textStorage().setDelegate_(self._textStorageDelegate)
 
     def _testForDeprecatedAttributes(self):
         super(TextEditor, self)._testForDeprecatedAttributes()
@@ -73,6 +139,21 @@ class TextEditor(VanillaBaseObject):
             warn(DeprecationWarning("The _textViewClass attribute is deprecated. Use the nsTextViewClass attribute."))
             self.nsTextViewClass = self._textViewClass
 
+    def _breakCycles(self):
+        self.cancelLoad()
+        self._changeCallback = None
+        if self._highlighting is not None:
+            self._highlighting.stop()
+            self._highlighting = None
+        if self._textSearch is not None:
+            self._textSearch.cancel()
+            self._textSearch = None
+        if self._textStorageDelegate is not None:
+            self._textView.textStorage().setDelegate_(None)
+            self._textStorageDelegate._targetMethod = None
+            self._textStorageDelegate = None
+        super(TextEditor, self)._breakCycles()
+
     def getNSScrollView(self):
         """
         Return the *NSScrollView* that this object wraps.
@@ -100,13 +181,414 @@ class TextEditor(VanillaBaseObject):
         """
         return self._textView.string()
 
-    def set(self, value):
+    def set(self, value, minimalEdit=False):
         """
         Set the contents of the text box.
 
         **value** A string representing the contents of the text box.
+
+        **minimalEdit** If *True*, the current text is compared with **value**
+        and only the lines that differ are replaced. The selection, the scroll
+        position and the attributes of the unchanged text are kept, the cost
+        of laying out the text again depends on the size of the change and the
+        change can be undone. This is the better choice for text that is
+        regenerated often and changes little.
+        """
+        self.cancelLoad()
+        with self._appendLock:
+            del self._pendingAppends[:]
+        if minimalEdit:
+            self._applyEdits(_diffText(self._textView.string(), value))
+        else:
+            self._textView.setString_(value)
+
+    def _applyEdits(self, edits):
+        # edits is a sorted list of (location, length, replacement) tuples
+        if not edits:
+            return
+        textView = self._textView
+        selStart, selEnd = self.getSelection()
+        undoManager = None
+        if textView.isEditable() and textView.allowsUndo():
+            undoManager = textView.undoManager()
+        if undoManager is not None:
+            undoManager.beginUndoGrouping()
+            ranges = [NSValue.valueWithRange_((location, length)) for location, length, replacement in edits]
+            replacements = [replacement for location, length, replacement in edits]
+            # this registers the undo of the edits
+            if not textView.shouldChangeTextInRanges_replacementStrings_(ranges, replacements):
+                undoManager.endUndoGrouping()
+                undoManager = None
+        textStorage = textView.textStorage()
+        textStorage.beginEditing()
+        # back to front, so the ranges stay valid
+        for location, length, replacement in reversed(edits):
+            textStorage.replaceCharactersInRange_withString_((location, length), replacement)
+        textStorage.endEditing()
+        self.setSelection(_moveOffset(selStart, edits), _moveOffset(selEnd, edits))
+        if undoManager is not None:
+            # set() doesn't call the callback
+            delegate = textView.delegate()
+            if isinstance(delegate, VanillaTextEditorDelegate):
+                delegate._ignoreChanges = True
+            try:
+                textView.didChangeText()
+            finally:
+                if isinstance(delegate, VanillaTextEditorDelegate):
+                    delegate._ignoreChanges = False
+                undoManager.endUndoGrouping()
+
+    def loadFile(self, path, encoding="utf-8", progressCallback=None):
+        """
+        Replace the contents of the text entry control with the contents
+        of the file at **path**.
+
+        The file is read and appended in pieces, a few at a time, so the
+        application stays responsive while very large files are loading.
+        The text can not be edited until loading has finished.
+
+        **encoding** The encoding of the file.
+
+        **progressCallback** A method to be called every time a piece of the
+        file has been added, and once when loading has finished. Use
+        *getLoadProgress* to find out how much of the file has been loaded.
+        """
+        f = open(path, "rb")
+        size = os.fstat(f.fileno()).st_size
+        self._startLoad(_readFile(f, encoding, self.loadChunkSize), size, progressCallback)
+
+    def loadStream(self, stream, progressCallback=None):
+        """
+        Replace the contents of the text entry control with the strings
+        produced by **stream**. This works just like *loadFile*, except that
+        the progress is unknown.
+
+        **stream** An iterable of strings, such as a generator or a file
+        object opened in text mode.
+
+        **progressCallback** See *loadFile*.
+        """
+        self._startLoad(((text, None) for text in stream), None, progressCallback)
+
+    def isLoading(self):
+        """
+        Return a boolean indicating if a file or stream is being loaded.
+        """
+        return self._loadChunks is not None
+
+    def getLoadProgress(self):
+        """
+        Get the loaded fraction of the file being loaded as a number between 0 and 1.
+        This returns *None* if the progress is unknown or if nothing is being loaded.
+        """
+        if self._loadChunks is None or not self._loadSize:
+            return None
+        return min(1.0, float(self._loadPosition) / self._loadSize)
+
+    def cancelLoad(self):
+        """
+        Stop loading. The text that has been loaded so far is kept.
+        """
+        if self._loadChunks is None:
+            return
+        if self._loadNext is not None:
+            self._loadNext.cancel()
+            self._loadNext = None
+        chunks = self._loadChunks
+        self._loadChunks = None
+        self._textView.setEditable_(self._loadWasEditable)
+        # this closes the file
+        chunks.close()
+
+    def _startLoad(self, chunks, size, progressCallback):
+        self.cancelLoad()
+        self._textView.setString_("")
+        self._loadChunks = chunks
+        self._loadSize = size
+        self._loadPosition = 0
+        self._loadProgressCallback = progressCallback
+        self._loadWasEditable = self._textView.isEditable()
+        self._textView.setEditable_(False)
+        layoutManager = self._textView.layoutManager()
+        if hasattr(layoutManager, "setAllowsNonContiguousLayout_"):
+            # only lay out the text that is visible. 10.5+
+            layoutManager.setAllowsNonContiguousLayout_(True)
+        self._loadNext = callAfter(0, self._loadBatch)
+
+    def _loadBatch(self):
+        self._loadNext = None
+        if self._loadChunks is None:
+            return
+        deadline = time.time() + self.loadTimeSlice
+        pieces = []
+        finished = False
+        try:
+            while time.time() < deadline:
+                try:
+                    text, position = self._loadChunks.next()
+                except StopIteration:
+                    finished = True
+                    break
+                pieces.append(text)
+                if position is not None:
+                    self._loadPosition = position
+        except:
+            self.cancelLoad()
+            raise
+        if pieces:
+            text = NSAttributedString.alloc().initWithString_attributes_(u"".join(pieces), self._textView.typingAttributes())
+            textStorage = self._textView.textStorage()
+            textStorage.beginEditing()
+            textStorage.appendAttributedString_(text)
+            textStorage.endEditing()
+        progressCallback = self._loadProgressCallback
+        if finished:
+            self.cancelLoad()
+        else:
+            self._loadNext = callAfter(0, self._loadBatch)
+        if progressCallback is not None:
+            progressCallback(self)
+
+    def append(self, text):
+        """
+        Add **text** to the end of the contents of the text entry control.
+
+        This is much faster than setting the contents to the old text
+        plus the new text. Appends that arrive faster than the display
+        is refreshed are combined. If the text was scrolled to the bottom,
+        it stays scrolled to the bottom. This may be called from any thread.
+        """
+        with self._appendLock:
+            self._pendingAppends.append(text)
+            if self._appendScheduled:
+                return
+            self._appendScheduled = True
+        callOnMain(self._scheduleAppend)
+
+    def setAppendLimits(self, maxLines=None, maxCharacters=None):
+        """
+        Limit the size of the text when text is appended. Whenever an *append*
+        makes the text longer than the limits, whole lines are removed from
+        the start of the text.
+
+        **maxLines** The maximum number of lines or *None* for no limit.
+
+        **maxCharacters** The maximum number of characters or *None* for no limit.
+        """
+        self._appendMaxLines = maxLines
+        self._appendMaxCharacters = maxCharacters
+
+    def getAppendLimits(self):
+        """
+        Get the limits set with *setAppendLimits* as a tuple of form *(maxLines, maxCharacters)*.
+        """
+        return self._appendMaxLines, self._appendMaxCharacters
+
+    def _scheduleAppend(self):
+        # wait until the display may be refreshed again
+        wait = self.appendInterval - (time.time() - self._lastAppendTime)
+        if wait > 0:
+            callAfter(wait, self._flushAppends)
+        else:
+            self._flushAppends()
+
+    def _flushAppends(self):
+        if self._loadChunks is not None:
+            # append after the file or stream has been loaded
+            callAfter(self.appendInterval, self._flushAppends)
+            return
+        with self._appendLock:
+            pending = self._pendingAppends
+            self._pendingAppends = []
+            self._appendScheduled = False
+        self._lastAppendTime = time.time()
+        if not pending:
+            return
+        text = u"".join(pending)
+        visibleRect = self._nsObject.contentView().documentVisibleRect()
+        wasAtBottom = NSMaxY(visibleRect) >= NSMaxY(self._textView.bounds()) - 1
+        textStorage = self._textView.textStorage()
+        trim = self._getAppendTrimLength(textStorage, text)
+        if trim:
+            # Trim in an edit of its own. A single edit would cover the
+            # whole text, so everything that follows the edits of the text
+            # storage, such as highlighting, would process all of it.
+            length = textStorage.length()
+            textStorage.deleteCharactersInRange_((0, min(trim, length)))
+            if trim > length:
+                text = text[trim - length:]
+        if text:
+            textStorage.beginEditing()
+            textStorage.appendAttributedString_(
+                NSAttributedString.alloc().initWithString_attributes_(text, self._textView.typingAttributes()))
+            textStorage.endEditing()
+        if wasAtBottom:
+            self._textView.scrollRangeToVisible_((textStorage.length(), 0))
+
+    def _getAppendTrimLength(self, textStorage, appendedText):
+        # the number of characters to remove from the start
+        # of the text followed by appendedText
+        maxLines = self._appendMaxLines
+        maxCharacters = self._appendMaxCharacters
+        if maxLines is None and maxCharacters is None:
+            return 0
+        lineIndex = self._getLineIndex()
+        length = textStorage.length()
+        trim = 0
+        if maxLines is not None:
+            excess = lineIndex.getLineCount() + appendedText.count("\n") - maxLines
+            if excess > 0:
+                trim = _appendedLineStart(lineIndex, length, appendedText, excess)
+        if maxCharacters is not None:
+            excess = length + len(appendedText) - maxCharacters
+            if excess > trim:
+                # don't leave half a line at the top
+                if excess - 1 < length:
+                    line = lineIndex.lineForOffset(excess - 1) + 1
+                    trim = _appendedLineStart(lineIndex, length, appendedText, line)
+                else:
+                    offset = appendedText.find("\n", excess - 1 - length)
+                    if offset == -1:
+                        trim = length + len(appendedText)
+                    else:
+                        trim = length + offset + 1
+        return trim
+
+    def setHighlighter(self, highlighter):
+        """
+        Set the :class:`Highlighter` used to color the text. The text is
+        highlighted incrementally as it changes. Pass *None* to remove the
+        highlighting.
+        """
+        if self._highlighting is not None:
+            self._highlighting.stop()
+            self._highlighting = None
+        if highlighter is not None:
+            self._highlighting = _Highlighting(self._textView, self._getLineIndex(), highlighter)
+
+    def getHighlighter(self):
+        """
+        Get the :class:`Highlighter` used to color the text.
+        """
+        if self._highlighting is None:
+            return None
+        return self._highlighting._highlighter
+
+    def getChangeCount(self):
+        """
+        Get the number of times the text has been changed. This is a cheap
+        way to find out if the text has changed since it was last looked at.
+        """
+        return self._changeCount
+
+    def _textStorageEdited(self, editedMask, editedRange, changeInLength):
+        if not editedMask & NSTextStorageEditedCharacters:
+            # only the attributes changed
+            return
+        self._changeCount += 1
+        if self._textSearch is not None:
+            self._textSearch.textEdited()
+        if self._lineIndex is not None:
+            lineChange = self._lineIndex.textEdited(self._textView.textStorage(), editedRange, changeInLength)
+            if self._highlighting is not None:
+                self._highlighting.textEdited(editedRange, changeInLength, *lineChange)
+        if self._changeCallback is None:
+            return
+        self._changedRanges = _addChangedRange(self._changedRanges, editedRange, changeInLength)
+        self._changeDelta += changeInLength
+        scheduled = self._changeDeadline is not None
+        self._changeDeadline = time.time() + self._changeCallbackDelay
+        if not scheduled:
+            callAfter(self._changeCallbackDelay, self._deliverChanges)
+
+    def _deliverChanges(self):
+        if self._changeDeadline is None:
+            return
+        wait = self._changeDeadline - time.time()
+        if wait > 0:
+            # more changes arrived in the mean time
+            callAfter(wait, self._deliverChanges)
+            return
+        changeInfo = dict(
+            ranges=self._changedRanges,
+            delta=self._changeDelta,
+            changeCount=self._changeCount
+        )
+        self._changedRanges = []
+        self._changeDelta = 0
+        self._changeDeadline = None
+        if self._changeCallback is not None:
+            self._changeCallback(self, changeInfo)
+
+    def findAll(self, pattern, regex=False, caseSensitive=True, highlightColor=None, callback=None):
+        """
+        Find all occurrences of **pattern** and highlight them.
+
+        The text is searched in a background thread and matches are highlighted
+        as they are found, so the text stays responsive while a large text is
+        searched. Changing the text cancels the search and removes the highlights.
+
+        **regex** A boolean indicating if **pattern** is a regular expression.
+
+        **caseSensitive** A boolean indicating if the case of letters must match.
+
+        **highlightColor** A *NSColor* used to highlight the matches.
+
+        **callback** The method to be called when the search is finished. This
+        method must accept two arguments: the text editor and the number of matches.
+        Use *getSearchResults* to get the matches.
+        """
+        self._startSearch(pattern, regex, caseSensitive, None, highlightColor, callback)
+
+    def replaceAll(self, pattern, replacement, regex=False, caseSensitive=True, callback=None):
+        """
+        Replace all occurrences of **pattern** with **replacement**.
+
+        The text is searched in a background thread. All replacements are then
+        made at once, as a single change that can be undone in one step.
+        If the text changes before the search is finished, nothing is replaced.
+
+        **replacement** The replacement text. If **regex** is *True*, this may
+        refer to groups in **pattern**, such as *\\1* or *\\g<name>*. Groups that
+        are not part of a match are replaced with nothing. References to groups
+        that don't exist raise an error right away.
+
+        **regex** and **caseSensitive** See *findAll*.
+
+        **callback** The method to be called when the replacements have been made.
+        This method must accept two arguments: the text editor and the number of
+        replacements.
         """
-        self._textView.setString_(value)
+        self._startSearch(pattern, regex, caseSensitive, replacement, None, callback)
+
+    def _startSearch(self, pattern, regex, caseSensitive, replacement, highlightColor, callback):
+        if self._textSearch is None:
+            self._textSearch = _TextSearch(self._textView)
+        if callback is not None:
+            userCallback = callback
+            callback = lambda count: userCallback(self, count)
+        self._textSearch.start(pattern, regex, caseSensitive, replacement, highlightColor, callback)
+
+    def isSearching(self):
+        """
+        Return a boolean indicating if a search started with *findAll* or *replaceAll* is running.
+        """
+        return self._textSearch is not None and self._textSearch.isRunning()
+
+    def getSearchResults(self):
+        """
+        Get the matches found by *findAll* as a list of *(location, length)* tuples.
+        """
+        if self._textSearch is None:
+            return []
+        return self._textSearch.getResults()
+
+    def cancelSearch(self):
+        """
+        Stop the running search and remove the highlights of the matches.
+        """
+        if self._textSearch is not None:
+            self._textSearch.cancel()
 
     def selectAll(self):
         """
@@ -114,26 +596,295 @@ class TextEditor(VanillaBaseObject):
         """
         self._textView.selectAll_(None)
 
-    #def selectLine(self, lineNumber, charOffset=0):
-    #    raise NotImplementedError
-    #
-    #def getSelection(self):
-    #    """
-    #    Get the selected text.
-    #    """
-    #    selStart, selEnd = self._textView.selectedRange()
-    #    return selStart, selStart+selEnd
-    #
-    #def setSelection(self, selStart, selEnd):
-    #    selEnd = selEnd - selStart
-    #    self._textView.setSelectedRange_((selStart, selEnd))
-    #
-    #def getSelectedText(self):
-    #    selStart, selEnd = self.getSelection()
-    #    return self._textView.string()[selStart:selEnd]
-    #
+    def _getLineIndex(self):
+        # the index is built the first time it is needed
+        # and is then kept up to date as the text changes.
+        if self._lineIndex is None:
+            self._lineIndex = _LineIndex(self._textView.string())
+        return self._lineIndex
+
+    def getLineCount(self):
+        """
+        Get the number of lines in the text. Lines are separated by newline
+        characters, so a text that ends with a newline ends with an empty line.
+        """
+        return self._getLineIndex().getLineCount()
+
+    def lineForOffset(self, offset):
+        """
+        Get the number of the line that contains the character at **offset**.
+        The first line is line 0.
+        """
+        return self._getLineIndex().lineForOffset(offset)
+
+    def offsetForLine(self, lineNumber):
+        """
+        Get the offset of the first character of line **lineNumber**.
+        The first line is line 0.
+        """
+        return self._getLineIndex().offsetForLine(lineNumber)
+
+    def selectLine(self, lineNumber):
+        """
+        Select line **lineNumber**, without its line ending, and scroll it
+        into view. The first line is line 0.
+        """
+        lineIndex = self._getLineIndex()
+        start = lineIndex.offsetForLine(lineNumber)
+        if lineNumber + 1 < lineIndex.getLineCount():
+            # don't select the newline
+            end = lineIndex.offsetForLine(lineNumber + 1) - 1
+        else:
+            end = self._textView.textStorage().length()
+        self.setSelection(start, end)
+        self._textView.scrollRangeToVisible_((start, end - start))
+
+    def getSelection(self):
+        """
+        Get the selection as a tuple of form *(start, end)*.
+        """
+        selStart, selLength = self._textView.selectedRange()
+        return selStart, selStart + selLength
+
+    def setSelection(self, selStart, selEnd):
+        """
+        Select the characters from **selStart** up to **selEnd**.
+        """
+        self._textView.setSelectedRange_((selStart, selEnd - selStart))
+
+    def getSelectedText(self):
+        """
+        Get the selected text.
+        """
+        selStart, selEnd = self.getSelection()
+        return _getText(self._textView.textStorage(), selStart, selEnd - selStart)
+
     #def expandSelection(self):
     #    raise NotImplementedError
     #
     #def insert(self, text):
     #    self._textView.insert_(text)
+
+
+class _LineIndex(object):
+
+    """
+    The offsets at which the lines of a text start.
+
+    The offsets are kept in blocks of about *blockSize* lines. Each block
+    stores its offsets relative to the start of its first line, so an edit
+    only rewrites the blocks that it touches and moves the blocks after it.
+    Lookups are binary searches, first for the block and then in the block.
+    """
+
+    blockSize = 1024
+
+    def __init__(self, text):
+        self._blocks = []
+        self._blockStarts = []
+        self._blockFirstLines = []
+        self._rebuildBlocks(0, 0, [0] + _findLineStarts(text, 0))
+
+    def _rebuildBlocks(self, first, last, lineStarts):
+        # replace blocks first up to last with blocks holding lineStarts
+        blocks = []
+        blockStarts = []
+        for index in xrange(0, len(lineStarts), self.blockSize):
+            blockLineStarts = lineStarts[index:index + self.blockSize]
+            base = blockLineStarts[0]
+            blocks.append([lineStart - base for lineStart in blockLineStarts])
+            blockStarts.append(base)
+        self._blocks[first:last] = blocks
+        self._blockStarts[first:last] = blockStarts
+        lineCount = 0
+        blockFirstLines = []
+        for block in self._blocks:
+            blockFirstLines.append(lineCount)
+            lineCount += len(block)
+        self._blockFirstLines = blockFirstLines
+        self._lineCount = lineCount
+
+    def getLineCount(self):
+        return self._lineCount
+
+    def lineForOffset(self, offset):
+        block = bisect_right(self._blockStarts, offset) - 1
+        line = bisect_right(self._blocks[block], offset - self._blockStarts[block]) - 1
+        return self._blockFirstLines[block] + line
+
+    def offsetForLine(self, lineNumber):
+        if lineNumber < 0 or lineNumber >= self._lineCount:
+            raise IndexError("line number out of range: %d" % lineNumber)
+        block = bisect_right(self._blockFirstLines, lineNumber) - 1
+        return self._blockStarts[block] + self._blocks[block][lineNumber - self._blockFirstLines[block]]
+
+    def textEdited(self, textStorage, editedRange, changeInLength):
+        """
+        Update the index after the characters in **editedRange** of **textStorage**
+        replaced **changeInLength** fewer characters.
+
+        Returns a tuple of form *(firstLine, removedLines, insertedLines)*.
+        The lines after *firstLine*, the line that contains the start of the
+        edit, were replaced.
+        """
+        location, length = editedRange
+        oldEnd = location + length - changeInLength
+        blockStarts = self._blockStarts
+        first = bisect_right(blockStarts, location) - 1
+        last = bisect_right(blockStarts, oldEnd)
+        firstLine = self.lineForOffset(location)
+        before = []
+        removedLines = 0
+        after = []
+        for block in xrange(first, last):
+            base = blockStarts[block]
+            for lineStart in self._blocks[block]:
+                lineStart += base
+                if lineStart <= location:
+                    before.append(lineStart)
+                elif lineStart <= oldEnd:
+                    removedLines += 1
+                else:
+                    after.append(lineStart + changeInLength)
+        inserted = _findLineStarts(_getText(textStorage, location, length), location)
+        for block in xrange(last, len(blockStarts)):
+            blockStarts[block] += changeInLength
+        self._rebuildBlocks(first, last, before + inserted + after)
+        return firstLine, removedLines, len(inserted)
+
+
+def _getText(textStorage, location, length):
+    # Every NSString that is passed to Python is copied in full,
+    # so don't ask for the string of the whole text storage.
+    return textStorage.attributedSubstringFromRange_((location, length)).string()
+
+
+def _commonPrefixLength(a, b):
+    # a binary search, so the strings are compared in C
+    low = 0
+    high = min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _commonSuffixLength(a, b, limit):
+    low = 0
+    high = min(len(a), len(b), limit)
+    aLength = len(a)
+    bLength = len(b)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[aLength - middle:aLength - low] == b[bLength - middle:bLength - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _diffText(old, new):
+    # Get the edits that turn old into new as a sorted list of
+    # (location, length, replacement) tuples in old's coordinates.
+    # The text before the first and after the last difference is
+    # skipped and the rest is compared line by line.
+    if old == new:
+        return []
+    prefix = _commonPrefixLength(old, new)
+    suffix = _commonSuffixLength(old, new, min(len(old), len(new)) - prefix)
+    # whole lines are compared
+    lineStart = old.rfind("\n", 0, prefix) + 1
+    lineSuffix = 0
+    newline = old.find("\n", len(old) - suffix)
+    if suffix and newline != -1:
+        lineSuffix = len(old) - newline - 1
+    oldLines = old[lineStart:len(old) - lineSuffix].splitlines(True)
+    newLines = new[lineStart:len(new) - lineSuffix].splitlines(True)
+    if len(oldLines) <= 1 or len(newLines) <= 1:
+        return [(prefix, len(old) - suffix - prefix, new[prefix:len(new) - suffix])]
+    oldOffsets = [lineStart]
+    for line in oldLines:
+        oldOffsets.append(oldOffsets[-1] + len(line))
+    edits = []
+    matcher = difflib.SequenceMatcher(None, oldLines, newLines, autojunk=False)
+    for tag, oldStart, oldEnd, newStart, newEnd in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        location = oldOffsets[oldStart]
+        edits.append((location, oldOffsets[oldEnd] - location, u"".join(newLines[newStart:newEnd])))
+    return edits
+
+
+def _moveOffset(offset, edits):
+    # the offset in the text after the edits
+    delta = 0
+    for location, length, replacement in edits:
+        if offset < location:
+            break
+        if offset < location + length:
+            # in replaced text, keep it in the replacement
+            return location + delta + min(offset - location, len(replacement))
+        delta += len(replacement) - length
+    return offset + delta
+
+
+def _findLineStarts(text, offset):
+    # the positions after every newline in text, moved by offset
+    lineStarts = []
+    index = text.find("\n")
+    while index != -1:
+        lineStarts.append(offset + index + 1)
+        index = text.find("\n", index + 1)
+    return lineStarts
+
+
+def _readFile(f, encoding, chunkSize):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        while True:
+            data = f.read(chunkSize)
+            yield decoder.decode(data, final=not data), f.tell()
+            if not data:
+                break
+    finally:
+        f.close()
+
+
+def _addChangedRange(ranges, editedRange, changeInLength):
+    # Add an edited range to a list of changed ranges and
+    # move the existing ranges to where they are after the edit.
+    location, length = editedRange
+    end = location + length
+    # the end of the edited range before the edit
+    oldEnd = end - changeInLength
+    result = []
+    for rangeLocation, rangeLength in ranges:
+        rangeEnd = rangeLocation + rangeLength
+        if rangeEnd < location:
+            result.append((rangeLocation, rangeLength))
+        elif rangeLocation > oldEnd:
+            result.append((rangeLocation + changeInLength, rangeLength))
+        else:
+            # touching or overlapping ranges are merged
+            location = min(location, rangeLocation)
+            end = max(end, rangeEnd + changeInLength)
+    result.append((location, end - location))
+    result.sort()
+    return result
+
+
+def _appendedLineStart(lineIndex, length, appendedText, lineNumber):
+    # the offset of a line in the text of lineIndex, which
+    # is length characters long, followed by appendedText
+    lineCount = lineIndex.getLineCount()
+    if lineNumber < lineCount:
+        return lineIndex.offsetForLine(lineNumber)
+    offset = -1
+    for i in xrange(lineNumber - lineCount + 1):
+        offset = appendedText.find("\n", offset + 1)
+        if offset == -1:
+            return length + len(appendedText)
+    return length + offset + 1
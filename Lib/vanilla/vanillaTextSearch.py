@@ -0,0 +1,200 @@
+import re
+import sre_parse
+from AppKit import NSAutoreleasePool, NSValue, NSColor, NSBackgroundColorAttributeName
+from vanillaDispatch import callOnMain, _submit, _printException
+
+
+class _TextSearch(object):
+
+    """
+    A search through the text of a text view that runs in a worker thread.
+
+    The worker searches an immutable copy of the text storage, one chunk at a time,
+    and sends the matches of every chunk back to the main thread. Chunks end
+    at line endings, so a match can only span lines within a chunk. A line
+    that is longer than a chunk is searched in one longer chunk. Every
+    search has a generation number. Results of an older generation are
+    ignored, which is how searches are cancelled.
+    """
+
+    chunkSize = 64 * 1024
+
+    def __init__(self, textView):
+        self._textView = textView
+        self._generation = 0
+        self._running = False
+        self._results = []
+        self._highlightAttributes = None
+        self._replace = False
+        self._callback = None
+
+    def start(self, pattern, regex, caseSensitive, replacement, highlightColor, callback):
+        self.cancel()
+        flags = re.MULTILINE | re.UNICODE
+        if not caseSensitive:
+            flags |= re.IGNORECASE
+        if not regex:
+            pattern = re.escape(pattern)
+            if replacement is not None:
+                # the replacement must not be treated as a template
+                replacement = replacement.replace("\\", "\\\\")
+        pattern = re.compile(pattern, flags)
+        if replacement is not None:
+            # check the replacement here, as errors in the worker are only printed
+            replacement = _parseTemplate(replacement, pattern)
+        if replacement is None:
+            if highlightColor is None:
+                highlightColor = NSColor.yellowColor()
+            self._highlightAttributes = {NSBackgroundColorAttributeName : highlightColor}
+        else:
+            self._highlightAttributes = None
+        self._replace = replacement is not None
+        self._callback = callback
+        self._running = True
+        # copying the text storage does not copy the text into Python
+        text = self._textView.textStorage().copy()
+        generation = self._generation
+        future = _submit(self._search, (text, pattern, replacement, generation), {})
+        future.add_done_callback(lambda future: callOnMain(self._searchDone, generation, future))
+
+    def isRunning(self):
+        return self._running
+
+    def getResults(self):
+        return [(location, length) for location, length, replacement in self._results]
+
+    def cancel(self):
+        self._generation += 1
+        self._running = False
+        self._callback = None
+        if self._results and self._highlightAttributes is not None:
+            layoutManager = self._textView.layoutManager()
+            textLength = self._textView.textStorage().length()
+            for name in self._highlightAttributes:
+                layoutManager.removeTemporaryAttribute_forCharacterRange_(name, (0, textLength))
+        self._results = []
+
+    def textEdited(self):
+        if self._running or self._results:
+            self.cancel()
+
+    # worker thread
+
+    def _search(self, text, pattern, replacement, generation):
+        pool = NSAutoreleasePool.alloc().init()
+        try:
+            textLength = text.length()
+            position = 0
+            while position < textLength and generation == self._generation:
+                end = min(textLength, position + self.chunkSize)
+                chunk = text.attributedSubstringFromRange_((position, end - position)).string()
+                searchFrom = 0
+                while end < textLength:
+                    lineEnd = chunk.rfind("\n", searchFrom)
+                    if lineEnd != -1:
+                        chunk = chunk[:lineEnd + 1]
+                        end = position + lineEnd + 1
+                        break
+                    # the line is longer than a chunk, read on to its end
+                    searchFrom = len(chunk)
+                    nextEnd = min(textLength, end + self.chunkSize)
+                    chunk += text.attributedSubstringFromRange_((end, nextEnd - end)).string()
+                    end = nextEnd
+                matches = []
+                for match in pattern.finditer(chunk):
+                    start, stop = match.span()
+                    if start == stop:
+                        continue
+                    if replacement is None:
+                        replacementText = None
+                    else:
+                        replacementText = _expandTemplate(replacement, match)
+                    matches.append((position + start, stop - start, replacementText))
+                if matches:
+                    callOnMain(self._found, generation, matches)
+                position = end
+        finally:
+            del pool
+
+    # main thread
+
+    def _found(self, generation, matches):
+        if generation != self._generation:
+            return
+        self._results.extend(matches)
+        if self._highlightAttributes is not None:
+            layoutManager = self._textView.layoutManager()
+            for location, length, replacement in matches:
+                layoutManager.addTemporaryAttributes_forCharacterRange_(self._highlightAttributes, (location, length))
+
+    def _searchDone(self, generation, future):
+        # this is called after the matches of the search have been passed to _found
+        if generation != self._generation:
+            return
+        if future.cancelled():
+            self.cancel()
+            return
+        exception = future.exception()
+        if exception is not None:
+            # don't replace anything after a failed search
+            self.cancel()
+            _printException(exception)
+            return
+        self._running = False
+        callback = self._callback
+        self._callback = None
+        count = len(self._results)
+        if self._replace:
+            count = self._applyReplacements()
+        if callback is not None:
+            callback(count)
+
+    def _applyReplacements(self):
+        results = self._results
+        self._results = []
+        if not results:
+            return 0
+        textView = self._textView
+        ranges = [NSValue.valueWithRange_((location, length)) for location, length, replacement in results]
+        replacements = [replacement for location, length, replacement in results]
+        undoManager = textView.undoManager()
+        if undoManager is not None:
+            undoManager.beginUndoGrouping()
+        try:
+            if not textView.shouldChangeTextInRanges_replacementStrings_(ranges, replacements):
+                return 0
+            textStorage = textView.textStorage()
+            textStorage.beginEditing()
+            # back to front, so the ranges stay valid
+            for location, length, replacement in reversed(results):
+                textStorage.replaceCharactersInRange_withString_((location, length), replacement)
+            textStorage.endEditing()
+            textView.didChangeText()
+        finally:
+            if undoManager is not None:
+                undoManager.setActionName_("Replace All")
+                undoManager.endUndoGrouping()
+        return len(results)
+
+
+def _parseTemplate(replacement, pattern):
+    # Parse a replacement template like re.sub does
+    # and check that all of its groups exist.
+    try:
+        groups, literals = sre_parse.parse_template(replacement, pattern)
+    except IndexError, e:
+        raise re.error(str(e))
+    for index, group in groups:
+        if group > pattern.groups:
+            raise re.error("invalid group reference")
+    return groups, literals
+
+
+def _expandTemplate(template, match):
+    # Unlike match.expand, this replaces groups that
+    # did not take part in the match with nothing.
+    groups, literals = template
+    literals = list(literals)
+    for index, group in groups:
+        literals[index] = match.group(group) or u""
+    return u"".join(literals)
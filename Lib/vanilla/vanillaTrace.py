@@ -0,0 +1,140 @@
+import os
+import time
+import json
+import threading
+import Queue
+import vanillaBase
+from vanillaBase import VanillaError, _addCallbackHook, _removeCallbackHook, _callbackName
+
+
+class Tracer(object):
+
+    """
+    A recorder of vanilla activity in the Chrome trace event format.
+
+    While the tracer is running, spans are recorded for window construction,
+    the attachment of objects to windows and groups, layout changes, *List*
+    content changes and sorts, callbacks and closing windows. The events
+    are streamed to a file that can be opened in *chrome://tracing* or any
+    other viewer that understands the format.::
+
+        from vanilla import Tracer
+
+        tracer = Tracer("/tmp/vanilla.json")
+        tracer.start()
+
+        # use the application for a while
+
+        tracer.stop()
+
+    Events are written by a separate thread. If the application produces
+    events faster than they can be written, at most **maxBufferedEvents**
+    are kept in memory and the rest are dropped. The number of dropped
+    events is recorded at the end of the file.
+
+    **path** The path of the file to write.
+
+    **maxBufferedEvents** The maximum number of events that may be
+    waiting to be written.
+    """
+
+    def __init__(self, path, maxBufferedEvents=10000):
+        self._path = path
+        self._queue = Queue.Queue(maxBufferedEvents)
+        self._writer = None
+        self._droppedEventCount = 0
+        self._processId = os.getpid()
+
+    def start(self):
+        """
+        Start recording. Only one tracer can be recording at a time.
+        """
+        if self._writer is not None:
+            return
+        if vanillaBase._tracer is not None:
+            raise VanillaError("another tracer is already recording")
+        self._droppedEventCount = 0
+        self._writer = threading.Thread(target=self._writeEvents, args=(open(self._path, "w"),))
+        self._writer.setDaemon(True)
+        self._writer.start()
+        vanillaBase._tracer = self
+        _addCallbackHook(self)
+
+    def stop(self):
+        """
+        Stop recording and close the file.
+        """
+        if self._writer is None:
+            return
+        _removeCallbackHook(self)
+        vanillaBase._tracer = None
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def isRunning(self):
+        """
+        Return a boolean indicating if the tracer is recording.
+        """
+        return self._writer is not None
+
+    def getDroppedEventCount(self):
+        """
+        Get the number of events that were dropped because
+        the writer thread could not keep up.
+        """
+        return self._droppedEventCount
+
+    def addSpan(self, name, category, start, end):
+        """
+        Record a span named **name** in **category**. **start** and **end**
+        are times as returned by *time.time()*.
+        """
+        event = dict(
+            name=name,
+            cat=category,
+            ph="X",
+            ts=int(start * 1000000),
+            dur=int((end - start) * 1000000),
+            pid=self._processId,
+            tid=threading.current_thread().ident
+        )
+        try:
+            self._queue.put_nowait(event)
+        except Queue.Full:
+            self._droppedEventCount += 1
+
+    # callback hook
+
+    def willRunCallback(self, callback):
+        return time.time()
+
+    def didRunCallback(self, callback, start):
+        self.addSpan(_callbackName(callback), "callback", start, time.time())
+
+    # writer
+
+    def _writeEvents(self, f):
+        # the JSON array format allows the closing bracket to be
+        # missing, so the file is usable even if this never finishes.
+        f.write("[\n")
+        try:
+            while True:
+                event = self._queue.get()
+                if event is None:
+                    break
+                f.write(json.dumps(event))
+                f.write(",\n")
+            event = dict(
+                name="droppedEvents",
+                ph="i",
+                s="g",
+                ts=int(time.time() * 1000000),
+                pid=self._processId,
+                tid=threading.current_thread().ident,
+                args=dict(count=self._droppedEventCount)
+            )
+            f.write(json.dumps(event))
+            f.write("\n]\n")
+        finally:
+            f.close()
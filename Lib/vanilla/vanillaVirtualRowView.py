@@ -0,0 +1,255 @@
+from AppKit import *
+from vanillaGroup import Group
+from vanillaScrollView import ScrollView
+
+
+class VanillaVirtualRowDocumentView(NSView):
+
+    def isFlipped(self):
+        return True
+
+
+class VanillaVirtualRowObserver(NSObject):
+
+    def clipViewChanged_(self, notification):
+        if hasattr(self, "_targetMethod") and self._targetMethod is not None:
+            self._targetMethod()
+
+
+class _VirtualRow(Group):
+
+    def __init__(self, posSize, rowValues):
+        super(_VirtualRow, self).__init__(posSize)
+        self._index = None
+        self._rowValues = rowValues
+
+    def getIndex(self):
+        """
+        Get the index of the item that the row currently shows.
+        """
+        return self._index
+
+    def getValue(self, default=None):
+        """
+        Get the value stored for the item that the row currently shows.
+        """
+        return self._rowValues.get(self._index, default)
+
+    def setValue(self, value):
+        """
+        Store **value** for the item that the row currently shows.
+        """
+        self._rowValues[self._index] = value
+
+
+class VirtualRowView(ScrollView):
+
+    """
+    A scroll view with a row of controls for every item in a long list.
+
+    Only the rows that are visible, plus **overscan** rows above and below
+    them, exist. When the view is scrolled, rows that are scrolled out of
+    view are reused for the rows that are scrolled into view, so scrolling
+    through thousands of items creates no new controls. Because rows are
+    reused, they must not hold the state of an item. The view keeps a value
+    for every item that has one, in a dictionary, so only items that have
+    been edited take up memory. The callbacks of the controls store the
+    edits with the row's *setValue* method and the bind callback shows them
+    with its *getValue* method. The *getRowValue* and *setRowValue* methods
+    of the view access the same values by index.::
+
+        from vanilla import *
+
+        class VirtualRowViewDemo(object):
+
+            def __init__(self):
+                self.w = Window((200, 300))
+                self.w.rows = VirtualRowView((10, 10, -10, -10), 5000, 22,
+                                    buildRowCallback=self.buildRow,
+                                    bindRowCallback=self.bindRow)
+                self.w.open()
+
+            def buildRow(self, row):
+                def checkBoxCallback(sender):
+                    row.setValue(sender.get())
+                row.checkBox = CheckBox((10, 2, -10, 20), "", callback=checkBoxCallback)
+
+            def bindRow(self, row, index):
+                row.checkBox.setTitle("Item %d" % index)
+                row.checkBox.set(row.getValue(False))
+
+        VirtualRowViewDemo()
+
+    **posSize** Tuple of form *(left, top, width, height)* representing the
+    position and size of the view.
+
+    **rowCount** The number of rows.
+
+    **rowHeight** The height of every row.
+
+    **buildRowCallback** The method to be called with a new, empty row. This
+    must add the controls of the row as attributes of the row, just like
+    with a *Group* that is *(0, 0, -0, rowHeight)* in size. The *getIndex*
+    method of the row returns the index of the item that it currently shows,
+    *getValue* and *setValue* access the value stored for that item.
+
+    **bindRowCallback** The method to be called with a row and the index of
+    an item whenever the row starts showing that item. This must set the
+    controls of the row to the values of the item.
+
+    **overscan** The number of rows that exist above and below the visible
+    rows, so that short scrolls don't have to bind any rows.
+
+    **autohidesScrollers** See :class:`ScrollView`.
+
+    **backgroundColor** See :class:`ScrollView`.
+
+    **drawsBackground** See :class:`ScrollView`.
+    """
+
+    nsDocumentViewClass = VanillaVirtualRowDocumentView
+    rowClass = _VirtualRow
+
+    def __init__(self, posSize, rowCount, rowHeight, buildRowCallback, bindRowCallback, overscan=5,
+                    autohidesScrollers=False, backgroundColor=None, drawsBackground=True):
+        self._rowCount = rowCount
+        self._rowHeight = rowHeight
+        self._buildRowCallback = buildRowCallback
+        self._bindRowCallback = bindRowCallback
+        self._overscan = overscan
+        # index -> row
+        self._visibleRows = {}
+        # index -> value, only for items that have a value
+        self._rowValues = {}
+        self._spareRows = []
+        self._documentView = self.nsDocumentViewClass.alloc().initWithFrame_(((0, 0), (0, rowCount * rowHeight)))
+        self._documentView.setAutoresizingMask_(NSViewWidthSizable)
+        super(VirtualRowView, self).__init__(posSize, self._documentView, hasHorizontalScroller=False,
+                    autohidesScrollers=autohidesScrollers, backgroundColor=backgroundColor,
+                    drawsBackground=drawsBackground)
+        clipView = self._nsObject.contentView()
+        self._documentView.setFrameSize_((clipView.frame().size.width, rowCount * rowHeight))
+        clipView.setPostsBoundsChangedNotifications_(True)
+        clipView.setPostsFrameChangedNotifications_(True)
+        self._observer = VanillaVirtualRowObserver.alloc().init()
+        self._observer._targetMethod = self._updateRows # circular reference to be killed in _breakCycles
+        notificationCenter = NSNotificationCenter.defaultCenter()
+        for name in (NSViewBoundsDidChangeNotification, NSViewFrameDidChangeNotification):
+            notificationCenter.addObserver_selector_name_object_(self._observer, "clipViewChanged:", name, clipView)
+        self._updateRows()
+
+    def _breakCycles(self):
+        if self._observer is not None:
+            NSNotificationCenter.defaultCenter().removeObserver_(self._observer)
+            self._observer._targetMethod = None
+            self._observer = None
+        self._buildRowCallback = None
+        self._bindRowCallback = None
+        super(VirtualRowView, self)._breakCycles()
+
+    def getRowCount(self):
+        """
+        Get the number of rows.
+        """
+        return self._rowCount
+
+    def setRowCount(self, value):
+        """
+        Set the number of rows. Rows that are visible keep the item they show.
+        Use *reloadRows* if the items have changed. The values of items that
+        are removed are forgotten.
+        """
+        if value < self._rowCount:
+            for index in self._rowValues.keys():
+                if index >= value:
+                    del self._rowValues[index]
+        self._rowCount = value
+        clipView = self._nsObject.contentView()
+        self._documentView.setFrameSize_((clipView.frame().size.width, value * self._rowHeight))
+        self._updateRows()
+
+    def reloadRows(self, indexes=None):
+        """
+        Bind the existing rows again, for instance after the items that they
+        show have changed. If **indexes** is given, only the rows showing those
+        items are bound again.
+        """
+        if indexes is None:
+            indexes = self._visibleRows.keys()
+        for index in indexes:
+            row = self._visibleRows.get(index)
+            if row is not None:
+                self._bindRowCallback(row, index)
+
+    def getRowValue(self, index, default=None):
+        """
+        Get the value stored for the item at **index**, or **default** if
+        no value has been stored for it.
+        """
+        return self._rowValues.get(index, default)
+
+    def setRowValue(self, index, value):
+        """
+        Store **value** for the item at **index**. Use *reloadRows* to show
+        the value if the item is visible.
+        """
+        self._rowValues[index] = value
+
+    def clearRowValues(self):
+        """
+        Forget the values of all items.
+        """
+        self._rowValues.clear()
+
+    def getRow(self, index):
+        """
+        Get the row showing the item at **index**, or *None* if that row
+        doesn't exist because it isn't visible.
+        """
+        return self._visibleRows.get(index)
+
+    def scrollToRow(self, index):
+        """
+        Scroll the row showing the item at **index** into view.
+        """
+        rowHeight = self._rowHeight
+        self._documentView.scrollRectToVisible_(((0, index * rowHeight), (1, rowHeight)))
+
+    def _updateRows(self):
+        if self._buildRowCallback is None:
+            return
+        rowHeight = self._rowHeight
+        (visibleLeft, visibleTop), (visibleWidth, visibleHeight) = self._nsObject.contentView().bounds()
+        first = max(0, int(visibleTop // rowHeight) - self._overscan)
+        last = min(self._rowCount, int((visibleTop + visibleHeight) // rowHeight) + 1 + self._overscan)
+        visibleRows = self._visibleRows
+        for index in visibleRows.keys():
+            if index < first or index >= last:
+                row = visibleRows.pop(index)
+                row._nsObject.setHidden_(True)
+                self._spareRows.append(row)
+        width = self._documentView.frame().size.width
+        for index in xrange(first, last):
+            if index in visibleRows:
+                continue
+            if self._spareRows:
+                row = self._spareRows.pop()
+            else:
+                row = self._buildRow(width)
+            row._index = index
+            row._posSize = (0, index * rowHeight, -0, rowHeight)
+            row._nsObject.setFrame_(((0, index * rowHeight), (width, rowHeight)))
+            row._nsObject.setHidden_(False)
+            visibleRows[index] = row
+            self._bindRowCallback(row, index)
+
+    def _buildRow(self, width):
+        # the frame of the row is set before the controls are added,
+        # as the controls are laid out relative to it
+        row = self.rowClass((0, 0, -0, self._rowHeight), self._rowValues)
+        row._nsObject.setFrame_(((0, 0), (width, self._rowHeight)))
+        # the rows are positioned directly in a flipped view
+        row._nsObject.setAutoresizingMask_(NSViewWidthSizable)
+        self._documentView.addSubview_(row._nsObject)
+        self._buildRowCallback(row)
+        return row
@@ -0,0 +1,151 @@
+from vanillaBase import VanillaError
+from vanillaWindows import Window
+
+
+class WindowPool(object):
+
+    """
+    A pool of fully built, hidden windows that can be handed out and
+    taken back without being reconstructed.
+
+    A vanilla window can not be re-opened once it has been closed, so a
+    panel that is opened many times per session normally rebuilds its
+    entire control tree every time. A window pool keeps a number of
+    built windows around. Opening a window from the pool only shows it.
+    Closing a pooled window, either by calling *close* or through the close
+    button in the title bar, hides the window and returns it to the pool.
+    The *"close"* bindings of the window are called every time that happens.
+    Closing a window that is in the pool and was never handed out really
+    closes it.::
+
+        from vanilla import *
+
+        def buildInspector():
+            w = FloatingWindow((200, 70), "Inspector")
+            w.textBox = TextBox((10, 10, -10, 17), "Inspect!")
+            return w
+
+        def resetInspector(window):
+            window.textBox.set("Inspect!")
+
+        class WindowPoolDemo(object):
+
+            def __init__(self):
+                self.pool = WindowPool(buildInspector, size=2,
+                                resetCallback=resetInspector)
+                self.w = Window((200, 40))
+                self.w.button = Button((10, 10, -10, 20), "Inspect",
+                                callback=self.buttonCallback)
+                self.w.open()
+
+            def buttonCallback(self, sender):
+                self.pool.open()
+
+        WindowPoolDemo()
+
+    **windowFactory** A callable that takes no arguments and returns a new
+    vanilla *Window*. The factory must not open the window.
+
+    **size** The number of hidden windows that the pool keeps. This many
+    windows are built when the pool is created and closed windows beyond
+    this number are really closed.
+
+    **resetCallback** A callable that is called with a window when it is
+    returned to the pool. This should put the window back into a state
+    that is suitable for being handed out again.
+    """
+
+    def __init__(self, windowFactory, size=1, resetCallback=None):
+        self._windowFactory = windowFactory
+        self._size = size
+        self._resetCallback = resetCallback
+        self._available = []
+        self._inUse = []
+        for i in xrange(size):
+            self._available.append(self._buildWindow())
+
+    def __len__(self):
+        return len(self._available)
+
+    def _buildWindow(self):
+        window = self._windowFactory()
+        if not isinstance(window, Window):
+            raise VanillaError("window pool factories must return a vanilla Window")
+        window._windowPool = self
+        return window
+
+    def open(self):
+        """
+        Show a window from the pool and return it. If the pool is empty,
+        a new window is built.
+        """
+        if self._available:
+            window = self._available.pop()
+        else:
+            window = self._buildWindow()
+        self._inUse.append(window)
+        window.show()
+        return window
+
+    def getSize(self):
+        """
+        Get the number of hidden windows that the pool keeps.
+        """
+        return self._size
+
+    def setSize(self, size):
+        """
+        Set the number of hidden windows that the pool keeps.
+        Windows that no longer fit in the pool are closed.
+        """
+        self._size = size
+        while len(self._available) > size:
+            self._closeWindow(self._available.pop())
+
+    def fill(self):
+        """
+        Build windows until the pool holds *size* hidden windows.
+        """
+        while len(self._available) < self._size:
+            self._available.append(self._buildWindow())
+
+    def drain(self):
+        """
+        Close all hidden windows in the pool. Windows that are currently
+        handed out are detached from the pool and will close normally.
+        """
+        while self._available:
+            self._closeWindow(self._available.pop())
+        for window in self._inUse:
+            window._windowPool = None
+            # See Window.open()
+            window.retain()
+        self._inUse = []
+
+    def _recycle(self, window):
+        # this is called by Window.close and Window.windowShouldClose_
+        if window in self._available:
+            # the window was never handed out, so it is really closed
+            self._available.remove(window)
+            self._closeWindow(window)
+            return
+        if window not in self._inUse:
+            raise VanillaError("the window does not belong to this pool")
+        self._inUse.remove(window)
+        if len(self._available) >= self._size:
+            # the close bindings are called by Window.windowWillClose_
+            self._closeWindow(window)
+            return
+        window.hide()
+        window._alertBindings("close")
+        window._cancelBackgroundTasks()
+        if self._resetCallback is not None:
+            self._resetCallback(window)
+        self._available.append(window)
+
+    def _closeWindow(self, window):
+        window._windowPool = None
+        # The pool never called Window.open(), so balance
+        # the autorelease in Window.windowWillClose_().
+        window.retain()
+        window.close()
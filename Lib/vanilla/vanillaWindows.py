@@ -1,6 +1,8 @@
 from AppKit import *
-from vanillaBase import _breakCycles, _calcFrame, _setAttr, _delAttr, _flipFrame, \
-        VanillaCallbackWrapper, VanillaError, VanillaBaseControl
+from vanillaBase import _breakCycles, _calcFrame, _setAttr, _delAttr, _flipFrame, _runCallback, \
+        _traced, _traceSpan, VanillaCallbackWrapper, VanillaError, VanillaBaseControl
+from vanillaImageCache import _imageFromPath
+from vanillaDispatch import callOnMain, _submit, _printException
 
 
 class Window(NSObject):
@@ -68,6 +70,10 @@ class Window(NSObject):
     nsWindowClass = NSWindow
     nsWindowLevel = NSNormalWindowLevel
 
+    # set by a WindowPool that owns this window
+    _windowPool = None
+
+    @_traced("window")
     def __init__(self, posSize, title="", minSize=None, maxSize=None, textured=False,
                 autosaveName=None, closable=True, miniaturizable=True, initiallyVisible=True, screen=None):
         mask = self.nsWindowStyleMask
@@ -110,6 +116,7 @@ class Window(NSObject):
         self._window.setDelegate_(self)
         self._bindings = {}
         self._initiallyVisible = initiallyVisible
+        self._backgroundTasks = set()
 
     def _testForDeprecatedAttributes(self):
         from warnings import warn
@@ -193,8 +200,12 @@ class Window(NSObject):
         """
         Close the window.
 
-        Once a window has been closed it can not be re-opened.
+        Once a window has been closed it can not be re-opened. Windows that
+        belong to a *WindowPool* are hidden and returned to the pool instead.
         """
+        if self._windowPool is not None:
+            self._windowPool._recycle(self)
+            return
         if self._window.isSheet():
             NSApp().endSheet_(self._window)
             self._window.orderOut_(None)
@@ -294,7 +305,8 @@ class Window(NSObject):
             (sL, sB), (sW, sH) = screenFrame
             screenFrame = ((sL, 0), (sW, sH + sB))
         frame = _calcFrame(screenFrame, ((l, t), (w, h)), absolutePositioning=True)
-        self._window.setFrame_display_animate_(frame, True, animate)
+        with _traceSpan("Window.setPosSize", "layout"):
+            self._window.setFrame_display_animate_(frame, True, animate)
 
     def center(self):
         """
@@ -309,7 +321,8 @@ class Window(NSObject):
         (l, b), (w, h) = self._window.frame()
         l = l + x
         b = b - y
-        self._window.setFrame_display_animate_(((l, b), (w, h)), True, animate)
+        with _traceSpan("Window.move", "layout"):
+            self._window.setFrame_display_animate_(((l, b), (w, h)), True, animate)
 
     def resize(self, width, height, animate=True):
         """
@@ -388,6 +401,62 @@ class Window(NSObject):
         """
         self._bindings[event].remove(callback)
 
+    def runInBackground(self, function, args=(), onResult=None, onError=None, useProcesses=False):
+        """
+        Run **function** with **args** in a background thread and return a *Future*
+        representing the task.::
+
+            def buttonCallback(self, sender):
+                self.w.runInBackground(countWords, (self.path,), onResult=self.wordsCounted)
+
+            def wordsCounted(self, count):
+                self.w.textBox.set("%d words" % count)
+
+        **onResult** A callable that is called with the value returned by **function**.
+
+        **onError** A callable that is called with the exception raised by **function**.
+        If this is not given, the exception is printed.
+
+        **useProcesses** A boolean indicating if the task should run in a separate
+        process instead of a thread. This is only worth it for work that needs a lot
+        of processing time. **function**, **args** and the result must be picklable.
+
+        All tasks share a pool of worker threads or processes. **onResult** and **onError**
+        are always called on the main thread. When the window closes, tasks that have not
+        started yet are cancelled. Tasks that are already running can not be interrupted,
+        but their results are discarded and the callbacks are not called.
+        """
+        if self._window is None:
+            raise VanillaError("can't run tasks for a closed window")
+        future = _submit(function, args, {}, useProcesses)
+        self._backgroundTasks.add(future)
+        future.add_done_callback(lambda future: callOnMain(self._backgroundTaskDone, future, onResult, onError))
+        return future
+
+    def _backgroundTaskDone(self, future, onResult, onError):
+        if future not in self._backgroundTasks:
+            # the window was closed
+            return
+        self._backgroundTasks.remove(future)
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is None:
+            if onResult is not None:
+                onResult(future.result())
+        elif onError is not None:
+            onError(exception)
+        else:
+            _printException(exception)
+
+    def _cancelBackgroundTasks(self):
+        # this is called when the window is closed or returned to a pool
+        if not hasattr(self, "_backgroundTasks"):
+            return
+        for future in self._backgroundTasks:
+            future.cancel()
+        self._backgroundTasks.clear()
+
     def _alertBindings(self, key):
         # test to see if the attr exists.
         # this is necessary because NSWindow
@@ -400,15 +469,17 @@ class Window(NSObject):
                 for callback in self._bindings[key]:
                     # XXX this return causes only the first binding to be called XXX
                     # see http://code.typesupply.com/ticket/2
-                    return callback(self)
+                    return _runCallback(callback, self)
 
     def windowWillClose_(self, notification):
-        self.hide()
-        self._alertBindings("close")
-        # remove all bindings to prevent circular refs
-        if hasattr(self, "_bindings"):
-            del self._bindings
-        self._breakCycles()
+        with _traceSpan("Window.close", "window"):
+            self.hide()
+            self._alertBindings("close")
+            self._cancelBackgroundTasks()
+            # remove all bindings to prevent circular refs
+            if hasattr(self, "_bindings"):
+                del self._bindings
+            self._breakCycles()
         # We must make sure that the window does _not_ get deallocated during
         # windowWillClose_, or weird things happen, such as that the window
         # below this window doesn't always properly gets activated. (For reference:
@@ -456,6 +527,11 @@ class Window(NSObject):
         shouldClose = self._alertBindings("should close")
         if shouldClose is None:
             shouldClose = True
+        if shouldClose and self._windowPool is not None:
+            # pooled windows are not closed, they
+            # are hidden and handed back to the pool.
+            self._windowPool._recycle(self)
+            return False
         return shouldClose
 
     # -------
@@ -581,7 +657,7 @@ class Window(NSObject):
         callback = itemData.get("callback", None)
         # create the NSImage if needed
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = _imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None: